@@ -0,0 +1,6 @@
+"""Benchmarks of find_from_files.
+
+The benchmarks are run as modules from the root of the repository, e.g.,
+python -m benchmarks.suite, which runs the whole suite on a generated tree of
+log files (see suite.py and tree_generator.py).
+"""
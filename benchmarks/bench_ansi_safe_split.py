@@ -0,0 +1,59 @@
+"""Micro-benchmark for ansi_safe_split.
+
+Prints the mean cost of splitting long colored lines, like matched lines of
+minified JSON logs, with ansi_safe_split() and get_indented_str().
+
+Usage:
+
+    python -m benchmarks.bench_ansi_safe_split
+"""
+
+import timeit
+
+from colorama import Back, Fore, Style
+
+from find_from_files.ansi_safe_split import ansi_safe_split
+from find_from_files.output_renderer import get_indented_str
+
+RECORD = '{"level":"info","request_id":42,"path":"/api/v1/items"},'
+
+
+def colored_line(length, match_count):
+    """Returns a line of length visible characters with colored matches."""
+    plain = (RECORD * (length // len(RECORD) + 1))[:length]
+    step = length // (match_count + 1)
+    parts = [Fore.GREEN]
+    for i in range(match_count):
+        parts.append(plain[i * step : (i + 1) * step - 10])
+        parts.append(
+            f"{Back.RED}{plain[(i + 1) * step - 10:(i + 1) * step]}"
+            f"{Style.RESET_ALL}"
+        )
+    parts.append(plain[match_count * step :])
+    return "".join(parts)
+
+
+SAMPLES = {
+    "10k, 1 match": colored_line(10_000, 1),
+    "10k, 100 matches": colored_line(10_000, 100),
+    "100k, 100 matches": colored_line(100_000, 100),
+}
+
+
+def main():
+    for name, line in SAMPLES.items():
+        for label, func in (
+            ("ansi_safe_split", lambda line=line: ansi_safe_split(line, 80)),
+            (
+                "get_indented_str",
+                lambda line=line: get_indented_str(line, 8, 12, 80),
+            ),
+        ):
+            timer = timeit.Timer(func)
+            number, _ = timer.autorange()
+            best = min(timer.repeat(repeat=5, number=number)) / number
+            print(f"{name:>18} {label:>16}: {best * 1e3:8.3f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark for searching a single large log file in chunks in parallel.
+
+Writes a generated log of 512 MB into a temporary directory, and searches it
+with a sparse and a dense pattern first in one process, and then split into
+chunks searched by 2, 4 and up to one worker process per CPU (see
+chunked_search). The wall-clock times and the speedups are printed, and the
+matching lines are checked to be the same. The speedup is bounded by the
+number of CPUs and by the speed the file can be read at.
+
+Usage:
+
+    python -m benchmarks.bench_chunked_search
+"""
+
+import concurrent.futures
+import io
+import os
+import tempfile
+import time
+
+from find_from_files.chunked_search import (
+    ChunkSplitter,
+    find_matching_lines_in_chunks,
+)
+from find_from_files.file_reader import FileReader
+from find_from_files.regex_search import find_matching_lines_in_bytes
+
+LINE = "2025-01-01 12:00:00 INFO request_id={} path=/api/v1/items ok\n"
+ERROR_LINE = "2025-01-01 12:00:00 ERROR request_id={} timeout=30000ms\n"
+PATTERNS = {
+    "sparse": r"ERROR request_id=\d+ timeout=(\d+)ms",
+    "dense": r"request_id=(\d+) path",
+}
+
+
+def write_log(file_path, size):
+    with open(file_path, "w", encoding="utf-8") as f:
+        total = 0
+        i = 0
+        while total < size:
+            lines = "".join(
+                (ERROR_LINE if (i + j) % 10_000 == 0 else LINE).format(i + j)
+                for j in range(10_000)
+            )
+            f.write(lines)
+            total += len(lines)
+            i += 10_000
+
+
+def search_single(pattern, file_path):
+    with FileReader(file_path) as reader:
+        return sum(
+            1
+            for _ in find_matching_lines_in_bytes(
+                pattern, reader.binary(), "utf-8"
+            )
+        )
+
+
+def search_chunked(pattern, file_path, executor, jobs):
+    with FileReader(file_path) as reader:
+        return sum(
+            1
+            for _ in find_matching_lines_in_chunks(
+                pattern, reader, "utf-8", ChunkSplitter(executor, jobs)
+            )
+        )
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    job_counts = sorted({2, 4, max(cpu_count, 2)})
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "app.log")
+        write_log(file_path, 512 * 1024 * 1024)
+        for name, pattern in PATTERNS.items():
+            start = time.perf_counter()
+            expected = search_single(pattern, file_path)
+            single_time = time.perf_counter() - start
+            print(f"{name:>6} 1 process : {single_time:7.3f} s")
+            for jobs in job_counts:
+                with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+                    # The workers are started before the timing
+                    list(executor.map(io.BytesIO, [b""] * jobs))
+                    start = time.perf_counter()
+                    found = search_chunked(pattern, file_path, executor, jobs)
+                    chunked_time = time.perf_counter() - start
+                assert found == expected
+                print(
+                    f"{name:>6} {jobs} processes: {chunked_time:7.3f} s "
+                    f"({single_time / chunked_time:.1f}x)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark for the share of decoding in searching a log with a regex.
+
+Searches generated logs of 50 MB in which one line in 10 000 matches, one in
+ASCII and one with non-ASCII text on every line. Each log is searched first
+like the search used to, by decoding the whole file into a text stream and
+running find_matching_lines() on it, and then with
+find_matching_lines_in_bytes(), which runs the pattern on the raw bytes and
+decodes only the matching lines. A pattern with "\\d" is run on the bytes only
+in ASCII text. The CPU time spent decoding is measured
+separately: for the text stream, by decoding the whole file on its own, and
+for the bytes search, by timing the decoding of the matching lines.
+
+Usage:
+
+    python -m benchmarks.bench_decode
+"""
+
+import io
+import time
+
+from find_from_files import regex_search
+from find_from_files.regex_literals import BYTES_UTF8, bytes_equivalence
+from find_from_files.regex_search import (
+    find_matching_lines,
+    find_matching_lines_in_bytes,
+)
+
+LINES = {
+    "ascii": "2025-01-01 12:00:00 INFO request_id={} path=/api/v1/items ok\n",
+    "utf-8": "2025-01-01 12:00:00 INFO request_id={} city=Jyväskylä ok\n",
+}
+ERROR_LINE = "2025-01-01 12:00:00 ERROR request_id={} timeout=30000ms\n"
+PATTERNS = {
+    "literal": r"ERROR request_id=[0-9]+",
+    "digits": r"ERROR request_id=\d+ timeout=(\d+)ms",
+}
+
+
+def create_log(size, line_format):
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        line = (ERROR_LINE if i % 10_000 == 0 else line_format).format(i)
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return "".join(lines).encode("utf-8")
+
+
+def search_text(pattern, data):
+    file = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="ignore")
+    return list(find_matching_lines(pattern, file))
+
+
+def search_bytes(pattern, data):
+    return list(find_matching_lines_in_bytes(pattern, io.BytesIO(data)))
+
+
+def timed_decode(decode, decode_times):
+    def decode_and_time(value, encoding):
+        start = time.process_time()
+        try:
+            return decode(value, encoding)
+        finally:
+            decode_times.append(time.process_time() - start)
+
+    return decode_and_time
+
+
+def main():
+    for log_name, line_format in LINES.items():
+        data = create_log(50 * 1024 * 1024, line_format)
+        for pattern_name, pattern in PATTERNS.items():
+            run(f"{log_name} {pattern_name}", pattern, data)
+
+
+def run(name, pattern, data):
+    start = time.process_time()
+    data.decode("utf-8", errors="ignore")
+    whole_decode_time = time.process_time() - start
+
+    start = time.process_time()
+    text_result = search_text(pattern, data)
+    text_time = time.process_time() - start
+
+    decode_times = []
+    original_decode = regex_search.decode_value
+    regex_search.decode_value = timed_decode(original_decode, decode_times)
+    try:
+        start = time.process_time()
+        bytes_result = search_bytes(pattern, data)
+        bytes_time = time.process_time() - start
+    finally:
+        regex_search.decode_value = original_decode
+    assert bytes_result == text_result
+    bytes_decode_time = sum(decode_times)
+    if bytes_equivalence(pattern) != BYTES_UTF8 and not data.isascii():
+        bytes_decode_time = whole_decode_time
+
+    print(
+        f"{name:>13} text : {text_time:7.3f} s CPU, decoding "
+        f"{whole_decode_time / text_time:6.1%} "
+        f"({len(text_result)} lines)"
+    )
+    print(
+        f"{name:>13} bytes: {bytes_time:7.3f} s CPU, decoding "
+        f"{bytes_decode_time / bytes_time:6.1%} "
+        f"({len(bytes_result)} lines)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark for updating a trigram index.
+
+Builds an index of a temporary tree of log files, appends to some of the
+files, and prints how long 'index update' takes. The update time should grow
+with the number of appended bytes, not with the size of the tree (apart from
+the stat calls made for every file).
+
+Usage:
+
+    python -m benchmarks.bench_index_update
+"""
+
+import os
+import tempfile
+import time
+
+from find_from_files.trigram_index import build_index, update_index
+
+LINE = "2025-01-01 12:00:00 INFO request_id={} path=/api/v1/items ok\n"
+
+
+def create_tree(base_directory, file_count, file_size):
+    lines = "".join(LINE.format(i) for i in range(file_size // len(LINE)))
+    for i in range(file_count):
+        directory = os.path.join(base_directory, f"dir{i % 10}")
+        os.makedirs(directory, exist_ok=True)
+        with open(
+            os.path.join(directory, f"app{i}.log"), "w", encoding="utf-8"
+        ) as f:
+            f.write(lines)
+
+
+def append(base_directory, file_count, appended_size):
+    lines = "".join(
+        LINE.format(f"new{i}") for i in range(appended_size // len(LINE))
+    )
+    for i in range(file_count):
+        path = os.path.join(base_directory, f"dir{i % 10}", f"app{i}.log")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def run(file_count, file_size, changed_files, appended_size):
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        tree = os.path.join(temporary_directory, "tree")
+        index_path = os.path.join(temporary_directory, "tree.idx")
+        create_tree(tree, file_count, file_size)
+        start = time.perf_counter()
+        build_index(tree, index_path)
+        build_time = time.perf_counter() - start
+        append(tree, changed_files, appended_size)
+        start = time.perf_counter()
+        result = update_index(index_path, background_compaction=False)
+        update_time = time.perf_counter() - start
+    print(
+        f"{file_count:>6} files x {file_size // 1024:>4} KiB, "
+        f"{changed_files:>3} appended x {appended_size // 1024:>4} KiB: "
+        f"build {build_time:7.3f} s, update {update_time:7.3f} s "
+        f"({result.bytes_indexed // 1024} KiB indexed)"
+    )
+
+
+def main():
+    for file_count in [100, 400]:
+        run(file_count, 64 * 1024, 10, 16 * 1024)
+    for appended_size in [16 * 1024, 64 * 1024, 256 * 1024]:
+        run(100, 64 * 1024, 10, appended_size)
+
+
+if __name__ == "__main__":
+    main()
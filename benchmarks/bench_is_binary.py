@@ -0,0 +1,38 @@
+"""Micro-benchmark for is_binary.
+
+Prints the mean cost of one is_binary() call on text, binary and Latin-1
+samples of the size used by find_from_files.
+
+Usage:
+
+    python -m benchmarks.bench_is_binary
+"""
+
+import timeit
+
+from find_from_files.file_reader import HEAD_SIZE
+from find_from_files.is_binary import is_binary
+
+TEXT = "2025-01-01 12:00:00 INFO Tämä on testi, request_id=42 ok\n" * 64
+ASCII_TEXT = "2025-01-01 12:00:00 INFO This is a test, request_id=42 ok\n" * 64
+
+SAMPLES = {
+    "ascii text": ASCII_TEXT.encode("ascii")[:HEAD_SIZE],
+    "utf-8 text": TEXT.encode("utf-8")[:HEAD_SIZE],
+    "latin-1 text": TEXT.encode("latin-1")[:HEAD_SIZE],
+    "utf-16 text": TEXT.encode("utf-16")[:HEAD_SIZE],
+    "elf binary": (b"\x7fELF\x02\x01\x01" + bytes(range(256)) * 8)[:HEAD_SIZE],
+    "binary": bytes(range(256)) * (HEAD_SIZE // 256),
+}
+
+
+def main():
+    for name, sample in SAMPLES.items():
+        timer = timeit.Timer(lambda sample=sample: is_binary(sample))
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=5, number=number)) / number
+        print(f"{name:>14}: {best * 1e6:10.2f} µs/call")
+
+
+if __name__ == "__main__":
+    main()
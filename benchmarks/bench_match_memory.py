@@ -0,0 +1,75 @@
+"""Benchmark for the memory used by the --regexp match summary.
+
+Searches a generated log in which every line matches, and measures the peak
+memory allocated while searching with tracemalloc, with all line numbers
+kept, with --max-line-numbers 100 and with --count-only. For comparison, the
+peak memory of collecting the same line numbers into lists, as the summary
+did before, is measured too. Tracing the allocations slows down the search
+several times, so the times are only comparable with each other.
+
+Usage:
+
+    python -m benchmarks.bench_match_memory
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from find_from_files.file_reader import FileReader
+from find_from_files.find_from_files import regex_search_with_string
+from find_from_files.regex_search import find_matching_lines
+
+LINE = "2025-01-01 12:00:00 ERROR request_id={} status={}\n"
+PATTERN = r"status=(\d+)"
+LINE_COUNT = 1_000_000
+
+
+def search_with_lists(file_path):
+    """Collects the line numbers of the matches into lists."""
+    matches = {}
+    with FileReader(file_path) as reader:
+        reader.head()
+        for line_number, _, new_matches in find_matching_lines(
+            PATTERN, reader.text()
+        ):
+            for match in new_matches:
+                matches.setdefault(match, []).append(line_number)
+    return matches
+
+
+def search(file_path, **options):
+    with FileReader(file_path) as reader:
+        reader.head()
+        return regex_search_with_string(PATTERN, reader, False, **options)
+
+
+def measure(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>24}: peak {peak / 1024 / 1024:8.1f} MiB, {elapsed:.2f} s")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "app.log")
+        with open(file_path, "w", encoding="utf-8") as f:
+            for i in range(LINE_COUNT):
+                f.write(LINE.format(i, 500 + i % 4))
+
+        measure("lists (previous)", lambda: search_with_lists(file_path))
+        measure("all line numbers", lambda: search(file_path))
+        measure(
+            "--max-line-numbers 100",
+            lambda: search(file_path, max_line_numbers=100),
+        )
+        measure("--count-only", lambda: search(file_path, count_only=True))
+
+
+if __name__ == "__main__":
+    main()
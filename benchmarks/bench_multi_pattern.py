@@ -0,0 +1,93 @@
+"""Benchmark for finding the first occurrences of many literal strings.
+
+Compares searching a generated log of 11 MB for each string with
+bytes.find() with scanning it once with a LiteralSet (see literal_set), for
+growing numbers of strings. The "missing" strings are not in the log, so
+every one of them is searched for to the end. Of the "mixed" strings, every
+tenth one is in the log, and their common prefix is on every line. The
+smallest number of strings at which the LiteralSet is faster is the one
+used for LITERAL_SET_MIN_PATTERNS.
+
+Usage:
+
+    python -m benchmarks.bench_multi_pattern
+"""
+
+import random
+import time
+
+from find_from_files.literal_set import LiteralSet
+
+LINE = "2025-01-01 12:00:00 INFO request_id={} user=u{} path=/api/items ok\n"
+ERROR_LINE = "2025-01-01 12:00:00 ERROR request_id={} timeout=30000ms\n"
+USER_COUNT = 5000
+PATTERN_COUNTS = [10, 20, 30, 50, 100, 300, 1000]
+
+
+def create_log(size):
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        line = (ERROR_LINE if i % 1000 == 0 else LINE).format(
+            i, i % USER_COUNT
+        )
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return "".join(lines).encode("utf-8")
+
+
+def create_patterns(count, kind, rng):
+    patterns = [
+        f"session={rng.randrange(10**8):08d}".encode() for _ in range(count)
+    ]
+    if kind == "mixed":
+        for i in range(0, count, 10):
+            patterns[i] = f"user=u{rng.randrange(USER_COUNT)} ".encode()
+    return patterns
+
+
+def find_each(buffer, patterns):
+    found = {}
+    for pattern_id, pattern in enumerate(patterns):
+        position = buffer.find(pattern)
+        if position != -1:
+            found[pattern_id] = position
+    return found
+
+
+def scan_once(buffer, patterns):
+    found = {}
+    for position, pattern_id in LiteralSet(patterns).find_all(buffer):
+        if pattern_id not in found:
+            found[pattern_id] = position
+            if len(found) == len(patterns):
+                break
+    return found
+
+
+def timed(func, buffer, patterns):
+    start = time.perf_counter()
+    found = func(buffer, patterns)
+    return time.perf_counter() - start, found
+
+
+def main():
+    buffer = create_log(11 * 1024 * 1024)
+    rng = random.Random(0)
+    for kind in ("missing", "mixed"):
+        for count in PATTERN_COUNTS:
+            patterns = create_patterns(count, kind, rng)
+            find_time, expected = timed(find_each, buffer, patterns)
+            set_time, found = timed(scan_once, buffer, patterns)
+            assert found == expected
+            print(
+                f"{kind:>7} {count:5} strings: "
+                f"bytes.find() {find_time:7.3f} s, "
+                f"LiteralSet {set_time:7.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
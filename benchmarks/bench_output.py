@@ -0,0 +1,66 @@
+"""Benchmark for the output overhead of find_from_files.
+
+Searches a temporary tree of many small files that mostly do not match, so
+that the run time is dominated by printing the "Checking folder/file" lines.
+Each search is run with the output going to a terminal-like stream (wrapped
+to the terminal width), to a plain stream (not wrapped), and with -q and -qq,
+which print less. The difference to -qq shows the cost of the output.
+
+Usage:
+
+    python -m benchmarks.bench_output
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from find_from_files import find_from_files, output_renderer
+
+LINE = "2025-01-01 12:00:00 INFO request_id={} path=/api/v1/items ok\n"
+
+
+class TerminalStream(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def create_tree(base_directory, file_count):
+    for i in range(file_count):
+        directory = os.path.join(base_directory, f"dir{i % 50}")
+        os.makedirs(directory, exist_ok=True)
+        suffix = ".log" if i % 2 else ".txt"
+        with open(
+            os.path.join(directory, f"app{i}{suffix}"), "w", encoding="utf-8"
+        ) as f:
+            f.write(LINE.format(i) * 4)
+
+
+def run(tree, stream, options):
+    argv = ["find_from_files", tree, "request_id=7", "-s", ".log", *options]
+    start = time.perf_counter()
+    with patch.object(sys, "argv", argv), patch.object(
+        sys, "stdout", stream
+    ), patch.object(output_renderer, "get_terminal_width", lambda: 80):
+        find_from_files.main()
+    return time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tree:
+        create_tree(tree, 5000)
+        for options in ([], ["-q"], ["-qq"]):
+            for name, stream_type in (
+                ("terminal", TerminalStream),
+                ("redirected", io.StringIO),
+            ):
+                best = min(run(tree, stream_type(), options) for _ in range(3))
+                flags = " ".join(options)
+                print(f"{name:>10} {flags:>3}: {best:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark for searching a log file with a regular expression.
+
+Compares find_matching_lines() with calling re.findall() for each line, for
+a sparse and a dense pattern in a generated log of 50 MB.
+
+Usage:
+
+    python -m benchmarks.bench_regex_search
+"""
+
+import io
+import re
+import time
+
+from find_from_files.regex_search import find_matching_lines
+
+LINE = "2025-01-01 12:00:00 INFO request_id={} path=/api/v1/items ok\n"
+ERROR_LINE = "2025-01-01 12:00:00 ERROR request_id={} timeout=30000ms\n"
+PATTERNS = {
+    "sparse": r"ERROR request_id=\d+ timeout=(\d+)ms",
+    "dense": r"request_id=(\d+)",
+}
+
+
+def create_log(size):
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        line = (ERROR_LINE if i % 10_000 == 0 else LINE).format(i)
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return "".join(lines)
+
+
+def findall_by_line(pattern, file):
+    compiled = re.compile(pattern)
+    return [
+        (i + 1, line, matches)
+        for i, line in enumerate(file)
+        if (matches := compiled.findall(line))
+    ]
+
+
+def main():
+    text = create_log(50 * 1024 * 1024)
+    for name, pattern in PATTERNS.items():
+        for label, func in (
+            ("line by line", findall_by_line),
+            ("whole text", lambda p, f: list(find_matching_lines(p, f))),
+        ):
+            start = time.perf_counter()
+            result = func(pattern, io.StringIO(text))
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>6} {label:>12}: {elapsed:7.3f} s "
+                f"({len(result)} lines)"
+            )
+
+
+if __name__ == "__main__":
+    main()
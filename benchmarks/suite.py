@@ -0,0 +1,313 @@
+"""Reproducible benchmark suite with JSON baselines.
+
+Generates a synthetic tree of log files (see tree_generator.generate_tree())
+and times the hot functions of find_from_files on it: is_binary(),
+get_indented_str() (ansi_safe_split()), the literal and regular expression
+search functions, traverse_directories(), and whole CLI runs in a subprocess.
+Each benchmark is run once for warming up the caches and then --repeat times,
+and the best and the median time are reported. The results can be saved as a
+JSON baseline, and compared with an earlier baseline: a benchmark whose best
+time is more than --threshold slower than in the baseline is a regression,
+and the suite then exits with status 1.
+
+The baselines depend on the machine, so they should be made and compared on
+the same machine, e.g., by saving a baseline of the main branch and comparing
+a change with it.
+
+Usage:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json --threshold 0.1
+    python -m benchmarks.suite --size small --filter search
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from colorama import Back, Fore, Style
+
+from benchmarks.tree_generator import MATCH_WORD, TreeSpec, generate_tree
+from find_from_files.file_reader import FileReader
+from find_from_files.find_from_files import (
+    find_folders_with_string,
+    regex_search_with_string,
+    traverse_directories,
+)
+from find_from_files.is_binary import is_binary
+from find_from_files.output_renderer import OutputRenderer, get_indented_str
+
+SIZES = {
+    "small": TreeSpec(depth=1, fan_out=3, files_per_directory=8),
+    "medium": TreeSpec(),
+    "large": TreeSpec(depth=3, fan_out=4, file_size=64 * 1024),
+}
+REGEXP = rf"{MATCH_WORD} (\S+)"
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.1
+
+
+def get_file_paths(base_directory: str) -> list[str]:
+    """Returns the paths of the files under base_directory in sorted order."""
+    paths = []
+    for root, dirs, files in os.walk(base_directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files))
+    return paths
+
+
+def search_files(search_func, search_string, file_paths):
+    for file_path in file_paths:
+        with FileReader(file_path) as reader:
+            if not is_binary(reader.head()):
+                search_func(search_string, reader, False)
+
+
+def bench_is_binary(base_directory: str) -> Callable[[], None]:
+    heads = []
+    for file_path in get_file_paths(base_directory):
+        with FileReader(file_path) as reader:
+            heads.append(reader.head())
+    return lambda: [is_binary(head) for head in heads]
+
+
+def bench_ansi_safe_split(base_directory: str) -> Callable[[], None]:
+    lines = []
+    for file_path in get_file_paths(base_directory):
+        if file_path.endswith(".log"):
+            with open(file_path, "r", encoding="utf-8") as f:
+                lines.extend(
+                    line.rstrip("\n").replace(
+                        MATCH_WORD, f"{Back.RED}{MATCH_WORD}{Style.RESET_ALL}"
+                    )
+                    for line in f
+                    if MATCH_WORD in line
+                )
+    lines = [f"{Fore.GREEN}{line}" for line in lines] * 10
+    return lambda: [get_indented_str(line, 8, 12, 80) for line in lines]
+
+
+def bench_find_folders_with_string(base_directory: str) -> Callable[[], None]:
+    file_paths = get_file_paths(base_directory)
+    return lambda: search_files(
+        find_folders_with_string, MATCH_WORD, file_paths
+    )
+
+
+def bench_regex_search_with_string(base_directory: str) -> Callable[[], None]:
+    file_paths = get_file_paths(base_directory)
+    return lambda: search_files(regex_search_with_string, REGEXP, file_paths)
+
+
+def traverse(base_directory, search_string, search_func):
+    traverse_directories(
+        base_directory,
+        None,
+        None,
+        search_string,
+        False,
+        False,
+        False,
+        search_func,
+        renderer=OutputRenderer(io.StringIO()),
+    )
+
+
+def bench_traverse_directories(base_directory: str) -> Callable[[], None]:
+    return lambda: traverse(
+        base_directory, MATCH_WORD, find_folders_with_string
+    )
+
+
+def bench_traverse_directories_regexp(
+    base_directory: str,
+) -> Callable[[], None]:
+    return lambda: traverse(base_directory, REGEXP, regex_search_with_string)
+
+
+def run_cli(*argv):
+    subprocess.run(
+        [sys.executable, "-m", "find_from_files.find_from_files", *argv],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def bench_cli(base_directory: str) -> Callable[[], None]:
+    return lambda: run_cli(base_directory, MATCH_WORD, "-qq")
+
+
+def bench_cli_regexp(base_directory: str) -> Callable[[], None]:
+    return lambda: run_cli(base_directory, REGEXP, "-r", "-qq")
+
+
+def bench_cli_jobs(base_directory: str) -> Callable[[], None]:
+    return lambda: run_cli(base_directory, REGEXP, "-r", "-qq", "-j", "4")
+
+
+BENCHMARKS = {
+    "is_binary": bench_is_binary,
+    "ansi_safe_split": bench_ansi_safe_split,
+    "find_folders_with_string": bench_find_folders_with_string,
+    "regex_search_with_string": bench_regex_search_with_string,
+    "traverse_directories": bench_traverse_directories,
+    "traverse_directories_regexp": bench_traverse_directories_regexp,
+    "cli": bench_cli,
+    "cli_regexp": bench_cli_regexp,
+    "cli_jobs": bench_cli_jobs,
+}
+
+
+def time_benchmark(func: Callable[[], None], repeat: int) -> dict:
+    """Runs func once for warming up and then repeat times.
+
+    Returns:
+        A dictionary of the best and the median time in seconds.
+    """
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "median": statistics.median(times)}
+
+
+def run_suite(
+    spec: TreeSpec, names: list[str], repeat: int = DEFAULT_REPEAT
+) -> dict:
+    """Generates the tree of spec and runs the named benchmarks on it.
+
+    Returns:
+        The results as they are stored in a baseline file.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        base_directory = os.path.join(directory, "tree")
+        stats = generate_tree(base_directory, spec)
+        for name in names:
+            result = time_benchmark(BENCHMARKS[name](base_directory), repeat)
+            results[name] = result
+            best, median = result["best"], result["median"]
+            print(
+                f"{name:>28}: best {best:8.4f} s, median {median:8.4f} s",
+                flush=True,
+            )
+    return {
+        "spec": spec._asdict(),
+        "tree": stats._asdict(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(
+    results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[tuple[str, float, float, bool]]:
+    """Compares the best times of results with those of baseline.
+
+    Only the benchmarks found in both are compared.
+
+    Returns:
+        Tuples of the name of the benchmark, the best time in the baseline,
+        the best time now and whether it is a regression (more than
+        threshold slower than in the baseline), in the order of results.
+    """
+    comparison = []
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]["best"]
+        new = result["best"]
+        comparison.append((name, old, new, new > old * (1 + threshold)))
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite",
+        description="Runs the benchmarks on a generated tree of log files, "
+        "and optionally saves the results as a baseline or compares them "
+        "with one.",
+    )
+    parser.add_argument(
+        "--size",
+        choices=SIZES,
+        default="medium",
+        help="Size of the generated tree. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Number of timed runs of each benchmark. Defaults to "
+        "%(default)s.",
+    )
+    parser.add_argument(
+        "--filter",
+        default=None,
+        help="Run only the benchmarks whose name contains this string.",
+    )
+    parser.add_argument(
+        "--output", default=None, help="File to save the results to as JSON."
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="Results saved earlier with --output to compare with.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Slowdown compared with the baseline that is a regression, as "
+        "a fraction. Defaults to %(default)s (10%%).",
+    )
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if (args.filter or "") in name]
+    if not names:
+        print(f"No benchmark matches {args.filter!r}!")
+        return 1
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["spec"] != SIZES[args.size]._asdict():
+            print("The baseline was made with a different --size!")
+            return 1
+
+    results = run_suite(SIZES[args.size], names, args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    if baseline is None:
+        return 0
+    regressions = 0
+    print()
+    for name, old, new, regressed in compare(results, baseline, args.threshold):
+        change = (new - old) / old * 100 if old else 0.0
+        label = "REGRESSION" if regressed else "ok"
+        regressions += regressed
+        print(
+            f"{name:>28}: {old:8.4f} s -> {new:8.4f} s ({change:+6.1f} %) "
+            f"{label}"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Generates synthetic trees of log files for the benchmarks.
+
+Function generate_tree() creates a directory tree whose shape and contents are
+described by a TreeSpec: the depth and fan-out of the directories, the number
+and size of the files, the share of binary files, the share of lines that
+contain MATCH_WORD, and the length of the lines. The contents are drawn from
+a random.Random seeded with TreeSpec.seed, so the same spec always gives the
+same tree, byte for byte, and the benchmark results of different commits can
+be compared.
+
+Typical usage example:
+
+    with tempfile.TemporaryDirectory() as directory:
+        stats = generate_tree(directory, TreeSpec(depth=2, fan_out=3))
+        print(stats.file_count, stats.byte_count)
+"""
+
+import os
+import random
+from typing import NamedTuple
+
+MATCH_WORD = "ERROR"
+WORDS = (
+    "INFO",
+    "DEBUG",
+    "request_id",
+    "path=/api/v1/items",
+    "status=200",
+    "user=alice",
+    "Tämä",
+    "on",
+    "testi",
+    "ok",
+    "latency_ms=12",
+)
+
+
+class TreeSpec(NamedTuple):
+    """The shape and contents of a generated tree.
+
+    Attributes:
+        depth: Number of directory levels below the base directory.
+        fan_out: Number of subdirectories in each directory above the
+            deepest level.
+        files_per_directory: Number of files in each directory.
+        file_size: Approximate size of each file in bytes.
+        binary_ratio: Share of the files that are binary (0.0 to 1.0).
+        match_density: Share of the lines that contain MATCH_WORD (0.0 to
+            1.0).
+        line_length: Approximate length of the lines in characters.
+        seed: Seed of the random contents.
+    """
+
+    depth: int = 2
+    fan_out: int = 4
+    files_per_directory: int = 8
+    file_size: int = 16 * 1024
+    binary_ratio: float = 0.1
+    match_density: float = 0.01
+    line_length: int = 100
+    seed: int = 0
+
+
+class TreeStats(NamedTuple):
+    """Statistics of a generated tree.
+
+    Attributes:
+        directory_count: Number of directories, including the base directory.
+        file_count: Number of files.
+        binary_file_count: Number of binary files.
+        byte_count: Total size of the files in bytes.
+        match_line_count: Number of lines containing MATCH_WORD.
+    """
+
+    directory_count: int
+    file_count: int
+    binary_file_count: int
+    byte_count: int
+    match_line_count: int
+
+
+def generate_line(rng: random.Random, spec: TreeSpec) -> tuple[str, bool]:
+    """Returns a line of about spec.line_length characters (with the newline)
+    and whether it contains MATCH_WORD."""
+    is_match = rng.random() < spec.match_density
+    words = [f"2025-01-01 12:{rng.randrange(60):02}:{rng.randrange(60):02}"]
+    if is_match:
+        words.append(MATCH_WORD)
+    length = len(words[0]) + len(words[-1]) + 1
+    while length < spec.line_length - 1:
+        word = rng.choice(WORDS)
+        words.insert(rng.randrange(1, len(words) + 1), word)
+        length += len(word) + 1
+    return " ".join(words) + "\n", is_match
+
+
+def generate_text_file(
+    rng: random.Random, spec: TreeSpec
+) -> tuple[bytes, int]:
+    """Returns the contents of a text file and the number of lines containing
+    MATCH_WORD in it."""
+    lines = []
+    size = match_lines = 0
+    while size < spec.file_size:
+        line, is_match = generate_line(rng, spec)
+        lines.append(line)
+        size += len(line)
+        match_lines += is_match
+    return "".join(lines).encode("utf-8"), match_lines
+
+
+def generate_binary_file(rng: random.Random, spec: TreeSpec) -> bytes:
+    """Returns the contents of a binary file, starting with an ELF header."""
+    return b"\x7fELF\x02\x01\x01\x00" + rng.randbytes(
+        max(spec.file_size - 8, 0)
+    )
+
+
+def generate_tree(base_directory: str, spec: TreeSpec) -> TreeStats:
+    """Creates the tree described by spec under base_directory.
+
+    Returns:
+        The TreeStats of the generated tree.
+    """
+    rng = random.Random(spec.seed)
+    directories = 0
+    files = binary_files = byte_count = match_lines = 0
+    stack = [(base_directory, 0)]
+    while stack:
+        directory, level = stack.pop()
+        os.makedirs(directory, exist_ok=True)
+        directories += 1
+        for i in range(spec.files_per_directory):
+            if rng.random() < spec.binary_ratio:
+                name = f"data{i:03}.bin"
+                contents = generate_binary_file(rng, spec)
+                binary_files += 1
+            else:
+                contents, file_match_lines = generate_text_file(rng, spec)
+                name = f"app{i:03}.log"
+                match_lines += file_match_lines
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(contents)
+            files += 1
+            byte_count += len(contents)
+        if level < spec.depth:
+            stack.extend(
+                (os.path.join(directory, f"dir{i:02}"), level + 1)
+                for i in reversed(range(spec.fan_out))
+            )
+    return TreeStats(directories, files, binary_files, byte_count, match_lines)
@@ -0,0 +1,10 @@
+"""Finds strings and regular expressions in the files of a directory tree."""
+
+from find_from_files.matches import (
+    MODE_LITERAL,
+    MODE_REGEX,
+    MatchRecord,
+    iter_matches,
+)
+
+__all__ = ["MODE_LITERAL", "MODE_REGEX", "MatchRecord", "iter_matches"]
@@ -14,6 +14,7 @@ from colorama import Fore, Back, Style
 from .constants import ERASE_TO_THE_END_OF_LINE
 
 ANSI_ESCAPE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+CONTROL_SEQUENCE_INTRODUCER = "\x1b["
 FORE_COLOR_CODES = [
     Fore.BLACK,
     Fore.BLUE,
@@ -60,9 +61,9 @@ def ansi_safe_split(text, width, one_line=False) -> list[str]:
     Returns:
         A list of ANSI-colored substrings.
     """
-    slices, current_slice, current_length = [], "", 0
+    slices, current_parts, current_length = [], [], 0
     open_color_codes = ColorCodeState()
-    index = 0  # index of the next visible character
+    position = 0  # index of the next character not yet added to a slice
 
     def check_open_codes(
         match_str: str, open_codes: ColorCodeState
@@ -86,43 +87,54 @@ def ansi_safe_split(text, width, one_line=False) -> list[str]:
             open_codes.back = ""
         return open_codes
 
-    for i, char in enumerate(text):
-        # Skip if next visible character is not reached
-        if i < index:
+    # The text is handled as segments of visible characters separated by
+    # control sequences. A trailing None handles the text after the last one.
+    for match in [*ANSI_ESCAPE.finditer(text), None]:
+        if match is None:
+            segment_end = len(text)
+        elif text.startswith(CONTROL_SEQUENCE_INTRODUCER, match.start()):
+            segment_end = match.start()
+        else:
+            # Other escape sequences are counted as visible characters
             continue
 
-        # Check for ANSI escape sequences
-        if text[i : i + 2] == "\x1b[":  # ESC + [ = Control Sequence Introducer
-            match = ANSI_ESCAPE.match(text, i)
-            if match:
-                current_slice += match.group()
-                index += len(match.group())
-                open_color_codes = check_open_codes(
-                    match.group(), open_color_codes
-                )
-                continue
-
-        # Add regular character
-        current_slice += char
-        current_length += 1
-        index += 1
-
-        # If we reach the width limit, store the slice
-        if current_length >= width:
-            # Reset open color codes at the end of line
-            if open_color_codes.has_open_codes():
-                current_slice += Style.RESET_ALL + ERASE_TO_THE_END_OF_LINE
-
-            if one_line:
-                return [current_slice]
-            slices.append(current_slice)
-            current_slice, current_length = "", 0
-
-            # Start the next slice with color codes that were left open
-            if open_color_codes.has_open_codes():
-                current_slice += open_color_codes.back + open_color_codes.fore
+        # Add the visible characters up to the width limit at a time
+        while position < segment_end:
+            length = min(
+                segment_end - position, max(width - current_length, 1)
+            )
+            current_parts.append(text[position : position + length])
+            current_length += length
+            position += length
+
+            # If we reach the width limit, store the slice
+            if current_length >= width:
+                # Reset open color codes at the end of line
+                if open_color_codes.has_open_codes():
+                    current_parts.append(
+                        Style.RESET_ALL + ERASE_TO_THE_END_OF_LINE
+                    )
+
+                if one_line:
+                    return ["".join(current_parts)]
+                slices.append("".join(current_parts))
+                current_parts, current_length = [], 0
+
+                # Start the next slice with color codes that were left open
+                if open_color_codes.has_open_codes():
+                    current_parts.append(
+                        open_color_codes.back + open_color_codes.fore
+                    )
+
+        if match is not None:
+            current_parts.append(match.group())
+            open_color_codes = check_open_codes(
+                match.group(), open_color_codes
+            )
+            position = match.end()
 
     # Append the last slice if not empty
+    current_slice = "".join(current_parts)
     if current_slice:
         slices.append(current_slice)
 
@@ -0,0 +1,122 @@
+"""Helpers for searching the contents of a file as a single byte buffer.
+
+Function map_file() maps an open file into memory, so that it can be searched
+with the bytes methods (find(), rfind(), etc.) without decoding it or reading
+it line by line. Function count_newlines() can be used for getting the line
+number of an offset in the buffer, and get_line() for getting the line the
+offset is on. Streams that cannot be mapped (e.g., decompressed files) can be
+searched in windows of whole lines with read_line_windows().
+
+Typical usage example:
+
+    with open(file_path, "rb") as f, map_file(f) as buffer:
+        position = buffer.find(b"needle")
+        if position != -1:
+            line_number = count_newlines(buffer, position) + 1
+"""
+
+import contextlib
+import io
+import mmap
+from typing import BinaryIO, Iterator
+
+NEWLINE_COUNT_CHUNK_SIZE = 1024 * 1024
+WINDOW_READ_SIZE = 1024 * 1024
+
+
+@contextlib.contextmanager
+def map_file(file: BinaryIO) -> Iterator[bytes | mmap.mmap]:
+    """Maps a file opened in binary mode into memory.
+
+    Files that cannot be mapped (e.g., empty files, pipes or file-like objects
+    without a file descriptor) are read into memory instead.
+
+    Args:
+        file: A file opened in binary mode.
+
+    Yields:
+        A read-only mmap object or a bytes object containing the whole file.
+    """
+    try:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        buffer = file.read()
+    try:
+        yield buffer
+    finally:
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+
+
+def count_newlines(buffer: bytes | mmap.mmap, end: int, start: int = 0) -> int:
+    """Counts the line breaks in buffer[start:end] like universal newlines
+    do: "\\n", "\\r\\n" and a lone "\\r" each end a line.
+
+    The buffer is counted in chunks, so that a large mapped file is never
+    copied into memory as a whole. A "\\r\\n" is counted at its "\\n", so
+    counting the parts of a buffer separately gives the same total.
+    """
+    count = 0
+    for chunk_start in range(start, end, NEWLINE_COUNT_CHUNK_SIZE):
+        chunk_end = min(chunk_start + NEWLINE_COUNT_CHUNK_SIZE, end)
+        chunk = buffer[chunk_start:chunk_end]
+        count += chunk.count(b"\n")
+        if b"\r" in chunk:
+            count += chunk.count(b"\r") - chunk.count(b"\r\n")
+            if (
+                chunk.endswith(b"\r")
+                and buffer[chunk_end : chunk_end + 1] == b"\n"
+            ):
+                count -= 1
+    return count
+
+
+def get_line(buffer: bytes | mmap.mmap, position: int) -> bytes:
+    """Returns the line (without the line break) that position is on. The
+    lines end like in count_newlines()."""
+    line_start = buffer.rfind(b"\n", 0, position) + 1
+    line_end = buffer.find(b"\n", position)
+    if line_end == -1:
+        line_end = len(buffer)
+    # The carriage returns are looked for only within the "\n" line
+    carriage_return = buffer.rfind(b"\r", line_start, position)
+    if carriage_return != -1:
+        line_start = carriage_return + 1
+    carriage_return = buffer.find(b"\r", position, line_end)
+    if carriage_return != -1:
+        line_end = carriage_return
+    return buffer[line_start:line_end]
+
+
+def read_line_windows(
+    stream: BinaryIO, overlap: int = 0
+) -> Iterator[tuple[bytes, int, int]]:
+    """Reads a binary stream in windows of whole lines.
+
+    Each window consists of about WINDOW_READ_SIZE bytes of new lines. It
+    starts with the last lines of the previous window, at least overlap bytes
+    of them, so that any string of at most overlap + 1 bytes is wholly
+    contained in the first window it ends in. Only a couple of windows are
+    kept in memory at a time.
+
+    Yields:
+        Tuples of the window, the offset of its start in the stream and the
+        number of line breaks before it (see count_newlines()).
+    """
+    tail = b""
+    offset = newlines_before = 0
+    while True:
+        chunk = stream.read(WINDOW_READ_SIZE)
+        if not chunk:
+            return
+        if not chunk.endswith(b"\n"):
+            chunk += stream.readline()
+        window = tail + chunk
+        yield window, offset, newlines_before
+        tail_start = len(window)
+        if overlap:
+            tail_end = max(len(window) - overlap, 0)
+            tail_start = window.rfind(b"\n", 0, tail_end) + 1
+        offset += tail_start
+        newlines_before += count_newlines(window, tail_start)
+        tail = window[tail_start:]
@@ -0,0 +1,199 @@
+"""Searches a single large file in chunks in parallel worker processes.
+
+Searching the files in worker processes (--jobs) does not help with a single
+huge log file, which is searched by one process from start to end. Class
+ChunkSplitter splits a file of at least split_size bytes into chunks of whole
+lines (see split_into_chunks()), and the worker processes of an executor
+search the chunks with find_matching_lines_in_bytes() at the same time. Each
+worker maps the file into memory (see buffers.map_file()), so the pages of
+the file are shared through the page cache, and only the matching lines are
+sent back. A worker also counts the lines of its chunk, and the line numbers
+of the matches are rebased by the numbers of lines in the chunks before it
+(see find_matching_lines_in_chunks()). The matching lines are given in the
+order of the file, and only a few chunks are searched ahead of the lines
+being used, so that the matches of a huge file are not all held in memory.
+
+The chunks are split at newline bytes, so only uncompressed files in ASCII
+compatible encodings (see text_encodings.is_ascii_compatible()) are split.
+
+Typical usage example:
+
+    splitter = ChunkSplitter(executor, jobs)
+    with FileReader(file_path) as reader:
+        if splitter.can_split(reader, "utf-8"):
+            for line_number, line, matches in find_matching_lines_in_chunks(
+                pattern, reader, "utf-8", splitter
+            ):
+                print(f"{line_number}: {matches}")
+"""
+
+import collections
+import concurrent.futures
+import os
+from typing import Iterator, Sequence
+
+from find_from_files.buffers import count_newlines, map_file
+from find_from_files.file_reader import FileReader
+from find_from_files.regex_search import (
+    MatchingLine,
+    find_matching_lines_in_bytes,
+)
+from find_from_files.text_encodings import is_ascii_compatible
+
+DEFAULT_SPLIT_SIZE = 256 * 1024 * 1024
+# The chunks are at most this large, so that the memory used by the matches
+# of a chunk stays bounded and the workers get more chunks than one each
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+# Number of chunks searched ahead of the lines being used, per job
+PENDING_CHUNKS_PER_JOB = 2
+
+
+class ChunkSplitter:
+    """Decides which files are split into chunks, and searches the chunks
+    with the worker processes of an executor.
+
+    Attributes:
+        executor: The executor of the worker processes.
+        jobs: Number of worker processes of the executor.
+        split_size: Files of at least this many bytes are split.
+    """
+
+    def __init__(
+        self,
+        executor: concurrent.futures.Executor,
+        jobs: int,
+        split_size: int = DEFAULT_SPLIT_SIZE,
+    ):
+        self.executor = executor
+        self.jobs = jobs
+        self.split_size = split_size
+
+    def should_split(self, file_path: str) -> bool:
+        """Tells whether the file in file_path is large enough to be split.
+
+        The file is not opened, so that a file that cannot be split (see
+        can_split()) is only known when it is searched.
+        """
+        try:
+            return os.stat(file_path).st_size >= self.split_size
+        except OSError:
+            return False
+
+    def can_split(self, reader: FileReader, encoding: str) -> bool:
+        """Tells whether the file of reader can be split at newline bytes."""
+        return (
+            reader.compression is None
+            and not reader.is_whole_file_read()
+            and is_ascii_compatible(encoding)
+        )
+
+
+class _RangeStream:
+    """A binary stream of buffer[start:end], read without copying the rest
+    of the buffer."""
+
+    def __init__(self, buffer, start: int, end: int):
+        self._buffer = buffer
+        self._position = start
+        self._end = end
+
+    def read(self, size: int = -1) -> bytes:
+        end = self._end
+        if size >= 0:
+            end = min(self._position + size, end)
+        data = self._buffer[self._position : end]
+        self._position = end
+        return data
+
+    def readline(self) -> bytes:
+        line_end = self._buffer.find(b"\n", self._position, self._end)
+        if line_end == -1:
+            return self.read()
+        return self.read(line_end + 1 - self._position)
+
+
+def split_into_chunks(buffer, chunk_size: int) -> list[tuple[int, int]]:
+    """Splits buffer into chunks of whole lines of about chunk_size bytes.
+
+    Returns:
+        The start and end offsets of the chunks, in order. Each chunk but the
+        last ends with a newline.
+    """
+    chunks = []
+    start = 0
+    while start < len(buffer):
+        line_end = buffer.find(b"\n", min(start + chunk_size, len(buffer)) - 1)
+        end = len(buffer) if line_end == -1 else line_end + 1
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+def search_chunk(
+    file_path: str,
+    start: int,
+    end: int,
+    pattern: str | Sequence[str],
+    encoding: str,
+) -> tuple[int, list[MatchingLine]]:
+    """Searches a chunk of the file in file_path, in a worker process.
+
+    Returns:
+        A tuple of the number of lines in the chunk and the matching lines
+        of the chunk (see find_matching_lines_in_bytes()), numbered from the
+        start of the chunk.
+    """
+    with open(file_path, "rb") as f, map_file(f) as buffer:
+        matching_lines = list(
+            find_matching_lines_in_bytes(
+                pattern, _RangeStream(buffer, start, end), encoding
+            )
+        )
+        return count_newlines(buffer, end, start), matching_lines
+
+
+def find_matching_lines_in_chunks(
+    pattern: str | Sequence[str],
+    reader: FileReader,
+    encoding: str,
+    splitter: ChunkSplitter,
+) -> Iterator[MatchingLine]:
+    """Yields the lines of the file of reader that contain matches of
+    pattern, like find_matching_lines_in_bytes(), searching the chunks of
+    the file in the worker processes of splitter.
+
+    When the generator is closed, the chunks that have not been searched yet
+    are cancelled.
+    """
+    with reader.buffer() as buffer:
+        size = len(buffer)
+        chunk_size = min(MAX_CHUNK_SIZE, -(-size // splitter.jobs))
+        chunks = split_into_chunks(buffer, max(chunk_size, 1))
+    max_pending = splitter.jobs * PENDING_CHUNKS_PER_JOB
+    pending = collections.deque()
+    remaining = iter(chunks)
+    lines_before = 0
+    try:
+        while True:
+            for start, end in remaining:
+                pending.append(
+                    splitter.executor.submit(
+                        search_chunk,
+                        reader.file_path,
+                        start,
+                        end,
+                        pattern,
+                        encoding,
+                    )
+                )
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            line_count, matching_lines = pending.popleft().result()
+            for line_number, line, matches in matching_lines:
+                yield line_number + lines_before, line, matches
+            lines_before += line_count
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,69 @@
+"""Detects compressed files and decompresses them as a stream.
+
+Function detect_compression() recognizes gzip, bzip2 and xz compressed files
+(e.g., rotated logs such as app.log.1.gz) by the magic bytes at the start of
+the file, regardless of the file name. Function open_decompressed() gives the
+decompressed contents of such a file as a binary stream, which decompresses
+the file as it is read, so that the file is never decompressed to disk or
+into memory as a whole.
+
+Typical usage example:
+
+    with open(file_path, "rb") as f:
+        compression = detect_compression(f.read(COMPRESSION_SIGNATURE_SIZE))
+        f.seek(0)
+        if compression is not None:
+            data = open_decompressed(f, compression).read(1024)
+"""
+
+import bz2
+import gzip
+import lzma
+from typing import BinaryIO
+
+GZIP = "gzip"
+BZIP2 = "bzip2"
+XZ = "xz"
+
+COMPRESSION_SIGNATURES = {
+    GZIP: b"\x1f\x8b",
+    BZIP2: b"BZh",
+    XZ: b"\xfd7zXZ\x00",
+}
+COMPRESSION_SIGNATURE_SIZE = max(map(len, COMPRESSION_SIGNATURES.values()))
+
+# Errors raised when reading a corrupted or truncated compressed file
+DECOMPRESSION_ERRORS = (OSError, EOFError, lzma.LZMAError)
+
+
+def detect_compression(head: bytes) -> str | None:
+    """Detects the compression format of a file from its first bytes.
+
+    Returns:
+        GZIP, BZIP2 or XZ, or None if the file is not compressed with any of
+        them.
+    """
+    for compression, signature in COMPRESSION_SIGNATURES.items():
+        if head.startswith(signature):
+            return compression
+    return None
+
+
+def open_decompressed(file: BinaryIO, compression: str) -> BinaryIO:
+    """Returns a stream of the decompressed contents of file.
+
+    The file is read from its current position. Closing the returned stream
+    does not close the file.
+
+    Args:
+        file: A file opened in binary mode.
+        compression: The compression format of the file (see
+            detect_compression()).
+    """
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=file, mode="rb")
+    if compression == BZIP2:
+        return bz2.BZ2File(file, mode="rb")
+    if compression == XZ:
+        return lzma.LZMAFile(file, mode="rb")
+    raise ValueError(f"Unknown compression format: {compression}")
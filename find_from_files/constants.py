@@ -1,3 +1,9 @@
 """Common constants for find_it"""
 
+import os
+
 ERASE_TO_THE_END_OF_LINE = "\x1b[K"
+CACHE_DIRECTORY = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "find-from-files",
+)
@@ -0,0 +1,72 @@
+"""Walks through a directory tree with os.scandir, pruning skipped folders.
+
+Function walk_directories() goes through the directories under a base
+directory in the same top-down order as os.walk() with sorted directory and
+file names. Folders whose name starts with one of the skip prefixes are
+reported, but they are never listed, so nothing under them is visited. The
+files are yielded as os.DirEntry objects, so they can be filtered by name and
+type without any further system calls.
+
+Typical usage example:
+
+    for root, files, skipped in walk_directories(base_directory, ("node_",)):
+        if skipped:
+            print(f"Skipping folder: {root}")
+            continue
+        for entry in files:
+            print(entry.path)
+"""
+
+import os
+from typing import Iterator
+
+
+def walk_directories(
+    base_directory: str, skip_prefixes: tuple[str, ...] = ()
+) -> Iterator[tuple[str, list[os.DirEntry], bool]]:
+    """Walks through the directories under base_directory.
+
+    The directories and files are visited in sorted order. Symbolic links to
+    directories are not followed, and directories that cannot be listed are
+    ignored, as with os.walk().
+
+    Args:
+        base_directory: The directory to start from.
+        skip_prefixes: A directory is skipped if its name starts with one of
+            these.
+
+    Yields:
+        Tuples of the directory path, the entries of the files in it, and a
+        boolean indicating whether the directory is skipped. The list of
+        files of a skipped directory is always empty.
+    """
+
+    def is_skipped(name):
+        return bool(skip_prefixes) and name.startswith(skip_prefixes)
+
+    stack = [(base_directory, is_skipped(os.path.basename(base_directory)))]
+    while stack:
+        root, skipped = stack.pop()
+        if skipped:
+            yield root, [], True
+            continue
+        dirs = []
+        files = []
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        files.append(entry)
+                    elif not entry.is_symlink():
+                        dirs.append(entry)
+        except OSError:
+            continue
+        files.sort(key=lambda entry: entry.name)
+        yield root, files, False
+        dirs.sort(key=lambda entry: entry.name, reverse=True)
+        for entry in dirs:
+            stack.append((entry.path, is_skipped(entry.name)))
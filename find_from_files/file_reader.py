@@ -0,0 +1,184 @@
+"""Reads a file for both binary detection and searching with a single open.
+
+Class FileReader opens the file once, reads the head of the file for detecting
+whether it is binary and its encoding, and then gives the search functions
+access to the whole file through the same file handle. If the whole file fits
+in the head, it is not read again. Compressed files (see
+compressed.detect_compression()) are read through a decompressor, so that the
+head and the contents are those of the decompressed file. The opens and reads
+are counted in io_counters.
+
+Typical usage example:
+
+    with FileReader(file_path) as reader:
+        if reader.encoding() is not None:
+            with reader.buffer() as buffer:
+                position = buffer.find(b"needle")
+"""
+
+import contextlib
+import io
+import mmap
+from typing import BinaryIO, Iterator, TextIO
+
+from find_from_files.buffers import map_file
+from find_from_files.compressed import detect_compression, open_decompressed
+from find_from_files.is_binary import detect_encoding
+
+HEAD_SIZE = 2048
+
+
+class IOCounters:
+    """Counts the file operations made by FileReaders of the process.
+
+    Attributes:
+        opens: Number of files opened.
+        reads: Number of times file contents were read (the head or the rest
+            of a file).
+        maps: Number of files mapped into memory.
+    """
+
+    def __init__(self):
+        self.opens = 0
+        self.reads = 0
+        self.maps = 0
+
+    def reset(self):
+        self.opens = 0
+        self.reads = 0
+        self.maps = 0
+
+
+io_counters = IOCounters()
+
+
+class FileReader:
+    """Gives access to a file through one file handle opened in binary mode.
+
+    Attributes:
+        file_path: Path of the file.
+        file: The file handle, or None when the file is not open.
+        compression: The compression format of the file, or None if it is
+            not compressed. Known after the head has been read.
+        lines_before: Number of lines in the file before the contents given
+            by the reader. The search functions add it to the line numbers.
+        match_count: Number of matches the last search function found in the
+            file. Set by the search functions.
+    """
+
+    def __init__(self, file_path: str, encoding: str | None = None):
+        """Initializes the reader.
+
+        Args:
+            file_path: Path of the file.
+            encoding: The encoding of the file if it is already known, e.g.,
+                from an earlier search of the file. Otherwise it is detected
+                from the head when needed (see encoding()).
+        """
+        self.file_path = file_path
+        self.file = None
+        self.compression = None
+        self.lines_before = 0
+        self.match_count = 0
+        self._head = None
+        self._encoding = encoding
+        self._is_encoding_known = encoding is not None
+
+    def __enter__(self) -> "FileReader":
+        self.file = open(self.file_path, "rb")
+        io_counters.opens += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+        self.file = None
+
+    def head(self) -> bytes:
+        """Returns the first HEAD_SIZE bytes of the (decompressed) file.
+
+        The head is read only once, and it is used by the other methods if it
+        contains the whole file.
+        """
+        if self._head is None:
+            self._head = self.file.read(HEAD_SIZE)
+            io_counters.reads += 1
+            self.compression = detect_compression(self._head)
+            if self.compression is not None:
+                self._head = self.stream().read(HEAD_SIZE)
+        return self._head
+
+    def encoding(self) -> str | None:
+        """Returns the encoding of the (decompressed) file, or None if the
+        file is binary.
+
+        The encoding is detected from the head (see
+        is_binary.detect_encoding()) only once, so the binary detection and
+        the search functions share the verdict.
+        """
+        if not self._is_encoding_known:
+            self._encoding = detect_encoding(self.head())
+            self._is_encoding_known = True
+        return self._encoding
+
+    def is_whole_file_read(self) -> bool:
+        return len(self.head()) < HEAD_SIZE
+
+    @contextlib.contextmanager
+    def buffer(self) -> Iterator[bytes | mmap.mmap]:
+        """Gives the contents of the whole file as a byte buffer.
+
+        Compressed files cannot be mapped, and they are not decompressed into
+        memory, so stream() must be used for them instead.
+
+        Yields:
+            The head of the file if it contains the whole file, otherwise the
+            file mapped into memory (see map_file()).
+
+        Raises:
+            io.UnsupportedOperation: If the file is compressed and does not
+                fit in the head.
+        """
+        with contextlib.ExitStack() as stack:
+            buffer = self._head
+            if not self.is_whole_file_read():
+                if self.compression is not None:
+                    raise io.UnsupportedOperation(
+                        f"Cannot map the compressed file {self.file_path}"
+                    )
+                self.file.seek(0)
+                buffer = stack.enter_context(map_file(self.file))
+                if isinstance(buffer, mmap.mmap):
+                    io_counters.maps += 1
+                else:
+                    io_counters.reads += 1
+            yield buffer
+
+    def stream(self) -> BinaryIO:
+        """Returns the whole file as a binary stream, from the start.
+
+        A compressed file is decompressed as the stream is read.
+        """
+        self.file.seek(0)
+        if self.compression is None:
+            return self.file
+        return open_decompressed(self.file, self.compression)
+
+    def binary(self) -> BinaryIO:
+        """Returns the whole file as a binary stream for reading it once.
+
+        Unlike stream(), the file is not read again if it fits in the head.
+        """
+        if self.is_whole_file_read():
+            return io.BytesIO(self._head)
+        io_counters.reads += 1
+        return self.stream()
+
+    def text(self) -> TextIO:
+        """Returns the file as a text stream decoded with UTF-8.
+
+        Undecodable bytes are ignored and universal newlines are used, as with
+        open(file_path, "r", encoding="utf-8", errors="ignore").
+        """
+        return io.TextIOWrapper(
+            self.binary(), encoding="utf-8", errors="ignore"
+        )
@@ -14,16 +14,66 @@ just the match (does nothing without the --regex flag).
 """
 
 import os
-import re
 import argparse
+import array
+import collections
+import concurrent.futures
+import contextlib
+import functools
 import json
 import importlib.metadata
+import signal
+import sqlite3
+import sys
 import time
 from colorama import Fore, Back, Style, init as colorama_init, deinit as colorama_deinit
-from typing import Dict, TextIO, TypedDict
-from find_from_files.ansi_safe_split import ansi_safe_split
-from find_from_files.is_binary import is_binary
-from find_from_files.constants import ERASE_TO_THE_END_OF_LINE
+from typing import Callable, Dict, Iterator, NamedTuple
+from find_from_files import text_encodings, trigram_index
+from find_from_files.buffers import (
+    count_newlines,
+    get_line,
+    read_line_windows,
+)
+from find_from_files.chunked_search import (
+    DEFAULT_SPLIT_SIZE,
+    ChunkSplitter,
+    find_matching_lines_in_chunks,
+)
+from find_from_files.compressed import DECOMPRESSION_ERRORS
+from find_from_files.directory_walker import walk_directories
+from find_from_files.file_reader import FileReader
+from find_from_files.follow import POLL_INTERVAL, LogFollower
+from find_from_files.literal_set import (
+    LITERAL_SET_MIN_PATTERNS,
+    find_first_occurrences,
+)
+from find_from_files.matches import MODE_LITERAL, MODE_REGEX, get_file_searcher
+from find_from_files.output_renderer import OutputRenderer, get_indented_str
+from find_from_files.prefetch import DEFAULT_MAX_PREFETCH_SIZE, Prefetcher
+from find_from_files.regex_literals import (
+    BYTES_ASCII,
+    BYTES_UTF8,
+    get_prefilter,
+    matches_within_lines,
+)
+from find_from_files.regex_search import (
+    MatchingLine,
+    bytes_search_scope,
+    combine_patterns,
+    find_matching_lines_in_bytes,
+)
+from find_from_files.result_cache import DEFAULT_MAX_CACHE_SIZE, ResultCache
+from find_from_files.search_stats import (
+    DEFAULT_SLOWEST_FILE_COUNT,
+    PHASE_MATCH,
+    PHASE_READ,
+    PHASE_RENDER,
+    PHASE_SNIFF,
+    PHASE_WALK,
+    FileTimer,
+    SearchStats,
+)
+from find_from_files.constants import CACHE_DIRECTORY, ERASE_TO_THE_END_OF_LINE
 
 SINGLE_INDENT_WIDTH = 4
 INDENT_LEVEL_FOLDER_FIRST_LINE = 0
@@ -32,35 +82,145 @@ INDENT_LEVEL_FILE_FIRST_LINE = SINGLE_INDENT_WIDTH
 INDENT_LEVEL_FILE_NEXT_LINES = SINGLE_INDENT_WIDTH * 2
 INDENT_LEVEL_MATCH_FIRST_LINE = SINGLE_INDENT_WIDTH * 2
 INDENT_LEVEL_MATCH_NEXT_LINES = SINGLE_INDENT_WIDTH * 3
+PENDING_RESULTS_PER_JOB = 16
+OUTPUT_TEXT = "text"
+OUTPUT_JSONL = "jsonl"
 
 
-def get_terminal_width():
-    try:
-        columns, _ = os.get_terminal_size()
-    except OSError:
-        columns = 80
-    return columns
+def disable_ansi():
+    """Replaces the colorama codes used in the output with empty strings."""
+    Fore.GREEN = ""
+    Fore.YELLOW = ""
+    Fore.BLUE = ""
+    Fore.RED = ""
+    Back.RED = ""
+    Style.RESET_ALL = ""
 
 
-def get_indented_str(
-    string, first_line_indent_width, indent_width, line_width
-) -> str:
-    first_line = ansi_safe_split(string, line_width - first_line_indent_width)[
-        0
-    ]
-    output = " " * first_line_indent_width + first_line
-    rest = ansi_safe_split(string[len(first_line) :], line_width - indent_width)
-    for line in rest:
-        output += " " * indent_width + line
-    return output
+def init_worker(no_ansi):
+    """Initializes a worker process of the parallel search.
+
+    Workers ignore SIGINT, so that Ctrl+C is handled only by the parent
+    process, which then cancels the pending work.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if no_ansi:
+        disable_ansi()
 
 
-def print_indented(string, first_line_indent_width, indent_width, line_width):
-    print(
-        get_indented_str(
-            string, first_line_indent_width, indent_width, line_width
-        )
-    )
+class FileResult(NamedTuple):
+    """Result of checking a single file with search_file().
+
+    Attributes:
+        binary: True if the file was detected to be binary.
+        match_output: The output of the search function.
+        error: Error message if the file could not be read.
+        match_count: Number of matches found in the file, or None if it is
+            not known (the result came from a ResultCache).
+        timings: The wall-clock and CPU times of the phases of searching the
+            file (see FileTimer), or None if they were not measured.
+        encoding: The encoding the file was detected to be in (see
+            FileReader.encoding()), or None if it is binary or not known.
+    """
+
+    binary: bool = False
+    match_output: str = ""
+    error: str = ""
+    match_count: int | None = 0
+    timings: dict[str, tuple[float, float]] | None = None
+    encoding: str | None = None
+
+
+class MatchLimitReached(Exception):
+    """Raised by traverse_directories() for stopping the walk when the
+    maximum total number of matches has been printed."""
+
+
+def with_max_count(search_func, max_count: int):
+    """Returns search_func with max_count bound to it, keeping a lower
+    max_count already bound with functools.partial."""
+    if isinstance(search_func, functools.partial):
+        bound = search_func.keywords.get("max_count")
+        if bound is not None and bound <= max_count:
+            return search_func
+    return functools.partial(search_func, max_count=max_count)
+
+
+def search_file(
+    file_path,
+    search_func,
+    search_string,
+    whole_line,
+    columns=None,
+    reader=None,
+    timed=False,
+) -> FileResult:
+    """Checks whether the file in file_path is binary and searches it.
+
+    The file is opened only once. The head read for detecting whether the file
+    is binary is reused by search_func, which gets the FileReader of the file,
+    and so is the encoding detected from it (see FileReader.encoding()).
+    This function does not print anything, so that it can be run in a worker
+    process, and the output can be printed by the parent process.
+
+    Args:
+        file_path: Path of the file to check.
+        search_func: Function to use for searching the file.
+        search_string: String/regexp to search for.
+        whole_line: Passed on to search_func.
+        columns: Width the output is wrapped to, or None. Passed on to
+            search_func.
+        reader: The FileReader to use, e.g., a PrefetchedReader. Defaults to
+            a new FileReader of file_path.
+        timed: Boolean indicating whether the phases of searching the file
+            are timed (--stats).
+
+    Returns:
+        A FileResult.
+    """
+    if reader is None:
+        reader = FileReader(file_path)
+    timer = FileTimer() if timed else None
+    try:
+        with reader:
+            reader.head()
+            if timer is not None:
+                timer.lap(PHASE_READ)
+            encoding = reader.encoding()
+            if timer is not None:
+                timer.lap(PHASE_SNIFF)
+            if encoding is None:
+                return FileResult(
+                    binary=True, timings=None if timer is None else timer.times
+                )
+            match_output = search_func(
+                search_string, reader, whole_line, columns
+            )
+            if timer is not None:
+                timer.lap(PHASE_MATCH)
+            return FileResult(
+                match_output=match_output,
+                match_count=reader.match_count,
+                timings=None if timer is None else timer.times,
+                encoding=encoding,
+            )
+    except DECOMPRESSION_ERRORS as e:
+        return FileResult(error=f"ERROR reading {file_path}: {e}")
+
+
+def terminate_workers(executor: concurrent.futures.ProcessPoolExecutor):
+    """Cancels the pending work of the executor and terminates its worker
+    processes, which may be in the middle of searching large files."""
+    # ProcessPoolExecutor has no public way to stop the running work before
+    # Python 3.14. The processes are taken before the shutdown, which
+    # forgets them.
+    processes = getattr(executor, "_processes", None) or {}
+    processes = list(processes.values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    # The terminated workers exit at once, so this does not wait for them
+    executor.shutdown(wait=True)
 
 
 def traverse_directories(
@@ -72,7 +232,18 @@ def traverse_directories(
     quiet,
     quieter,
     search_func,
-):
+    jobs=1,
+    no_ansi=False,
+    index_filter=None,
+    renderer=None,
+    result_cache=None,
+    output_format=OUTPUT_TEXT,
+    max_total=None,
+    files_with_matches=False,
+    prefetcher=None,
+    stats=None,
+    split_size=None,
+) -> bool:
     """Goes through directories starting from base_directory and applies
     search_func function to each file having one of the file_suffixes.
 
@@ -89,96 +260,515 @@ def traverse_directories(
         quieter: Boolean to indicate quieter mode (in addition to quiet mode,
             only files with matches are printed).
         search_func: Function to use for checking the files.
+        jobs: Number of worker processes used for searching the files. If this
+            is 1, the files are searched in the current process.
+        no_ansi: Boolean indicating whether ANSI codes are disabled. Passed on
+            to the worker processes.
+        index_filter: An IndexFilter used for ruling out files that cannot
+            contain matches without opening them, or None.
+        renderer: The OutputRenderer the output is written with. Defaults to
+            a renderer writing to sys.stdout.
+        result_cache: A ResultCache used for answering the unchanged files
+            without opening them, or None.
+        output_format: OUTPUT_TEXT for the human-readable output, or
+            OUTPUT_JSONL for JSON Lines, in which case search_func must give
+            its output as JSON Lines (e.g., regex_search_jsonl()). Without
+            worker processes and the cache, the records are then written as
+            soon as they are found.
+        max_total: Maximum total number of matches printed, or None. The walk
+            is stopped, and the work of the worker processes cancelled, as
+            soon as it has been reached.
+        files_with_matches: Boolean indicating whether only the paths of the
+            files with matches are printed. search_func should then stop at
+            the first match of each file (see find_files_with_matches()).
+        prefetcher: A Prefetcher reading the files ahead of the search, or
+            None. Not used with worker processes, which read the files
+            themselves.
+        stats: A SearchStats the times of the phases, the files searched and
+            the files skipped are added to, or None.
+        split_size: Files of at least this many bytes are split into chunks
+            searched by the worker processes at the same time (see
+            chunked_search), or None. Only used with worker processes, and
+            search_func must be regex_search_with_string() or
+            regex_search_jsonl().
+
+    Returns:
+        True if the walk was stopped because max_total was reached.
     """
+    executor = None
+    splitter = None
+    jsonl = output_format == OUTPUT_JSONL
+    if renderer is None:
+        renderer = OutputRenderer()
+    if files_with_matches:
+        quiet = True
+    total_matches = 0
+    limit_reached = False
+    completed = False
+    # Output items in the order they are printed. Each item is a tuple of a
+    # future (or None, if the output is ready) and the output lines, or a
+    # function returning the output lines from the result of the future.
+    pending = collections.deque()
+
+    def write_lines(lines):
+        for line in lines:
+            renderer.write(line)
+
+    if stats is not None:
+        write_lines = stats.timed(PHASE_RENDER, write_lines)
+
+    def emit(lines):
+        if executor is None and prefetcher is None:
+            write_lines(lines)
+            if limit_reached:
+                raise MatchLimitReached
+            return
+        pending.append((None, lines))
+        print_pending()
+
+    def print_pending(max_pending=None):
+        """Prints the pending output items that are ready, in order.
+
+        The items are waited for while there are more than max_pending of
+        them, unless it is None.
+        """
+        while pending:
+            future, lines = pending[0]
+            if future is not None:
+                if not future.done() and (
+                    max_pending is None or len(pending) <= max_pending
+                ):
+                    return
+                if not future.done() or prefetcher is not None:
+                    # The file is still being searched, or it is searched
+                    # when the prefetched reader is ready
+                    renderer.flush_pending()
+                lines = lines(future.result())
+            pending.popleft()
+            write_lines(lines)
+            if limit_reached:
+                raise MatchLimitReached
+
+    def count_matches(file_path, search_func, result: FileResult) -> FileResult:
+        """Counts the matches of the file toward max_total.
 
-    def check_file(root, file_path, search_func, only_matches=False):
-        file_path = os.path.join(root, file)
-        match_output = ""
+        If the number of matches is not known, or the file has more matches
+        than can still be printed, the file is searched again for only those,
+        reusing the encoding detected in the first search.
+        """
+        nonlocal total_matches, limit_reached
+        if max_total is None:
+            return result
+        remaining = max_total - total_matches
+        if result.match_count is None or result.match_count > remaining:
+            result = search_file(
+                file_path,
+                with_max_count(search_func, remaining),
+                search_string,
+                whole_line,
+                columns,
+                FileReader(file_path, result.encoding),
+            )
+        total_matches += result.match_count
+        limit_reached = total_matches >= max_total
+        return result
+
+    def get_file_output(file_path, columns, only_matches, result: FileResult):
+        if files_with_matches:
+            return get_file_names(file_path, result)
+        if jsonl:
+            return get_file_records(file_path, result)
+        lines = []
+        if result.error:
+            lines.append(result.error)
+        if result.binary:
+            if not quiet:
+                lines.append(
+                    get_indented_str(
+                        f"{Fore.RED}Skipping file: {Fore.YELLOW}"
+                        f"{file_path} {Fore.WHITE}(probably binary)"
+                        f"{Style.RESET_ALL}",
+                        INDENT_LEVEL_FILE_FIRST_LINE,
+                        INDENT_LEVEL_FILE_NEXT_LINES,
+                        columns,
+                    )
+                )
+            return lines
+        if not only_matches or (only_matches and result.match_output):
+            lines.append(
+                get_indented_str(
+                    f"{Fore.BLUE}Checking file: {Fore.YELLOW}"
+                    f"{file_path}{Style.RESET_ALL}",
+                    INDENT_LEVEL_FILE_FIRST_LINE,
+                    INDENT_LEVEL_FILE_NEXT_LINES,
+                    columns,
+                )
+            )
+            if result.match_output:
+                lines.append(result.match_output)
+        return lines
+
+    def get_file_names(file_path, result: FileResult):
+        lines = []
+        if result.error and jsonl:
+            lines.append(jsonl_record("error", file_path, message=result.error))
+        elif result.error:
+            lines.append(result.error)
+        if result.binary or result.match_count == 0:
+            return lines
+        lines.append(jsonl_record("file", file_path) if jsonl else file_path)
+        return lines
+
+    def get_file_records(file_path, result: FileResult):
+        records = []
+        if result.error:
+            records.append(
+                jsonl_record("error", file_path, message=result.error)
+            )
+        if result.binary:
+            if not quiet:
+                records.append(jsonl_record("skip", file_path, reason="binary"))
+        elif result.match_output:
+            records.append(result.match_output)
+        return records
+
+    def add_stats(file_path, result: FileResult):
+        if result.binary:
+            # Only the contents searched count in the throughput
+            stats.skipped_binary += 1
+            if result.timings is not None:
+                stats.add_times(result.timings)
+            return
+        if result.timings is None:
+            return
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                match_output = search_func(search_string, f, whole_line)
-        except KeyboardInterrupt:
-            pass
-        except OSError as e:
-            print(f"ERROR reading {file_path}: {e}")
-        if not only_matches or (only_matches and match_output):
-            print_indented(
-                f"{Fore.BLUE}Checking file: {Fore.YELLOW}"
-                f"{file_path}{Style.RESET_ALL}",
-                INDENT_LEVEL_FILE_FIRST_LINE,
-                INDENT_LEVEL_FILE_NEXT_LINES,
+            size = os.stat(file_path).st_size
+        except OSError:
+            size = 0
+        stats.add_file(file_path, size, result.timings)
+
+    def check_file(file_path, search_func, only_matches=False):
+        if max_total is not None:
+            # No file can add more matches than can still be printed
+            search_func = with_max_count(search_func, max_total - total_matches)
+        # A large file is searched in this process, in chunks searched by the
+        # worker processes
+        split = splitter is not None and splitter.should_split(file_path)
+        file_search_func = search_func
+        if split:
+            file_search_func = functools.partial(search_func, splitter=splitter)
+        render = functools.partial(
+            get_file_output, file_path, columns, only_matches
+        )
+        if max_total is not None:
+
+            def count_and_render(result: FileResult, render=render):
+                return render(
+                    count_matches(file_path, file_search_func, result)
+                )
+
+            render = count_and_render
+        if stats is not None:
+            timed_render = stats.timed(PHASE_RENDER, render)
+
+            def add_stats_and_render(result: FileResult):
+                add_stats(file_path, result)
+                return timed_render(result)
+
+            render = add_stats_and_render
+        if index_filter is not None:
+            verdict = index_filter.check(file_path)
+            if verdict in (trigram_index.NO_MATCH, trigram_index.BINARY):
+                emit(render(FileResult(binary=verdict == trigram_index.BINARY)))
+                return
+        if result_cache is not None:
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                stat_result = None
+            if stat_result is not None:
+                query = get_cache_query(
+                    search_func, search_string, whole_line, columns
+                )
+                cached = result_cache.get(file_path, stat_result, query)
+                if cached is not None:
+                    binary, match_output = cached
+                    # The number of matches is not stored, but a file
+                    # without output has none
+                    match_count = None if match_output else 0
+                    emit(
+                        render(
+                            FileResult(
+                                binary, match_output, match_count=match_count
+                            )
+                        )
+                    )
+                    return
+
+                def store_and_render(result: FileResult, render=render):
+                    if not result.error:
+                        result_cache.put(
+                            file_path,
+                            stat_result,
+                            query,
+                            result.binary,
+                            result.match_output,
+                        )
+                    return render(result)
+
+                render = store_and_render
+        if split:
+            renderer.flush_pending()
+            future = concurrent.futures.Future()
+            future.set_result(
+                search_file(
+                    file_path,
+                    file_search_func,
+                    search_string,
+                    whole_line,
+                    columns,
+                    timed=stats is not None,
+                )
+            )
+            pending.append((future, render))
+            print_pending(max_pending=jobs * PENDING_RESULTS_PER_JOB)
+            return
+        if executor is not None:
+            future = executor.submit(
+                search_file,
+                file_path,
+                search_func,
+                search_string,
+                whole_line,
+                columns,
+                timed=stats is not None,
+            )
+            pending.append((future, render))
+            # Keep the number of results waiting to be printed bounded
+            print_pending(max_pending=jobs * PENDING_RESULTS_PER_JOB)
+            return
+        write_func = search_func
+        if jsonl and result_cache is None and not files_with_matches:
+            # The records are written as soon as they are found
+            write_func = functools.partial(search_func, write=renderer.write)
+        if prefetcher is not None:
+            # The file is searched when it has been read and the files before
+            # it have been printed
+            search = functools.partial(
+                search_file,
+                file_path,
+                write_func,
+                search_string,
+                whole_line,
+                columns,
+                timed=stats is not None,
+            )
+            pending.append(
+                (
+                    prefetcher.submit(file_path),
+                    lambda reader: render(search(reader=reader)),
+                )
+            )
+            print_pending(max_pending=prefetcher.max_files)
+            return
+        renderer.flush_pending()
+        try:
+            result = search_file(
+                file_path,
+                write_func,
+                search_string,
+                whole_line,
                 columns,
+                timed=stats is not None,
+            )
+        except KeyboardInterrupt:
+            # The search was interrupted, so the result is not stored
+            emit(
+                get_file_output(
+                    file_path, columns, only_matches, FileResult()
+                )
             )
-            if match_output:
-                print(match_output)
+            return
+        emit(render(result))
 
-    if skip_prefixes is not None:
-        skip_prefixes = tuple(skip_prefixes)
-    if file_suffixes is not None:
-        file_suffixes = tuple(file_suffixes)
-    sub_dirs_to_skip = []
+    skip_prefixes = tuple(skip_prefixes or ())
+    file_suffixes = tuple(file_suffixes or ())
+
+    if jobs > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=init_worker, initargs=(no_ansi,)
+        )
+        prefetcher = None
+        if split_size is not None:
+            splitter = ChunkSplitter(executor, jobs, split_size)
+
+    walk = walk_directories(base_directory, skip_prefixes)
+    if stats is not None:
+        walk = stats.timed_iter(walk, PHASE_WALK)
 
     try:
-        for root, dirs, files in os.walk(base_directory):
+        for root, files, skipped in walk:
             time.sleep(0)  # Give Python a chance to process Ctrl+C
-            dirs.sort()
-            files.sort()
-            columns = get_terminal_width()
-            # Skip folders that don't start with any of the skip_prefixes
-            if skip_prefixes is not None and len(skip_prefixes) > 0:
-                if os.path.basename(root).startswith(skip_prefixes):
-                    sub_dirs_to_skip.extend(dirs)
-                    if not quiet:
-                        print_indented(
-                            f"{Fore.RED}Skipping folder: {Fore.YELLOW}"
-                            f"{root}{Style.RESET_ALL}",
+            columns = renderer.columns
+            # Skipped folders are not listed, so nothing in them is visited
+            if skipped and stats is not None:
+                stats.skipped_by_prefix += 1
+            if skipped:
+                if not quiet and jsonl:
+                    emit([jsonl_record("skip", root, reason="folder")])
+                elif not quiet:
+                    emit(
+                        [
+                            get_indented_str(
+                                f"{Fore.RED}Skipping folder: {Fore.YELLOW}"
+                                f"{root}{Style.RESET_ALL}",
+                                INDENT_LEVEL_FOLDER_FIRST_LINE,
+                                INDENT_LEVEL_FOLDER_NEXT_LINES,
+                                columns,
+                            )
+                        ]
+                    )
+                continue
+            if not jsonl and not files_with_matches:
+                emit(
+                    [
+                        get_indented_str(
+                            f"{Fore.GREEN}Checking folder: {Fore.YELLOW}{root}"
+                            f"{Style.RESET_ALL}",
                             INDENT_LEVEL_FOLDER_FIRST_LINE,
                             INDENT_LEVEL_FOLDER_NEXT_LINES,
                             columns,
                         )
-                    continue
-                elif os.path.basename(root) in sub_dirs_to_skip:
-                    sub_dirs_to_skip.remove(os.path.basename(root))
-                    sub_dirs_to_skip.extend(dirs)
-                    continue
-            print_indented(
-                f"{Fore.GREEN}Checking folder: {Fore.YELLOW}{root}"
-                f"{Style.RESET_ALL}",
-                INDENT_LEVEL_FOLDER_FIRST_LINE,
-                INDENT_LEVEL_FOLDER_NEXT_LINES,
-                columns,
-            )
+                    ]
+                )
 
-            for file in files:
+            for entry in files:
                 time.sleep(0)  # Give Python a chance to process Ctrl+C
-                file_path = os.path.join(root, file)
-                if is_binary(open(file_path, "rb").read(2048)):
-                    if not quiet:
-                        print_indented(
-                            f"{Fore.RED}Skipping file: {Fore.YELLOW}"
-                            f"{file_path} {Fore.WHITE}(probably binary)"
-                            f"{Style.RESET_ALL}",
+                # The suffix is checked before the file is opened
+                if file_suffixes and not entry.name.endswith(file_suffixes):
+                    if stats is not None:
+                        stats.skipped_by_suffix += 1
+                    if not quiet and jsonl:
+                        emit(
+                            [jsonl_record("skip", entry.path, reason="suffix")]
+                        )
+                    elif not quiet:
+                        emit(
+                            [
+                                get_indented_str(
+                                    f"{Fore.RED}Skipping file: {Fore.YELLOW}"
+                                    f"{entry.path}{Style.RESET_ALL}",
+                                    INDENT_LEVEL_FILE_FIRST_LINE,
+                                    INDENT_LEVEL_FILE_NEXT_LINES,
+                                    columns,
+                                )
+                            ]
+                        )
+                    continue
+                check_file(entry.path, search_func, quieter)
+        print_pending(max_pending=0)
+        completed = True
+    except (KeyboardInterrupt, MatchLimitReached):
+        pass
+    finally:
+        # Unless all the work is done, the workers may be busy searching,
+        # and as they ignore SIGINT, the interpreter would wait for them
+        if executor is not None and completed:
+            executor.shutdown()
+        elif executor is not None:
+            terminate_workers(executor)
+        renderer.flush()
+        if stats is not None:
+            stats.stop()
+    return limit_reached
+
+
+def get_cache_query(search_func, search_string, whole_line, columns) -> str:
+    """Returns the query a search is stored in a ResultCache with.
+
+    The query covers everything the output of search_func depends on besides
+    the file: the search mode and its options (the keyword arguments bound
+    to search_func with functools.partial), the search string(s), whole_line,
+    the width the output is wrapped to, and whether ANSI codes are used.
+    """
+    options = {}
+    if isinstance(search_func, functools.partial):
+        search_func, options = search_func.func, search_func.keywords
+    return json.dumps(
+        [
+            search_func.__name__,
+            options,
+            search_string,
+            whole_line,
+            columns,
+            Style.RESET_ALL != "",
+        ]
+    )
+
+
+def follow_directories(
+    follower: LogFollower,
+    search_string,
+    whole_line,
+    search_func,
+    renderer: OutputRenderer,
+    poll_interval: float = POLL_INTERVAL,
+    output_format: str = OUTPUT_TEXT,
+):
+    """Searches the lines appended to the followed files until interrupted.
+
+    The follower is polled every poll_interval seconds, and the new lines of
+    each file are searched with search_func. Only the files with matches are
+    printed, and the output is flushed after every poll.
+
+    Args:
+        follower: A LogFollower whose snapshot() has been taken.
+        search_string: String/regexp to search for.
+        whole_line: Passed on to search_func.
+        search_func: Function to use for searching the files.
+        renderer: The OutputRenderer the output is written with.
+        poll_interval: Seconds to wait between the polls.
+        output_format: OUTPUT_TEXT or OUTPUT_JSONL (see
+            traverse_directories()).
+    """
+    try:
+        while True:
+            time.sleep(poll_interval)
+            columns = renderer.columns
+            for reader in follower.poll():
+                try:
+                    with reader:
+                        if reader.encoding() is None:
+                            continue
+                        output = search_func(
+                            search_string, reader, whole_line, columns
+                        )
+                except DECOMPRESSION_ERRORS as e:
+                    error = f"ERROR reading {reader.file_path}: {e}"
+                    if output_format == OUTPUT_JSONL:
+                        error = jsonl_record(
+                            "error", reader.file_path, message=error
+                        )
+                    renderer.write(error)
+                    continue
+                if output and output_format == OUTPUT_JSONL:
+                    renderer.write(output)
+                elif output:
+                    renderer.write(
+                        get_indented_str(
+                            f"{Fore.BLUE}Checking file: {Fore.YELLOW}"
+                            f"{reader.file_path}{Style.RESET_ALL}",
                             INDENT_LEVEL_FILE_FIRST_LINE,
                             INDENT_LEVEL_FILE_NEXT_LINES,
                             columns,
                         )
-                    continue
-                if file_suffixes is not None and len(file_suffixes) > 0:
-                    if file.endswith(file_suffixes):
-                        check_file(root, file, search_func, quieter)
-                    else:
-                        if not quiet:
-                            print_indented(
-                                f"{Fore.RED}Skipping file: {Fore.YELLOW}"
-                                f"{file_path}{Style.RESET_ALL}",
-                                INDENT_LEVEL_FILE_FIRST_LINE,
-                                INDENT_LEVEL_FILE_NEXT_LINES,
-                                columns,
-                            )
-                else:
-                    check_file(root, file, search_func, quieter)
+                    )
+                    renderer.write(output)
+            renderer.flush()
     except KeyboardInterrupt:
         pass
+    finally:
+        renderer.flush()
 
 
 def color_matches(string, matches):
@@ -187,79 +777,342 @@ def color_matches(string, matches):
     return string
 
 
-def find_folders_with_string(search_string: str, file: TextIO, _) -> str:
-    columns = get_terminal_width()
-    output = ""
-    for i, line in enumerate(file):
-        if search_string in line:
-            output += get_indented_str(
-                f"Found on line {i+1}: "
-                f"{color_matches(line.strip(), [search_string])}"
+def jsonl_record(record_type: str, path: str, **fields) -> str:
+    """Returns a record of the JSON Lines output (--output jsonl).
+
+    Every record has a "type" ("match", "file", "skip" or "error") and the
+    "path" of the file or folder it is about, followed by the given fields.
+    """
+    return json.dumps({"type": record_type, "path": path, **fields})
+
+
+def find_folders_with_string(
+    search_string: str | tuple[str, ...],
+    reader: FileReader,
+    _,
+    columns: int | None = None,
+    *,
+    max_count: int | None = None,
+) -> str:
+    """Searches the file for the first line containing search_string.
+
+    The file is searched for search_string encoded into the encoding of the
+    file as bytes (see find_first_lines()). Only the line of the first match
+    is decoded for the output, which is wrapped to columns characters unless
+    it is None.
+
+    If search_string is a tuple of strings, the first line containing each
+    of them is searched for, and the output has a line for each string
+    found, in the order of the lines, with the id (index) of the string.
+    Only the first max_count of them are listed (all if it is None).
+    """
+    search_strings = search_string
+    if isinstance(search_string, str):
+        search_strings = (search_string,)
+    lines = []
+    found_lines = find_first_lines(search_strings, reader)[:max_count]
+    reader.match_count = len(found_lines)
+    for pattern_id, line_number, line in found_lines:
+        found = f"Found pattern {pattern_id}"
+        if isinstance(search_string, str):
+            found = "Found"
+        lines.append(
+            get_indented_str(
+                f"{found} on line {line_number}: "
+                f"{color_matches(line.strip(), [search_strings[pattern_id]])}"
                 f"{ERASE_TO_THE_END_OF_LINE}",
                 INDENT_LEVEL_MATCH_FIRST_LINE,
                 INDENT_LEVEL_MATCH_NEXT_LINES,
                 columns,
             )
-            break
-    return output
+        )
+    return "\n".join(lines)
+
+
+def find_first_lines(
+    search_strings: tuple[str, ...], reader: FileReader
+) -> list[tuple[int, int, str]]:
+    """Finds the first line containing each of search_strings.
+
+    The strings are encoded into the encoding of the file (see
+    FileReader.encoding()), and the strings that cannot be encoded into it
+    are not searched for. The file is mapped into memory and searched as a
+    whole (see find_first_occurrences()). A compressed file is decompressed
+    as a stream and searched in windows of whole lines instead, and so is a
+    file in UTF-16 or UTF-32, whose strings are found only at the starts of
+    code units (see text_encodings).
+
+    Returns:
+        Tuples of the id (index) of the string, the number of the line and
+        the decoded line, in the order of the first occurrences.
+    """
+    encoding = reader.encoding() or "utf-8"
+    # The ids of the strings that can be encoded, by their ids in patterns
+    pattern_ids = []
+    patterns = []
+    for pattern_id, string in enumerate(search_strings):
+        pattern = text_encodings.encode(string, encoding)
+        if pattern is not None:
+            pattern_ids.append(pattern_id)
+            patterns.append(pattern)
+    patterns = tuple(patterns)
+    if not patterns:
+        return []
+    occurrences = []  # Tuples of the offset and the id of each occurrence
+    lines = {}
+    if not text_encodings.is_ascii_compatible(encoding):
+        for window, offset, newlines_before in (
+            text_encodings.read_code_unit_windows(reader.binary(), encoding)
+        ):
+            for pattern_id, pattern in enumerate(patterns):
+                if pattern_id in lines:
+                    continue
+                position = text_encodings.find_aligned(
+                    window, pattern, encoding
+                )
+                if position != -1:
+                    line_number = (
+                        reader.lines_before
+                        + newlines_before
+                        + text_encodings.count_newlines(
+                            window[:position], encoding
+                        )
+                        + 1
+                    )
+                    lines[pattern_id] = line_number, text_encodings.get_line(
+                        window, position, encoding
+                    )
+                    occurrences.append((offset + position, pattern_id))
+            if len(lines) == len(patterns):
+                break
+        occurrences.sort()
+    elif reader.compression is None or reader.is_whole_file_read():
+        with reader.buffer() as buffer:
+            found = find_first_occurrences(buffer, patterns)
+            line_number, line_start = reader.lines_before + 1, 0
+            for position, pattern_id in sorted(
+                (position, pattern_id) for pattern_id, position in found.items()
+            ):
+                line_number += count_newlines(buffer, position, line_start)
+                line_start = position
+                line = get_line(buffer, position)
+                lines[pattern_id] = line_number, line
+                occurrences.append((position, pattern_id))
+    else:
+        overlap = max(max(map(len, patterns)) - 1, 0)
+        for window, offset, newlines_before in read_line_windows(
+            reader.stream(), overlap
+        ):
+            found = find_first_occurrences(window, patterns)
+            for pattern_id, position in found.items():
+                if pattern_id not in lines:
+                    line_number = (
+                        reader.lines_before
+                        + newlines_before
+                        + count_newlines(window, position)
+                        + 1
+                    )
+                    lines[pattern_id] = line_number, get_line(window, position)
+                    occurrences.append((offset + position, pattern_id))
+            if len(lines) == len(patterns):
+                break
+        occurrences.sort()
+    return [
+        (
+            pattern_ids[pattern_id],
+            lines[pattern_id][0],
+            lines[pattern_id][1].decode(encoding, errors="ignore"),
+        )
+        for _, pattern_id in occurrences
+    ]
+
+
+def find_matching_lines_in_file(
+    search_string: str | tuple[str, ...],
+    reader: FileReader,
+    splitter: ChunkSplitter | None = None,
+) -> Iterator[MatchingLine]:
+    """Yields the lines of the file with matches of the regular
+    expression(s), in the encoding of the file (see
+    find_matching_lines_in_bytes()).
+
+    If splitter is given and the file can be split (see
+    ChunkSplitter.can_split()), the file is searched in chunks by the worker
+    processes of splitter at the same time.
+    """
+    encoding = reader.encoding() or "utf-8"
+    if splitter is not None and splitter.can_split(reader, encoding):
+        return find_matching_lines_in_chunks(
+            search_string, reader, encoding, splitter
+        )
+    return find_matching_lines_in_bytes(
+        search_string, reader.binary(), encoding
+    )
+
+
+def could_contain_match(
+    search_string: str | tuple[str, ...], reader: FileReader
+) -> bool:
+    """Checks whether the file contains the literals every match of the
+    regular expression(s) must contain, encoded into the encoding of the
+    file, without decoding it.
+
+    Compressed files cannot be checked as a whole without decompressing them,
+    so only their chunks are checked (see find_matching_lines_in_bytes()).
+    """
+    prefilter = get_prefilter(search_string)
+    if prefilter.literals is not None and (
+        reader.compression is None or reader.is_whole_file_read()
+    ):
+        with reader.buffer() as buffer:
+            return prefilter.could_match_encoded(
+                buffer, reader.encoding() or "utf-8"
+            )
+    return True
+
+
+class MatchSummary:
+    """The occurrences of a match in a file, for the --regexp summary.
+
+    The line numbers are kept in an array of unsigned ints, which takes 4
+    bytes per occurrence, instead of a list, which takes a pointer and
+    possibly an int object per occurrence.
+
+    Attributes:
+        number_of_occurrences: Number of occurrences of the match.
+        line_numbers: Numbers of the lines of the first occurrences, or None
+            if line numbers are not kept (--count-only).
+        pattern_id: Id of the pattern that matched, or None if there is only
+            one pattern.
+    """
+
+    __slots__ = ("number_of_occurrences", "line_numbers", "pattern_id")
+
+    def __init__(
+        self, pattern_id: int | None = None, keep_line_numbers: bool = True
+    ):
+        self.number_of_occurrences = 0
+        self.line_numbers = array.array("I") if keep_line_numbers else None
+        self.pattern_id = pattern_id
+
+    def to_json(self) -> dict:
+        """Returns the summary as it is shown in the JSON output.
+
+        The line numbers left out because of --max-line-numbers are counted
+        in "omitted_line_numbers".
+        """
+        summary = {"number_of_occurrences": self.number_of_occurrences}
+        if self.line_numbers is not None:
+            summary["line_numbers"] = self.line_numbers.tolist()
+            omitted = self.number_of_occurrences - len(self.line_numbers)
+            if omitted:
+                summary["omitted_line_numbers"] = omitted
+        if self.pattern_id is not None:
+            summary["pattern_id"] = self.pattern_id
+        return summary
 
 
 def regex_search_with_string(
-    search_string: str, file: TextIO, whole_line: bool
+    search_string: str | tuple[str, ...],
+    reader: FileReader,
+    whole_line: bool,
+    columns: int | None = None,
+    *,
+    max_line_numbers: int | None = None,
+    count_only: bool = False,
+    max_count: int | None = None,
+    splitter: ChunkSplitter | None = None,
 ) -> str:
-    columns = get_terminal_width()
-    output = ""
+    """Searches the file for the matches of the regular expression
+    search_string, or of each of the patterns in a tuple of patterns.
 
-    class Match(TypedDict):
-        number_of_occurrences: int
-        line_numbers: list[int]
+    The output lists the matches with the numbers of the lines they are on, or
+    with --whole-line, the matching lines. With several patterns, each match
+    also has the id of the pattern that matched (its index in the tuple).
+    Only the first max_line_numbers line numbers of each match are listed
+    (all if it is None), and with count_only, only the numbers of
+    occurrences (or with --whole-line, the number of matching lines). The
+    file is read only until max_count matches have been found (to the end if
+    it is None). If splitter is given, a large file may be searched in
+    chunks in parallel (see find_matching_lines_in_file()).
+    """
+    reader.match_count = 0
+    # A file searched in chunks is not scanned as a whole for the literals
+    # first, as the chunks are checked by the worker processes
+    if splitter is None and not could_contain_match(search_string, reader):
+        return ""
+    output = ""
+    if max_line_numbers is None:
+        max_line_numbers = sys.maxsize
+    if max_count is None:
+        max_count = sys.maxsize
 
-    def get_whole_lines(matches: dict[str, Match]):
+    def get_whole_lines(matches: dict[str, MatchSummary]):
         local_output = get_indented_str(
             f"{Fore.GREEN}{len(matches)} line(s) found:" f"{Style.RESET_ALL}",
             INDENT_LEVEL_MATCH_FIRST_LINE,
             INDENT_LEVEL_MATCH_NEXT_LINES,
             columns,
         )
-        for match in matches:
-            line_number = str(matches[match]["line_numbers"][0])
+        if count_only:
+            return local_output
+        for match, summary in matches.items():
+            prefix = f"{summary.line_numbers[0]}: "
+            if summary.pattern_id is not None:
+                prefix = (
+                    f"{summary.line_numbers[0]} "
+                    f"(pattern {summary.pattern_id}): "
+                )
             local_output += "\n" + get_indented_str(
-                f"{line_number}: {match}{ERASE_TO_THE_END_OF_LINE}",
+                f"{prefix}{match}{ERASE_TO_THE_END_OF_LINE}",
                 INDENT_LEVEL_MATCH_FIRST_LINE,
-                INDENT_LEVEL_MATCH_FIRST_LINE + (len(line_number) + 2),
+                INDENT_LEVEL_MATCH_FIRST_LINE + len(prefix),
                 columns,
             )
         return local_output
 
-    pattern = re.compile(search_string)
-    matches: Dict[str, Match] = {}
-    for i, line in enumerate(file):
-        new_matches = pattern.findall(line)
-        line_number = i + 1
-        if new_matches:
-            if whole_line:
-                match_string = color_matches(line.strip(), new_matches)
-                matches[match_string] = {
-                    "number_of_occurrences": len(new_matches),
-                    "line_numbers": [line_number],
-                }
-                continue
-            else:
-                for match in new_matches:
-                    if match not in matches:
-                        matches[match] = {
-                            "number_of_occurrences": 1,
-                            "line_numbers": [line_number],
-                        }
-                    else:
-                        matches[match]["number_of_occurrences"] += 1
-                        matches[match]["line_numbers"].append(line_number)
+    # With several patterns, the matches are tuples of a pattern id and a match
+    multiple_patterns = not isinstance(search_string, str)
+    matches: Dict[str, MatchSummary] = {}
+    for line_number, line, new_matches in find_matching_lines_in_file(
+        search_string, reader, splitter
+    ):
+        line_number += reader.lines_before
+        pattern_ids = [None] * len(new_matches)
+        if multiple_patterns:
+            pattern_ids, new_matches = zip(*new_matches)
+        # Only the matches up to max_count are kept
+        new_matches = new_matches[: max_count - reader.match_count]
+        reader.match_count += len(new_matches)
+        if whole_line:
+            match_string = color_matches(line.strip(), new_matches)
+            summary = MatchSummary(pattern_ids[0], not count_only)
+            summary.number_of_occurrences = len(new_matches)
+            if not count_only:
+                summary.line_numbers.append(line_number)
+            matches[match_string] = summary
+        else:
+            for pattern_id, match in zip(pattern_ids, new_matches):
+                summary = matches.get(match)
+                if summary is None:
+                    summary = MatchSummary(pattern_id, not count_only)
+                    matches[match] = summary
+                summary.number_of_occurrences += 1
+                if (
+                    not count_only
+                    and len(summary.line_numbers) < max_line_numbers
+                ):
+                    summary.line_numbers.append(line_number)
+        if reader.match_count >= max_count:
+            break
 
     if len(matches) > 0:
         if whole_line:
             output += get_whole_lines(matches)
         else:
-            matches_string = f"Matches: {json.dumps(matches)}"
+            matches_string = (
+                f"Matches: {json.dumps(matches, default=MatchSummary.to_json)}"
+            )
             output += get_indented_str(
                 matches_string,
                 INDENT_LEVEL_MATCH_FIRST_LINE,
@@ -269,7 +1122,263 @@ def regex_search_with_string(
     return output
 
 
+def find_strings_jsonl(
+    search_string: str | tuple[str, ...],
+    reader: FileReader,
+    _,
+    columns: int | None = None,
+    write: Callable[[str], None] | None = None,
+    *,
+    max_count: int | None = None,
+) -> str:
+    """Searches the file like find_folders_with_string(), but gives the
+    output as JSON Lines.
+
+    There is a "match" record for the first line containing each string,
+    with the number of the line, the line and the string, and with several
+    strings, the id of the string. If write is given, each record is written
+    with it as soon as it is found, and an empty string is returned.
+    Otherwise the records are returned as lines.
+    """
+    del columns  # JSON Lines are not wrapped to the terminal width
+    records = []
+    if write is None:
+        write = records.append
+    search_strings = search_string
+    if isinstance(search_string, str):
+        search_strings = (search_string,)
+    found_lines = find_first_lines(search_strings, reader)[:max_count]
+    reader.match_count = len(found_lines)
+    for pattern_id, line_number, line in found_lines:
+        fields = {
+            "line_number": line_number,
+            "line": line.rstrip("\r"),
+            "match": search_strings[pattern_id],
+        }
+        if not isinstance(search_string, str):
+            fields["pattern_id"] = pattern_id
+        write(jsonl_record("match", reader.file_path, **fields))
+    return "\n".join(records)
+
+
+def regex_search_jsonl(
+    search_string: str | tuple[str, ...],
+    reader: FileReader,
+    whole_line: bool,
+    columns: int | None = None,
+    write: Callable[[str], None] | None = None,
+    *,
+    count_only: bool = False,
+    max_count: int | None = None,
+    splitter: ChunkSplitter | None = None,
+) -> str:
+    """Searches the file like regex_search_with_string(), but gives the
+    output as JSON Lines.
+
+    There is a "match" record for each match (unless count_only is set),
+    with the number of the line and the match as re.findall() returns it,
+    with several patterns the id of the pattern, and with whole_line the
+    line. The matches of a file are followed by a "file" record with the
+    number of matches. The file is read only until max_count matches have
+    been found (to the end if it is None). If write is given, each record is
+    written with it as soon as it is found, and an empty string is returned,
+    so that the matches of the file are never held in memory. Otherwise the
+    records are returned as lines.
+    """
+    del columns  # JSON Lines are not wrapped to the terminal width
+    records = []
+    if write is None:
+        write = records.append
+    reader.match_count = 0
+    # A file searched in chunks is not scanned as a whole for the literals
+    # first, as the chunks are checked by the worker processes
+    if splitter is None and not could_contain_match(search_string, reader):
+        return ""
+    if max_count is None:
+        max_count = sys.maxsize
+    multiple_patterns = not isinstance(search_string, str)
+    number_of_matches = 0
+    for line_number, line, matches in find_matching_lines_in_file(
+        search_string, reader, splitter
+    ):
+        matches = matches[: max_count - number_of_matches]
+        number_of_matches += len(matches)
+        if not count_only:
+            fields = {"line_number": line_number + reader.lines_before}
+            if whole_line:
+                fields["line"] = line.rstrip("\n")
+            for match in matches:
+                if multiple_patterns:
+                    fields["pattern_id"], match = match
+                fields["match"] = match
+                write(jsonl_record("match", reader.file_path, **fields))
+        if number_of_matches >= max_count:
+            break
+    reader.match_count = number_of_matches
+    if number_of_matches:
+        write(
+            jsonl_record(
+                "file", reader.file_path, number_of_matches=number_of_matches
+            )
+        )
+    return "\n".join(records)
+
+
+def find_files_with_matches(
+    search_string: str | tuple[str, ...],
+    reader: FileReader,
+    _,
+    columns: int | None = None,
+    *,
+    mode: str = MODE_LITERAL,
+    max_count: int | None = None,
+) -> str:
+    """Searches the file for its first match, for --files-with-matches.
+
+    The file is searched with the search of iter_matches() (see
+    matches.get_file_searcher()) in mode, and only until the first match is
+    found. The output is the path of the file if it has a match, and empty
+    otherwise, so that a cached result also tells whether the file has
+    matches. Any max_count allows the single match.
+    """
+    del columns, max_count  # Only the path of the file is printed
+    matches = get_file_searcher(search_string, mode)(reader)
+    found = next(matches, None) is not None
+    matches.close()
+    reader.match_count = int(found)
+    return reader.file_path if found else ""
+
+
+def index_main(argv):
+    """Runs the index subcommand with the command line arguments in argv."""
+    parser = argparse.ArgumentParser(
+        prog="find-from-files index",
+        description="""
+            Builds and updates a trigram index of the files under
+            <base_directory>. Searches made with the --index flag use the
+            index for opening only the files that can contain a match. Files
+            that have changed since the index was built or updated are always
+            searched.
+        """,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser(
+        "build", help="Build the index of a directory."
+    )
+    update_parser = subparsers.add_parser(
+        "update",
+        help="Re-index the files that have changed since the index was built "
+        "or updated.",
+    )
+    compact_parser = subparsers.add_parser(
+        "compact",
+        help="Merge the segments added by updates. This is done "
+        "automatically in the background when needed.",
+    )
+    for subparser in (build_parser, update_parser, compact_parser):
+        subparser.add_argument(
+            "base_directory", help="Directory the index is of."
+        )
+        subparser.add_argument(
+            "--index-file",
+            default=None,
+            help="Path of the index file. Defaults to a file in "
+            f"{CACHE_DIRECTORY}.",
+        )
+    for subparser in (build_parser, update_parser):
+        subparser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of worker processes used for reading the files.",
+        )
+
+    args = parser.parse_args(argv)
+    index_path = args.index_file or trigram_index.default_index_path(
+        args.base_directory
+    )
+    if args.command == "build":
+        if args.jobs == 0:
+            args.jobs = os.cpu_count() or 1
+        file_count, trigram_count = trigram_index.build_index(
+            args.base_directory, index_path, args.jobs
+        )
+        print(
+            f"Indexed {file_count} files ({trigram_count} trigrams) into "
+            f"{index_path}"
+        )
+        return
+
+    try:
+        if args.command == "update":
+            if args.jobs == 0:
+                args.jobs = os.cpu_count() or 1
+            result = trigram_index.update_index(index_path, args.jobs)
+            print(
+                f"Updated {index_path}: {result.added} added, "
+                f"{result.changed} changed, {result.appended} appended, "
+                f"{result.deleted} deleted, {result.unchanged} unchanged "
+                f"({result.bytes_indexed} bytes indexed)"
+            )
+        elif trigram_index.compact_index(index_path):
+            print(f"Compacted {index_path}")
+        else:
+            print(f"{index_path} was changed during compaction, try again")
+    except (OSError, ValueError) as e:
+        print(f"Cannot use the index: {e}")
+        exit(1)
+
+
+def describe_search_plan(search_string: str | tuple[str, ...], regexp: bool):
+    """Describes how the files are going to be searched (--debug-plan).
+
+    Returns:
+        The lines of the description.
+    """
+    patterns = (
+        [search_string] if isinstance(search_string, str) else search_string
+    )
+    if not regexp:
+        if len(patterns) >= LITERAL_SET_MIN_PATTERNS:
+            return [
+                f"Engine: one regex of the trie of {len(patterns)} literals"
+            ]
+        return [f"Engine: bytes.find() for {len(patterns)} literal(s)"]
+
+    combined = search_string
+    if not isinstance(search_string, str):
+        combined = combine_patterns(search_string)
+    if combined is None:
+        plan = ["Engine: each regex separately, line by line"]
+    elif matches_within_lines(combined):
+        plan = ["Engine: regex over whole chunks of text"]
+    else:
+        plan = ["Engine: regex line by line"]
+    scope = bytes_search_scope(search_string)
+    if scope == BYTES_UTF8:
+        plan.append("Decoding: only the matching lines")
+    elif scope == BYTES_ASCII:
+        plan.append("Decoding: only the matching lines of ASCII chunks")
+    else:
+        plan.append("Decoding: whole chunks")
+    prefilter = get_prefilter(search_string)
+    if prefilter.literals is None:
+        plan.append("Prefilter: none (no required literals)")
+    else:
+        for pattern_id, literals in enumerate(prefilter.literals):
+            description = ", ".join(repr(literal) for literal in literals)
+            if len(prefilter.literals) > 1:
+                description = f"pattern {pattern_id}: {description}"
+            plan.append(f"Prefilter: bytes.find() for {description}")
+    return plan
+
+
 def main():
+    if sys.argv[1:2] == ["index"]:
+        index_main(sys.argv[2:])
+        return
+
     version_string = "Package find-from-files not found."
     try:
         version_string = (
@@ -299,7 +1408,27 @@ def main():
     parser.add_argument(
         "base_directory", help="Base directory to start the " "search from."
     )
-    parser.add_argument("search_string", help="String/regex to search for.")
+    parser.add_argument(
+        "search_string",
+        nargs="?",
+        default=None,
+        help="String/regex to search for. Can be left out if the patterns are "
+        "given with -e or --patterns-file.",
+    )
+    parser.add_argument(
+        "-e",
+        "--pattern",
+        action="append",
+        default=None,
+        help="Another string/regex to search for. Can be given several times. "
+        "The matches are reported with the id of the pattern that matched.",
+    )
+    parser.add_argument(
+        "--patterns-file",
+        default=None,
+        help="File containing strings/regexes to search for, one per line. "
+        "Empty lines are ignored.",
+    )
     parser.add_argument(
         "-l",
         "--whole-line",
@@ -313,6 +1442,47 @@ def main():
         action="store_true",
         help="Search using regular expression.",
     )
+    parser.add_argument(
+        "--max-line-numbers",
+        type=int,
+        default=None,
+        metavar="K",
+        help="List only the first K line numbers of each match in the "
+        "--regexp summary. The rest are only counted.",
+    )
+    parser.add_argument(
+        "--count-only",
+        action="store_true",
+        help="List only the number of occurrences of each match in the "
+        "--regexp summary, without line numbers.",
+    )
+    parser.add_argument(
+        "-m",
+        "--max-count",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Stop reading a file after N matches. With several strings "
+        "without --regexp, at most N of them are listed per file.",
+    )
+    parser.add_argument(
+        "--max-total",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Stop the search after N matches have been found in all files.",
+    )
+    parser.add_argument(
+        "--files-with-matches",
+        action="store_true",
+        help="Print only the paths of the files with matches. Each file is "
+        "read only until its first match.",
+    )
+    parser.add_argument(
+        "--first-match",
+        action="store_true",
+        help="Stop the search at the first match. Same as --max-total 1.",
+    )
     parser.add_argument(
         "-s",
         "--suffix",
@@ -348,6 +1518,122 @@ def main():
         help="Do not print skipped folders or files, and only print the files "
         "that contain the search string/pattern.",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used for searching the files. "
+        "Defaults to 1 (no worker processes). 0 uses one process per CPU.",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Open and read up to N files ahead of the search in threads, "
+        "e.g., on network file systems with a high latency. Not used with "
+        "--jobs. Defaults to 0 (no read-ahead).",
+    )
+    parser.add_argument(
+        "--prefetch-size",
+        type=int,
+        default=DEFAULT_MAX_PREFETCH_SIZE // (1024 * 1024),
+        metavar="MIB",
+        help="Maximum size in MiB of the file contents read ahead with "
+        "--prefetch. Larger files are only opened ahead. Defaults to "
+        "%(default)s.",
+    )
+    parser.add_argument(
+        "--split-size",
+        type=int,
+        default=DEFAULT_SPLIT_SIZE // (1024 * 1024),
+        metavar="MIB",
+        help="With --regexp and --jobs, split files of at least this many "
+        "MiB into chunks of lines that the worker processes search at the "
+        "same time. 0 disables splitting. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Use the index built with 'find-from-files index build' for "
+        "opening only the files that can contain a match.",
+    )
+    parser.add_argument(
+        "--index-file",
+        default=None,
+        help="Path of the index file to use with --index. Defaults to the "
+        "default index file of the base directory.",
+    )
+    parser.add_argument(
+        "--output",
+        choices=(OUTPUT_TEXT, OUTPUT_JSONL),
+        default=OUTPUT_TEXT,
+        help="Output format. 'jsonl' prints a JSON object per line for each "
+        "match, file summary, skipped file or folder, and error, as soon as "
+        "it is found. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Store the results of the files in a persistent cache, and "
+        "answer the files that have not changed since from the cache without "
+        "opening them.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use the result cache, even if --cache or --cache-dir is "
+        "given.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory of the result cache. Implies --cache. Defaults to "
+        f"{CACHE_DIRECTORY}.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_CACHE_SIZE // (1024 * 1024),
+        help="Size cap of the result cache in MiB. The least recently used "
+        "results are evicted when it is exceeded. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print the number of cache hits and misses after the search.",
+    )
+    parser.add_argument(
+        "-f",
+        "--follow",
+        action="store_true",
+        help="After searching the files, keep following them and search the "
+        "lines appended to them, until interrupted with Ctrl+C. Rotated, "
+        "truncated and new files are followed too.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print statistics after the search: the files and bytes searched "
+        "per second, the files skipped, the wall-clock and CPU time spent in "
+        "each phase (walk, read, sniff, match, render), and the slowest files. "
+        "With --output jsonl, they are written as a final 'stats' record.",
+    )
+    parser.add_argument(
+        "--stats-slowest",
+        type=int,
+        default=DEFAULT_SLOWEST_FILE_COUNT,
+        metavar="N",
+        help="Number of the slowest files listed with --stats. Defaults to "
+        "%(default)s.",
+    )
+    parser.add_argument(
+        "--debug-plan",
+        action="store_true",
+        help="Print how the files are going to be searched, e.g., the "
+        "literals used for skipping files and chunks without matches.",
+    )
     parser.add_argument(
         "-V",
         "--version",
@@ -355,43 +1641,202 @@ def main():
         version=version_string,
     )
 
-    args = parser.parse_args()
+    args = parser.parse_intermixed_args()
 
     if args.base_directory is None:
         print("No base directory!")
         exit(1)
 
-    if args.search_string is None:
+    patterns = []
+    if args.search_string is not None:
+        patterns.append(args.search_string)
+    patterns.extend(args.pattern or [])
+    if args.patterns_file:
+        try:
+            with open(args.patterns_file, "r", encoding="utf-8") as f:
+                lines = [line.rstrip("\r\n") for line in f]
+        except OSError as e:
+            print(f"Cannot read the patterns file: {e}")
+            exit(1)
+        patterns.extend(line for line in lines if line)
+
+    if not patterns:
         print("No search string!")
         exit(1)
+    search_string = patterns[0] if len(patterns) == 1 else tuple(patterns)
 
     if args.no_ansi:
-        Fore.GREEN = ""
-        Fore.YELLOW = ""
-        Fore.BLUE = ""
-        Fore.RED = ""
-        Back.RED = ""
-        Style.RESET_ALL = ""
+        disable_ansi()
+
+    # Keep the JSON Lines output parseable
+    info_stream = sys.stderr if args.output == OUTPUT_JSONL else sys.stdout
+
+    if args.debug_plan:
+        for line in describe_search_plan(search_string, args.regexp):
+            print(line, file=info_stream)
 
     if args.quieter:
         args.quiet = True
 
+    if args.jobs < 0:
+        print("Number of jobs cannot be negative!")
+        exit(1)
+    if args.prefetch < 0:
+        print("Number of files to prefetch cannot be negative!")
+        exit(1)
+    if args.split_size < 0:
+        print("Size of the files to split cannot be negative!")
+        exit(1)
+    if args.max_line_numbers is not None and args.max_line_numbers < 0:
+        print("Maximum number of line numbers cannot be negative!")
+        exit(1)
+    if args.first_match:
+        args.max_total = 1
+    for limit in (args.max_count, args.max_total):
+        if limit is not None and limit < 1:
+            print("Maximum number of matches must be positive!")
+            exit(1)
+    if args.files_with_matches:
+        args.max_count = 1
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+
     search_func = None
-    if args.regexp:
+    if args.regexp and args.output == OUTPUT_JSONL:
+        search_func = regex_search_jsonl
+    elif args.regexp:
         search_func = regex_search_with_string
+    elif args.output == OUTPUT_JSONL:
+        search_func = find_strings_jsonl
     else:
         search_func = find_folders_with_string
+    # The options are bound with functools.partial, so that the search
+    # function can still be sent to the worker processes
+    if search_func is regex_search_with_string and (
+        args.max_line_numbers is not None or args.count_only
+    ):
+        search_func = functools.partial(
+            search_func,
+            max_line_numbers=args.max_line_numbers,
+            count_only=args.count_only,
+        )
+    elif search_func is regex_search_jsonl and args.count_only:
+        search_func = functools.partial(search_func, count_only=True)
+    if args.max_count is not None:
+        search_func = with_max_count(search_func, args.max_count)
+    # The files are searched through the library interface for only their
+    # paths. Followed files are still printed with their matches.
+    walk_search_func = search_func
+    if args.files_with_matches:
+        walk_search_func = functools.partial(
+            find_files_with_matches,
+            mode=MODE_REGEX if args.regexp else MODE_LITERAL,
+        )
 
-    traverse_directories(
-        args.base_directory,
-        args.suffix,
-        args.skip,
-        args.search_string,
-        args.whole_line,
-        args.quiet,
-        args.quieter,
-        search_func,
-    )
+    index_filter = None
+    if args.index or args.index_file:
+        index_path = args.index_file or trigram_index.default_index_path(
+            args.base_directory
+        )
+        try:
+            index = trigram_index.TrigramIndex(index_path)
+        except (OSError, ValueError) as e:
+            print(f"Cannot use the index: {e}")
+            exit(1)
+        index_filter = trigram_index.IndexFilter(
+            index,
+            [
+                trigram_index.query_trigrams(pattern, args.regexp)
+                for pattern in patterns
+            ],
+        )
+
+    follower = None
+    if args.follow:
+        # The files are followed from their sizes before the first search, so
+        # that no line appended during the search is missed
+        follower = LogFollower(
+            args.base_directory,
+            tuple(args.suffix or ()),
+            tuple(args.skip or ()),
+        )
+        follower.snapshot()
+
+    result_cache = None
+    if (args.cache or args.cache_dir) and not args.no_cache:
+        try:
+            result_cache = ResultCache(
+                args.cache_dir or CACHE_DIRECTORY,
+                args.cache_size * 1024 * 1024,
+            )
+        except (OSError, sqlite3.Error) as e:
+            print(f"Cannot use the result cache: {e}")
+
+    stats = None
+    if args.stats:
+        stats = SearchStats(max(args.stats_slowest, 0))
+
+    split_size = None
+    if args.regexp and args.split_size and not args.files_with_matches:
+        split_size = args.split_size * 1024 * 1024
+
+    prefetcher = None
+    prefetching = contextlib.nullcontext()
+    if args.prefetch and args.jobs == 1:
+        prefetcher = Prefetcher(args.prefetch, args.prefetch_size * 1024 * 1024)
+        prefetching = prefetcher
+
+    with prefetching, OutputRenderer() as renderer:
+        limit_reached = traverse_directories(
+            args.base_directory,
+            args.suffix,
+            args.skip,
+            search_string,
+            args.whole_line,
+            args.quiet,
+            args.quieter,
+            walk_search_func,
+            args.jobs,
+            args.no_ansi,
+            index_filter,
+            renderer,
+            result_cache,
+            args.output,
+            args.max_total,
+            args.files_with_matches,
+            prefetcher,
+            stats,
+            split_size,
+        )
+        if stats is not None and args.output == OUTPUT_JSONL:
+            renderer.write(
+                jsonl_record("stats", args.base_directory, **stats.to_json())
+            )
+        elif stats is not None:
+            for line in stats.report_lines():
+                renderer.write(line)
+        renderer.flush()
+        if follower is not None and not limit_reached:
+            follow_directories(
+                follower,
+                search_string,
+                args.whole_line,
+                search_func,
+                renderer,
+                output_format=args.output,
+            )
+
+    if result_cache is not None:
+        try:
+            result_cache.close()
+        except sqlite3.Error as e:
+            print(f"Cannot update the result cache: {e}")
+        if args.cache_stats:
+            print(
+                f"Cache hits: {result_cache.hits}, "
+                f"misses: {result_cache.misses}",
+                file=info_stream,
+            )
 
 
 if __name__ == "__main__":
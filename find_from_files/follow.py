@@ -0,0 +1,232 @@
+"""Follows the files under a directory tree for appended lines (--follow).
+
+Class LogFollower records the inode and size of every file under a base
+directory, and then polls the tree for changes. Only the lines appended to a
+file since it was last polled are read, and they are given to the search
+functions through an AppendedLinesReader, which numbers the lines as they are
+numbered in the whole file. A file whose inode changes or that shrinks (it was
+rotated or truncated) is read again from the start, and a file that is renamed
+(e.g., app.log to app.log.1) keeps its position. New files are read from the
+start. An incomplete last line is left to be read when it has been finished.
+
+Polling the whole tree with os.scandir takes a few milliseconds for thousands
+of files, so the tree is simply polled every POLL_INTERVAL seconds instead of
+waiting for file system events, which are not available in the standard
+library.
+
+Typical usage example:
+
+    follower = LogFollower(base_directory)
+    follower.snapshot()
+    while True:
+        time.sleep(POLL_INTERVAL)
+        for reader in follower.poll():
+            with reader:
+                print(find_folders_with_string("ERROR", reader, False))
+"""
+
+import contextlib
+import io
+import os
+from typing import Iterator
+
+from find_from_files.buffers import count_newlines, map_file
+from find_from_files.compressed import (
+    COMPRESSION_SIGNATURE_SIZE,
+    detect_compression,
+)
+from find_from_files.directory_walker import walk_directories
+from find_from_files.file_reader import HEAD_SIZE, FileReader
+from find_from_files.text_encodings import is_ascii_compatible
+
+POLL_INTERVAL = 0.25
+# Lines appended to a file are read in parts of at most this many bytes
+MAX_READ_SIZE = 16 * 1024 * 1024
+
+
+class AppendedLinesReader(FileReader):
+    """A FileReader giving the lines appended to a file.
+
+    The lines have already been read into memory, so the reader does not open
+    the file again.
+
+    Attributes:
+        data: The appended lines.
+    """
+
+    def __init__(self, file_path: str, data: bytes, lines_before: int):
+        super().__init__(file_path)
+        self.data = data
+        self.lines_before = lines_before
+
+    def __enter__(self) -> "AppendedLinesReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def head(self) -> bytes:
+        return self.data[:HEAD_SIZE]
+
+    def is_whole_file_read(self) -> bool:
+        return True
+
+    @contextlib.contextmanager
+    def buffer(self) -> Iterator[bytes]:
+        yield self.data
+
+    def stream(self) -> io.BytesIO:
+        return io.BytesIO(self.data)
+
+    def binary(self) -> io.BytesIO:
+        return self.stream()
+
+    def encoding(self) -> str | None:
+        # The appended lines end at newline bytes, so a file in UTF-16 or
+        # UTF-32 is searched as UTF-8, like before its encoding was detected
+        encoding = super().encoding()
+        if encoding is None or is_ascii_compatible(encoding):
+            return encoding
+        return "utf-8"
+
+
+class FollowedFile:
+    """The position up to which a followed file has been read.
+
+    Attributes:
+        inode: Inode number of the file.
+        offset: Number of bytes read from the start of the file.
+        lines: Number of lines in the bytes read, or None if they have not
+            been counted yet.
+    """
+
+    __slots__ = ("inode", "offset", "lines")
+
+    def __init__(self, inode: int, offset: int = 0, lines: int | None = 0):
+        self.inode = inode
+        self.offset = offset
+        self.lines = lines
+
+
+class LogFollower:
+    """Polls the files under a directory tree for appended lines.
+
+    Attributes:
+        base_directory: The directory followed.
+        file_suffixes: Only the files with one of these suffixes are
+            followed, or all files if this is empty.
+        skip_prefixes: Folders whose name starts with one of these are not
+            followed.
+    """
+
+    def __init__(
+        self,
+        base_directory: str,
+        file_suffixes: tuple[str, ...] = (),
+        skip_prefixes: tuple[str, ...] = (),
+    ):
+        self.base_directory = base_directory
+        self.file_suffixes = file_suffixes
+        self.skip_prefixes = skip_prefixes
+        self._files: dict[str, FollowedFile] = {}
+
+    def _stat_files(self) -> dict[str, os.stat_result]:
+        """Returns the stat results of the followed files in the tree."""
+        stats = {}
+        for _, files, skipped in walk_directories(
+            self.base_directory, self.skip_prefixes
+        ):
+            if skipped:
+                continue
+            for entry in files:
+                if self.file_suffixes and not entry.name.endswith(
+                    self.file_suffixes
+                ):
+                    continue
+                try:
+                    stats[entry.path] = entry.stat()
+                except OSError:
+                    pass
+        return stats
+
+    def snapshot(self):
+        """Records the current size of each file as the position to follow
+        it from.
+
+        The lines are counted only when a file first grows.
+        """
+        self._files = {
+            path: FollowedFile(stat_result.st_ino, stat_result.st_size, None)
+            for path, stat_result in self._stat_files().items()
+        }
+
+    def poll(self) -> Iterator[FileReader]:
+        """Reads the lines appended to the files since the previous poll.
+
+        Yields:
+            An AppendedLinesReader for each file with new lines, or a
+            FileReader for a changed compressed file, which is searched as a
+            whole. The readers are in the order of the directory walk.
+        """
+        stats = self._stat_files()
+        previous = self._files
+        # Files that are no longer at their previous paths
+        moved = {
+            followed.inode: followed
+            for path, followed in previous.items()
+            if path not in stats or stats[path].st_ino != followed.inode
+        }
+        self._files = {}
+        for path, stat_result in stats.items():
+            followed = previous.get(path)
+            if followed is None or followed.inode != stat_result.st_ino:
+                # A renamed file keeps its position, others are read from
+                # the start
+                followed = moved.pop(stat_result.st_ino, None)
+                if followed is None:
+                    followed = FollowedFile(stat_result.st_ino)
+            if stat_result.st_size < followed.offset:
+                # The file has been truncated
+                followed = FollowedFile(stat_result.st_ino)
+            self._files[path] = followed
+            if stat_result.st_size == followed.offset:
+                continue
+            try:
+                reader = _read_appended(path, followed, stat_result.st_size)
+            except OSError:
+                continue
+            if reader is not None:
+                yield reader
+
+
+def _read_appended(
+    path: str, followed: FollowedFile, size: int
+) -> FileReader | None:
+    """Reads the complete lines after followed.offset and moves the position
+    past them.
+
+    A compressed file cannot be read from the middle, so it is searched as a
+    whole whenever it changes.
+
+    Returns:
+        A reader of the lines, or None if there are no complete lines yet.
+    """
+    with open(path, "rb") as f:
+        if detect_compression(f.read(COMPRESSION_SIGNATURE_SIZE)):
+            followed.offset = size
+            return FileReader(path)
+        if followed.lines is None:
+            f.seek(0)
+            with map_file(f) as buffer:
+                followed.lines = count_newlines(buffer, followed.offset)
+        f.seek(followed.offset)
+        data = f.read(MAX_READ_SIZE)
+    end = data.rfind(b"\n") + 1
+    if end == 0 and len(data) < MAX_READ_SIZE:
+        return None  # The line has not been finished yet
+    if end:
+        data = data[:end]
+    reader = AppendedLinesReader(path, data, followed.lines)
+    followed.offset += len(data)
+    followed.lines += count_newlines(data, len(data))
+    return reader
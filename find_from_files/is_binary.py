@@ -1,13 +1,22 @@
 """Detects if a given byte sequence is binary or text.
 
 Function is_binary can be used for detecting whether the given byte sequence is
-binary or not. It tries first decoding the data using UTF-8, UTF-16, and
+binary or not. The checks are done in tiers from the cheapest to the most
+expensive. First, the sequence is checked for the magic numbers of common
+binary file formats, and for NUL bytes and other non-printable characters
+using a precomputed translation table. This settles most files. If
+the sequence is not settled by these, it is decoded using UTF-8, UTF-16, and
 UTF-32. If the sequence decodes successfully, it's considered text. If decoding
-fails, the sequence is checked for non-printable characters. If the percentage
-of these characters is above 30%, the sequence is considered binary. Otherwise,
-chardet is used to detect the encoding. If chardet detects an encoding and is
-confident enough, the sequence is considered text. Otherwise, it is considered
-binary.
+fails, the percentage of non-printable characters is checked. If it is above
+30%, the sequence is considered binary. Otherwise, chardet is used to detect
+the encoding. If chardet detects an encoding and is confident enough, the
+sequence is considered text. Otherwise, it is considered binary.
+
+Function detect_encoding makes the same checks, but gives the encoding of a
+text sample instead of just telling that it is text, so that the file can be
+searched in its own encoding (see text_encodings). UTF-16 and UTF-32 are
+recognized from their byte order marks, or without them, from the zero bytes
+of the ASCII characters.
 
 Typical usage example:
 
@@ -15,19 +24,48 @@ Typical usage example:
         print('file is binary')
 """
 
+import codecs
+
 import chardet
 
+# Text-like characters (ASCII control + printable ASCII + Latin-1 - DEL). Based
+# on Unix file command behavior, see: https://stackoverflow.com/a/7392391.
+TEXT_CHARS = bytes(
+    sorted({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7F})
+)
+
+BINARY_SIGNATURES = (
+    b"\x7fELF",  # ELF executables and libraries
+    b"\x1f\x8b",  # gzip
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"PK\x03\x04",  # zip
+    b"PK\x05\x06",  # empty zip
+)
+# The UTF-32 byte order marks are checked first, because the little-endian
+# one starts with that of UTF-16
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+# Encoding used for text that is not valid UTF-8 but has no other
+# non-printable characters than those of Latin-1
+FALLBACK_ENCODING = "latin-1"
+
 
 def is_binary(data: bytes) -> bool | None:
     """Detects if a given byte sequence sample is binary or text.
 
-    Tries first decoding the sequence using UTF-8, UTF-16, and UTF-32. If it
-    decodes successfully, it is considered text. If decoding fails, the
-    sequence is checked for non-printable characters. If the percentage of
-    these characters is above 30%, the sequence is considered binary.
-    Otherwise, chardet is used to detect the encoding. If chardet detects an
-    encoding and is confident enough, the sequence is considered text.
-    Otherwise, it is considered binary.
+    The sample is considered binary if it starts with the magic number of a
+    common binary file format, and text if it contains no NUL bytes or other
+    non-printable characters. Otherwise, tries decoding the sequence using
+    UTF-8, UTF-16, and UTF-32. If it decodes successfully, it is considered
+    text. If decoding fails, the sequence is checked for non-printable
+    characters. If the percentage of these characters is above 30%, the
+    sequence is considered binary. Otherwise, chardet is used to detect the
+    encoding. If chardet detects an encoding and is confident enough, the
+    sequence is considered text. Otherwise, it is considered binary.
 
     Args:
         data: The byte sequence to be checked.
@@ -39,29 +77,100 @@ def is_binary(data: bytes) -> bool | None:
     # Sample is empty
     if len(data) == 0:
         return None
+    return detect_encoding(data) is None
+
+
+def detect_encoding(data: bytes) -> str | None:
+    """Detects the encoding of a byte sequence sample of text.
 
-    # Attempt decoding in UTF encodings
+    The checks are the same as those of is_binary(). A text sample is in
+    UTF-8 if it is ASCII or decodes as UTF-8 (possibly ending in the middle
+    of a character), in UTF-16 or UTF-32 if it has their byte order mark or
+    their zero bytes, and otherwise in Latin-1 or the encoding detected by
+    chardet.
+
+    Args:
+        data: The byte sequence to be checked.
+
+    Returns:
+        The name of the encoding, e.g., "utf-8", "utf-16-le" or "latin-1", or
+        None if the sample is binary. An empty sample is considered UTF-8.
+    """
+    # Tier 1: magic numbers, NUL bytes and non-printable characters
+    if data.startswith(BINARY_SIGNATURES):
+        return None
+    if b"\x00" not in data and data.isascii():
+        return "utf-8"  # ASCII without NUL bytes is valid UTF-8
+    nontext = data.translate(None, TEXT_CHARS)
+    if len(nontext) == 0:
+        # Only text characters (and no NUL bytes)
+        return (
+            _detect_utf_16_or_32(data)
+            or _detect_utf_8(data)
+            or FALLBACK_ENCODING
+        )
+
+    # Tier 2: attempt decoding in UTF encodings
     for encoding in ["utf-8", "utf-16", "utf-32"]:
         try:
             data.decode(encoding)
-            return False
         except UnicodeDecodeError:
-            pass  # Try next encoding
-
-    # Heuristic: Check for non-printable bytes (based on Unix file command
-    # behavior, see: https://stackoverflow.com/a/7392391).
-    # Define a set of text-like characters (ASCII control + printable ASCII
-    # + Latin-1 - DEL)
-    textchars = bytearray(
-        {7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7F}
-    )
-    nontext_ratio = float(len(data.translate(None, textchars))) / len(data)
+            continue  # Try next encoding
+        # UTF-16 and UTF-32 text can also be valid UTF-8
+        return _detect_utf_16_or_32(data) or _detect_utf_8(data) or (
+            f"{encoding}-le"
+        )
+
+    # Tier 3: non-printable character ratio and chardet
+    nontext_ratio = float(len(nontext)) / len(data)
     if nontext_ratio > 0.3:
-        return True  # Threshold: 30% non-text => check with chardet
+        return None  # Threshold: 30% non-text => binary
 
     # Use chardet to guess encoding
     detected = chardet.detect(data)
     if detected["confidence"] > 0.7:  # Chardet is confident => text
-        return False
+        try:
+            return codecs.lookup(detected["encoding"]).name
+        except (LookupError, TypeError):
+            return FALLBACK_ENCODING
     else:
-        return True  # Otherwise binary
+        return None  # Otherwise binary
+
+
+def _detect_utf_8(data: bytes) -> str | None:
+    """Returns "utf-8" if data is UTF-8, possibly cut in the middle of a
+    character at the end."""
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.start < len(data) - 3 or e.reason != "unexpected end of data":
+            return None
+    return "utf-8"
+
+
+def _detect_utf_16_or_32(data: bytes) -> str | None:
+    """Returns the UTF-16 or UTF-32 encoding of data, recognized from the
+    byte order mark or from the zero bytes of ASCII characters, or None."""
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if data.startswith(bom):
+            return encoding
+    if b"\x00" not in data:
+        return None
+    # The share of zero bytes at each offset modulo 4
+    quarter = max(len(data) // 4, 1)
+    zeros = [data[i::4].count(0) / quarter for i in range(4)]
+    candidates = (
+        ("utf-32-le", (1, 2, 3)),
+        ("utf-32-be", (0, 1, 2)),
+        ("utf-16-le", (1, 3)),
+        ("utf-16-be", (0, 2)),
+    )
+    for encoding, zero_offsets in candidates:
+        if all(zeros[i] > 0.5 for i in zero_offsets):
+            unit = 4 if encoding.startswith("utf-32") else 2
+            try:
+                data[: len(data) - len(data) % unit].decode(encoding)
+            except UnicodeDecodeError:
+                continue
+            return encoding
+    return None
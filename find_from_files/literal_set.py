@@ -0,0 +1,170 @@
+"""Finds the occurrences of many literal byte strings in a single pass.
+
+Class LiteralSet compiles a set of byte strings into one regular expression,
+an alternation shaped like the trie of the strings, so that the regular
+expression engine tries only the strings that share the bytes read so far.
+The buffer is then scanned in C, and every occurrence of every string is
+found, including overlapping ones. This is faster than searching for each
+string separately when there are many of them. Function
+find_first_occurrences() finds the first occurrence of each string, with
+the set or with bytes.find(), whichever is faster.
+
+Typical usage example:
+
+    literals = LiteralSet([b"ERROR", b"timeout"])
+    for start, pattern_id in literals.find_all(buffer):
+        print(f"{literals.patterns[pattern_id]} at {start}")
+"""
+
+import functools
+import mmap
+import re
+from typing import Iterator, Sequence
+
+# The set is faster than bytes.find() for each string from about this many
+# strings on, also when the common prefixes of the strings are on every line
+# (see benchmarks/bench_multi_pattern.py)
+LITERAL_SET_MIN_PATTERNS = 50
+
+
+class LiteralSet:
+    """A set of byte strings searched for with a single regular expression.
+
+    At each offset, the regular expression matches the longest of the
+    strings starting there, so the strings found at the offset are the ones
+    that are prefixes of the match.
+
+    Attributes:
+        patterns: The strings searched for. Empty strings are never found.
+    """
+
+    def __init__(self, patterns: Sequence[bytes]):
+        self.patterns = list(patterns)
+        # The ids (indexes in patterns) of each distinct string
+        self._ids: dict[bytes, list[int]] = {}
+        for pattern_id, pattern in enumerate(self.patterns):
+            if pattern:
+                self._ids.setdefault(pattern, []).append(pattern_id)
+        self._regex = None
+        if self._ids:
+            self._regex = re.compile(_trie_pattern(self._ids))
+        self._found_ids: dict[bytes, list[int]] = {}
+
+    def find_all(
+        self, buffer: bytes | mmap.mmap, start: int = 0
+    ) -> Iterator[tuple[int, int]]:
+        """Finds every occurrence of the patterns in buffer[start:].
+
+        Yields:
+            Tuples of the start offset of the occurrence and the id of the
+            pattern, in the order of the start offsets of the occurrences.
+        """
+        if self._regex is None:
+            return
+        search = self._regex.search
+        match = search(buffer, start)
+        while match is not None:
+            position = match.start()
+            for pattern_id in self._get_found_ids(match.group()):
+                yield position, pattern_id
+            match = search(buffer, position + 1)
+
+    def _get_found_ids(self, text: bytes) -> list[int]:
+        """Returns the ids of the strings that are prefixes of text."""
+        found_ids = self._found_ids.get(text)
+        if found_ids is None:
+            found_ids = [
+                pattern_id
+                for end in range(1, len(text) + 1)
+                for pattern_id in self._ids.get(text[:end], ())
+            ]
+            self._found_ids[text] = found_ids
+        return found_ids
+
+
+def _trie_pattern(strings) -> bytes:
+    """Returns a regular expression matching the longest of the non-empty
+    strings at an offset, with an alternative for each branch of their
+    trie."""
+    trie: dict = {}
+    for string in strings:
+        node = trie
+        for byte in string:
+            node = node.setdefault(byte, {})
+        node[None] = {}  # The end of a string
+
+    def branch_pattern(node) -> bytes:
+        alternatives = []
+        for byte, child in node.items():
+            if byte is None:
+                continue
+            # A path without branches is a single literal
+            literal = bytes([byte])
+            while len(child) == 1 and None not in child:
+                ((byte, child),) = child.items()
+                literal += bytes([byte])
+            alternatives.append(re.escape(literal) + branch_pattern(child))
+        if not alternatives:
+            return b""
+        pattern = b"|".join(alternatives)
+        if len(alternatives) > 1 or None in node:
+            pattern = b"(?:" + pattern + b")"
+        # Greedy, so that the longest string is matched
+        return pattern + b"?" if None in node else pattern
+
+    return branch_pattern(trie)
+
+
+@functools.lru_cache(maxsize=8)
+def get_literal_set(patterns: tuple[bytes, ...]) -> LiteralSet | None:
+    """Returns the set of patterns, compiled only once per process, or None
+    if the regular expression is nested too deeply to be compiled."""
+    try:
+        return LiteralSet(patterns)
+    except RecursionError:
+        return None
+
+
+def find_first_occurrences(
+    buffer: bytes | mmap.mmap, patterns: tuple[bytes, ...]
+) -> dict[int, int]:
+    """Finds the first occurrence of each of the patterns in buffer.
+
+    With fewer than LITERAL_SET_MIN_PATTERNS patterns, each of them is
+    searched for with buffer.find(). Otherwise the buffer is scanned once with
+    a LiteralSet, until all the patterns have been found.
+
+    Args:
+        buffer: The buffer to search.
+        patterns: The byte strings to search for.
+
+    Returns:
+        A dict mapping the ids (indexes) of the patterns found to the start
+        offsets of their first occurrences. An empty pattern is found at 0.
+    """
+    literals = None
+    if len(patterns) >= LITERAL_SET_MIN_PATTERNS:
+        literals = get_literal_set(patterns)
+    if literals is None:
+        found = {}
+        for pattern_id, pattern in enumerate(patterns):
+            position = buffer.find(pattern)
+            if position != -1:
+                found[pattern_id] = position
+        return found
+
+    found = {
+        pattern_id: 0
+        for pattern_id, pattern in enumerate(patterns)
+        if not pattern
+    }
+    remaining = len(patterns) - len(found)
+    if remaining == 0:
+        return found
+    for position, pattern_id in literals.find_all(buffer):
+        if pattern_id not in found:
+            found[pattern_id] = position
+            remaining -= 1
+            if remaining == 0:
+                break
+    return found
@@ -0,0 +1,433 @@
+"""Finds the matches of a pattern in a directory tree, one at a time.
+
+Function iter_matches() is the library interface of the search: it walks
+through the directories like the command line tool does, skips the files by
+suffix and the folders by prefix, leaves out binary files, and yields a
+MatchRecord for every match found. Nothing is formatted for the terminal,
+and the records are slotted objects, which are cheap to create even for
+millions of matches. The generator reads the files lazily in windows of whole
+lines (see buffers.read_line_windows()), so when the consumer stops iterating,
+the search stops too: no further windows or files are read, and the file
+being searched is closed when the generator is closed or garbage collected.
+
+The files are searched in their own encodings, like by the command line tool
+(see FileReader.encoding() and text_encodings): a literal pattern
+(MODE_LITERAL) is searched for encoded into the encoding of the file as
+bytes, and nothing is decoded. In UTF-16 and UTF-32, only the matches at the
+starts of code units are found. A regular expression (MODE_REGEX) is
+searched for in each line like with --regexp. Like everywhere in the tool,
+"\\n", "\\r\\n" and a lone "\\r" all end a line, and a regular expression
+sees each of them as "\\n" (see buffers.count_newlines()). Text in an
+ASCII compatible encoding is decoded with the "surrogateescape" error
+handler, so undecodable bytes keep their place and the byte offsets of the
+matches are exact. Windows that cannot contain a match (see
+regex_literals.Prefilter) are skipped without decoding them.
+
+Typical usage example:
+
+    for match in iter_matches("logs", "ERROR", suffixes=(".log",)):
+        print(match.path, match.line_number, match.text)
+"""
+
+import bisect
+import functools
+import re
+from typing import BinaryIO, Callable, Iterator, Sequence
+
+from find_from_files import text_encodings
+from find_from_files.buffers import count_newlines, read_line_windows
+from find_from_files.compressed import DECOMPRESSION_ERRORS
+from find_from_files.directory_walker import walk_directories
+from find_from_files.file_reader import FileReader
+from find_from_files.literal_set import get_literal_set
+from find_from_files.regex_literals import get_prefilter, matches_within_lines
+from find_from_files.regex_search import PATTERN_GROUP_PREFIX, combine_patterns
+
+MODE_LITERAL = "literal"
+MODE_REGEX = "regex"
+MODES = (MODE_LITERAL, MODE_REGEX)
+
+
+class MatchRecord:
+    """A match found by iter_matches().
+
+    Attributes:
+        path: Path of the file.
+        line_number: Number of the line of the match, starting from 1.
+        byte_offset: Offset of the start of the match from the start of the
+            file in bytes. For a compressed file, this is the offset in the
+            decompressed contents.
+        text: The matched text, decoded from the encoding of the file.
+            Undecodable bytes are replaced with U+FFFD.
+        pattern_id: Id (index) of the pattern that matched, 0 if a single
+            pattern was given.
+    """
+
+    __slots__ = ("path", "line_number", "byte_offset", "text", "pattern_id")
+
+    def __init__(
+        self,
+        path: str,
+        line_number: int,
+        byte_offset: int,
+        text: str,
+        pattern_id: int = 0,
+    ):
+        self.path = path
+        self.line_number = line_number
+        self.byte_offset = byte_offset
+        self.text = text
+        self.pattern_id = pattern_id
+
+    def __repr__(self) -> str:
+        return (
+            f"MatchRecord(path={self.path!r}, "
+            f"line_number={self.line_number!r}, "
+            f"byte_offset={self.byte_offset!r}, text={self.text!r}, "
+            f"pattern_id={self.pattern_id!r})"
+        )
+
+
+# A match of a line: its start in the line, the id of the pattern and the
+# matched text
+LineMatch = tuple[int, int, str]
+
+
+def iter_matches(
+    base_directory: str,
+    pattern: str | Sequence[str],
+    *,
+    mode: str = MODE_LITERAL,
+    suffixes: Sequence[str] = (),
+    skip_prefixes: Sequence[str] = (),
+    max_count: int | None = None,
+    on_error: Callable[[str, Exception], None] | None = None,
+) -> Iterator[MatchRecord]:
+    """Yields the matches of pattern in the files under base_directory.
+
+    The files are searched in the same order as by the command line tool,
+    and the matches of a file are yielded in the order of their positions.
+    Each file is searched in its encoding (see FileReader.encoding()).
+
+    Args:
+        base_directory: The directory to search.
+        pattern: The string or regular expression to search for, or a
+            sequence of them, whose ids are their indexes.
+        mode: MODE_LITERAL to search for the strings as they are, or
+            MODE_REGEX to search for regular expressions.
+        suffixes: If given, only the files whose name ends with one of these
+            are searched.
+        skip_prefixes: Folders whose name starts with one of these are not
+            searched.
+        max_count: Maximum number of matches yielded per file, or None for
+            no limit.
+        on_error: Called with the path and the exception if a file cannot be
+            read. By default, such files are left out silently.
+
+    Yields:
+        A MatchRecord of each match.
+
+    Raises:
+        ValueError: If mode is unknown.
+        re.error: If a regular expression is invalid.
+    """
+    search = get_file_searcher(pattern, mode)
+    suffixes = tuple(suffixes)
+    for _, files, _ in walk_directories(base_directory, tuple(skip_prefixes)):
+        for entry in files:
+            if suffixes and not entry.name.endswith(suffixes):
+                continue
+            try:
+                with FileReader(entry.path) as reader:
+                    if reader.encoding() is None:
+                        continue
+                    count = 0
+                    for match in search(reader):
+                        yield match
+                        count += 1
+                        if count == max_count:
+                            break
+            except DECOMPRESSION_ERRORS as e:
+                if on_error is not None:
+                    on_error(entry.path, e)
+
+
+def iter_file_matches(
+    file_path: str, pattern: str | Sequence[str], mode: str = MODE_LITERAL
+) -> Iterator[MatchRecord]:
+    """Yields the matches of pattern in a single file, binary or not.
+
+    See iter_matches() for the arguments. A binary file is searched as if it
+    was in UTF-8. Errors reading the file are raised.
+    """
+    search = get_file_searcher(pattern, mode)
+    with FileReader(file_path) as reader:
+        yield from search(reader)
+
+
+def get_file_searcher(
+    pattern: str | Sequence[str], mode: str
+) -> Callable[[FileReader], Iterator[MatchRecord]]:
+    """Returns a function yielding the matches of pattern in the file of a
+    FileReader, in the encoding of the file (UTF-8 for a binary file).
+
+    The patterns are compiled only once per process, and for each encoding
+    only once.
+    """
+    patterns = (pattern,) if isinstance(pattern, str) else tuple(pattern)
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+    return _get_searcher(patterns, mode)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_searcher(
+    patterns: tuple[str, ...], mode: str
+) -> Callable[[FileReader], Iterator[MatchRecord]]:
+    if mode == MODE_LITERAL:
+        return _get_literal_searcher(patterns)
+    return _get_regex_searcher(patterns)
+
+
+def _read_windows(
+    stream: BinaryIO, encoding: str
+) -> Iterator[tuple[bytes, int, int]]:
+    """Reads the stream in windows of whole lines in encoding (see
+    text_encodings.read_code_unit_windows() for UTF-16 and UTF-32)."""
+    if text_encodings.is_ascii_compatible(encoding):
+        return read_line_windows(stream)
+    return text_encodings.read_code_unit_windows(stream, encoding)
+
+
+def _get_errors(encoding: str) -> str:
+    """Returns the error handler text in encoding is decoded with.
+
+    With "surrogateescape", the undecodable bytes keep their place, but it
+    can only be used with ASCII compatible encodings, and with the others,
+    an undecodable code unit is replaced with U+FFFD.
+    """
+    if text_encodings.is_ascii_compatible(encoding):
+        return "surrogateescape"
+    return "replace"
+
+
+def _encoded_length(text: str, encoding: str, errors: str) -> int:
+    """Returns the length in bytes of text decoded from encoding with the
+    error handler errors."""
+    if text.isascii():
+        return len(text) * text_encodings.code_unit_size(encoding)
+    return len(text.encode(encoding, errors=errors))
+
+
+def _restore(text: str, encoding: str, errors: str) -> str:
+    """Replaces the undecodable bytes kept by "surrogateescape" in text with
+    U+FFFD."""
+    if errors != "surrogateescape" or text.isascii():
+        return text
+    return text.encode(encoding, errors=errors).decode(
+        encoding, errors="replace"
+    )
+
+
+def _translate_newlines(text: str) -> tuple[str, Callable[[int], int]]:
+    """Translates the "\\r\\n" and lone "\\r" line breaks of text into
+    "\\n" like universal newlines do.
+
+    Returns:
+        The translated text and a function mapping a position in it to the
+        position in text.
+    """
+    if "\r" not in text:
+        return text, lambda position: position
+    # The positions of the "\n" of each "\r\n" in the translated text
+    removed = [
+        match.start() - i for i, match in enumerate(re.finditer("\r\n", text))
+    ]
+    translated = text.replace("\r\n", "\n").replace("\r", "\n")
+    return translated, lambda position: position + bisect.bisect_left(
+        removed, position
+    )
+
+
+def _get_literal_searcher(
+    patterns: tuple[str, ...],
+) -> Callable[[FileReader], Iterator[MatchRecord]]:
+    """Returns a function searching for the strings encoded into the
+    encoding of the file as bytes.
+
+    The strings are searched for with a LiteralSet, so every occurrence of
+    every string is found, also where the strings overlap. Empty strings and
+    the strings that cannot be encoded into the encoding are never found.
+    """
+    prefilter = get_prefilter(tuple(re.escape(p) for p in patterns))
+
+    def search(reader):
+        encoding = reader.encoding() or "utf-8"
+        literals = tuple(
+            text_encodings.encode(pattern, encoding) or b""
+            for pattern in patterns
+        )
+        if not any(literals):
+            return
+        literal_set = get_literal_set(literals)
+        unit = text_encodings.code_unit_size(encoding)
+        for window, offset, newlines_before in _read_windows(
+            reader.binary(), encoding
+        ):
+            if not prefilter.could_match_encoded(window, encoding):
+                continue
+            line_number = reader.lines_before + newlines_before + 1
+            line_start = 0
+            if literal_set is None:
+                found = _find_each(window, literals)
+            else:
+                found = literal_set.find_all(window)
+            for start, pattern_id in found:
+                if start % unit:
+                    continue
+                if unit == 1:
+                    line_number += count_newlines(window, start, line_start)
+                else:
+                    line_number += text_encodings.count_newlines(
+                        window[line_start:start], encoding
+                    )
+                line_start = start
+                yield MatchRecord(
+                    reader.file_path,
+                    line_number,
+                    offset + start,
+                    patterns[pattern_id],
+                    pattern_id,
+                )
+
+    return search
+
+
+def _find_each(
+    window: bytes, literals: tuple[bytes, ...]
+) -> list[tuple[int, int]]:
+    """Finds every occurrence of the non-empty literals in window like
+    LiteralSet.find_all(), with window.find() for each of them."""
+    found = []
+    for pattern_id, literal in enumerate(literals):
+        position = window.find(literal) if literal else -1
+        while position != -1:
+            found.append((position, pattern_id))
+            position = window.find(literal, position + 1)
+    found.sort()
+    return found
+
+
+def _get_line_finditer(
+    patterns: tuple[str, ...],
+) -> tuple[Callable[[str], Iterator[LineMatch]], str | None]:
+    """Returns a function giving the matches of patterns in a line, and the
+    single pattern the patterns were combined into, or None if they could not
+    be combined."""
+    if len(patterns) == 1:
+        compiled = re.compile(patterns[0])
+
+        def finditer(line):
+            for match in compiled.finditer(line):
+                yield match.start(), 0, match.group()
+
+        return finditer, patterns[0]
+
+    combined = combine_patterns(patterns)
+    if combined is None:
+        compiled_patterns = [re.compile(pattern) for pattern in patterns]
+
+        def finditer_separately(line):
+            # Each pattern is searched for separately, like with --regexp
+            return iter(
+                sorted(
+                    (match.start(), pattern_id, match.group())
+                    for pattern_id, compiled in enumerate(compiled_patterns)
+                    for match in compiled.finditer(line)
+                )
+            )
+
+        return finditer_separately, None
+
+    compiled = re.compile(combined)
+    # The group of a pattern is the last group of a match to close
+    group_ids = {
+        compiled.groupindex[f"{PATTERN_GROUP_PREFIX}{i}"]: i
+        for i in range(len(patterns))
+    }
+
+    def finditer_combined(line):
+        for match in compiled.finditer(line):
+            yield match.start(), group_ids[match.lastindex], match.group()
+
+    return finditer_combined, combined
+
+
+def _get_regex_searcher(
+    patterns: tuple[str, ...],
+) -> Callable[[FileReader], Iterator[MatchRecord]]:
+    """Returns a function searching each line for the regular expressions.
+
+    If the patterns allow it (see regex_literals.matches_within_lines()), a
+    window is searched as a whole for the next line with a match, and only
+    that line is searched for all its matches. Otherwise, every line of the
+    windows that pass the prefilter is searched.
+    """
+    finditer, combined = _get_line_finditer(patterns)
+    text_pattern = None
+    if combined is not None and matches_within_lines(combined):
+        text_pattern = re.compile(combined, re.MULTILINE)
+    prefilter = get_prefilter(patterns[0] if len(patterns) == 1 else patterns)
+
+    def search(reader):
+        encoding = reader.encoding() or "utf-8"
+        errors = _get_errors(encoding)
+        for window, offset, newlines_before in _read_windows(
+            reader.binary(), encoding
+        ):
+            if not prefilter.could_match_encoded(window, encoding):
+                continue
+            decoded = window.decode(encoding, errors=errors)
+            # The lines are searched with universal newlines, and the
+            # positions in the translated text are mapped back to decoded
+            text, to_decoded = _translate_newlines(decoded)
+            line_number = reader.lines_before + newlines_before + 1
+            # The start of the previous line searched in the text, its start
+            # in the decoded text and its offset in the file
+            line_start, decoded_start, line_offset = 0, 0, offset
+            position = 0
+            while position < len(text):
+                if text_pattern is not None:
+                    match = text_pattern.search(text, position)
+                    if match is None:
+                        break
+                    position = text.rfind("\n", 0, match.start()) + 1
+                line_end = text.find("\n", position) + 1 or len(text)
+                line = text[position:line_end]
+                line_matches = finditer(line)
+                first = next(line_matches, None)
+                if first is not None:
+                    line_number += text.count("\n", line_start, position)
+                    line_start = position
+                    previous_start = decoded_start
+                    decoded_start = to_decoded(position)
+                    line_offset += _encoded_length(
+                        decoded[previous_start:decoded_start], encoding, errors
+                    )
+                    for start, pattern_id, matched in (first, *line_matches):
+                        match_start = to_decoded(position + start)
+                        yield MatchRecord(
+                            reader.file_path,
+                            line_number,
+                            line_offset
+                            + _encoded_length(
+                                decoded[decoded_start:match_start],
+                                encoding,
+                                errors,
+                            ),
+                            _restore(matched, encoding, errors),
+                            pattern_id,
+                        )
+                position = line_end
+
+    return search
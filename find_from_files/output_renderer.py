@@ -0,0 +1,159 @@
+"""Formats and buffers the output of find_from_files.
+
+Class OutputRenderer takes the width of the terminal once and refreshes it only
+when the terminal is resized (SIGWINCH), instead of querying it for every
+folder and file. The output lines are collected into a buffer, which is
+written to the stream when it has grown large enough or when enough time has
+passed since the previous write. As the time is only checked when a line is
+written, the buffer is also flushed before anything that may take long (see
+OutputRenderer.flush_pending()). When the output is not a terminal (e.g., it
+is redirected to a file or a pipe), the lines are not wrapped to the terminal
+width at all, and the indented strings are built by simple concatenation.
+
+Typical usage example:
+
+    with OutputRenderer() as renderer:
+        renderer.write(renderer.indent("Checking folder: .", 0, 4))
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from typing import TextIO
+
+from find_from_files.ansi_safe_split import ansi_safe_split
+
+DEFAULT_TERMINAL_WIDTH = 80
+OUTPUT_BUFFER_SIZE = 64 * 1024
+FLUSH_INTERVAL = 0.1
+
+
+def get_terminal_width():
+    try:
+        columns, _ = os.get_terminal_size()
+    except OSError:
+        columns = DEFAULT_TERMINAL_WIDTH
+    return columns
+
+
+def get_indented_str(
+    string, first_line_indent_width, indent_width, line_width
+) -> str:
+    """Indents string and splits it into lines of line_width characters.
+
+    The lines are not separated by newlines. They are padded to fill the
+    terminal line, so that the terminal wraps the string at the right places.
+    If line_width is None, the string is only indented and not split at all.
+    """
+    if line_width is None:
+        return " " * first_line_indent_width + string
+    first_line = ansi_safe_split(
+        string, line_width - first_line_indent_width, one_line=True
+    )[0]
+    output = " " * first_line_indent_width + first_line
+    rest = ansi_safe_split(string[len(first_line) :], line_width - indent_width)
+    for line in rest:
+        output += " " * indent_width + line
+    return output
+
+
+class OutputRenderer:
+    """Writes indented output lines to a stream through a buffer.
+
+    Attributes:
+        stream: The stream the output is written to.
+        columns: Width of the terminal, or None if the stream is not a
+            terminal and the output is not wrapped.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        buffer_size: int = OUTPUT_BUFFER_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.stream = sys.stdout if stream is None else stream
+        self.columns = None
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._lines = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._previous_handler = None
+        try:
+            is_tty = self.stream.isatty()
+        except (AttributeError, ValueError):
+            is_tty = False
+        if is_tty:
+            self.columns = get_terminal_width()
+
+    def __enter__(self) -> "OutputRenderer":
+        self.install_resize_handler()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def install_resize_handler(self):
+        """Refreshes the terminal width on SIGWINCH.
+
+        Signal handlers can only be set in the main thread, and SIGWINCH does
+        not exist on every platform, so the width may also stay as it is.
+        """
+        if (
+            self.columns is None
+            or not hasattr(signal, "SIGWINCH")
+            or threading.current_thread() is not threading.main_thread()
+        ):
+            return
+        self._previous_handler = signal.signal(
+            signal.SIGWINCH, self._on_resize
+        )
+
+    def _on_resize(self, *_):
+        self.columns = get_terminal_width()
+
+    def indent(self, string, first_line_indent_width, indent_width) -> str:
+        """Returns string indented for the current width (get_indented_str)."""
+        return get_indented_str(
+            string, first_line_indent_width, indent_width, self.columns
+        )
+
+    def write(self, line: str):
+        """Adds a line to the buffer and flushes the buffer if it is time."""
+        self._lines.append(line)
+        self._buffered += len(line) + 1
+        if (
+            self._buffered >= self._buffer_size
+            or time.monotonic() - self._last_flush >= self._flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered lines to the stream."""
+        if self._lines:
+            self._lines.append("")
+            self.stream.write("\n".join(self._lines))
+            self._lines = []
+            self._buffered = 0
+        self.stream.flush()
+        self._last_flush = time.monotonic()
+
+    def flush_pending(self):
+        """Writes the buffered lines to the stream, if there are any.
+
+        Called before searching a file or waiting for the search of one, so
+        that the lines written before it are not held back while a large file
+        is being searched.
+        """
+        if self._lines:
+            self.flush()
+
+    def close(self):
+        """Flushes the buffer and restores the previous SIGWINCH handler."""
+        self.flush()
+        if self._previous_handler is not None:
+            signal.signal(signal.SIGWINCH, self._previous_handler)
+            self._previous_handler = None
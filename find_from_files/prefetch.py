@@ -0,0 +1,179 @@
+"""Reads files ahead of the search in a pool of threads (--prefetch).
+
+On file systems with a high latency per operation (e.g., NFS or CIFS mounts),
+searching the files one at a time spends most of the time waiting for each
+file to be opened and read. Class Prefetcher opens and reads the next files in
+threads while the current file is searched, and gives them to the search
+functions through a PrefetchedReader, which reads from memory. At most
+max_files files are read ahead, and the contents held in memory are capped at
+max_bytes. A file that does not fit under the cap is only opened in advance,
+and it is read by the search as usual.
+
+Typical usage example:
+
+    with Prefetcher(8) as prefetcher:
+        futures = [prefetcher.submit(file_path) for file_path in file_paths]
+        for future in futures:
+            with future.result() as reader:
+                print(find_folders_with_string("ERROR", reader, False))
+"""
+
+import concurrent.futures
+import contextlib
+import io
+import os
+import threading
+import weakref
+from typing import BinaryIO, Callable, Iterator
+
+from find_from_files.file_reader import FileReader, io_counters
+
+DEFAULT_MAX_PREFETCH_SIZE = 64 * 1024 * 1024
+
+
+class PrefetchedReader(FileReader):
+    """A FileReader of a file opened, and possibly read, by a Prefetcher.
+
+    Attributes:
+        data: The contents of the file, or None if the file was only opened.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        file: BinaryIO | None = None,
+        data: bytes | None = None,
+        release: Callable[[], None] | None = None,
+    ):
+        super().__init__(file_path)
+        self.data = data
+        self._opened_file = file
+        self._release = release
+
+    def __enter__(self) -> "PrefetchedReader":
+        if self.data is not None:
+            self.file = io.BytesIO(self.data)
+        else:
+            self.file = self._opened_file
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the file and frees the memory held for its contents."""
+        if self._opened_file is not None:
+            self._opened_file.close()
+            self._opened_file = None
+        self.file = None
+        self.data = None
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+    @contextlib.contextmanager
+    def buffer(self) -> Iterator[bytes]:
+        self.head()  # Detects the compression
+        with contextlib.ExitStack() as stack:
+            buffer = self.data
+            if buffer is None or self.compression is not None:
+                buffer = stack.enter_context(super().buffer())
+            yield buffer
+
+
+class Prefetcher:
+    """Opens and reads files in a pool of threads.
+
+    Attributes:
+        max_files: Maximum number of files read at the same time.
+        max_bytes: Maximum number of bytes of file contents held in memory.
+        held_bytes: Number of bytes of file contents held in memory.
+    """
+
+    def __init__(
+        self,
+        max_files: int,
+        max_bytes: int = DEFAULT_MAX_PREFETCH_SIZE,
+        opener: Callable[[str, str], BinaryIO] = open,
+    ):
+        """Starts the threads.
+
+        Args:
+            max_files: Maximum number of files read at the same time.
+            max_bytes: Maximum number of bytes of file contents held in
+                memory.
+            opener: Function used for opening the files, like open().
+        """
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._opener = opener
+        self.held_bytes = 0
+        self._lock = threading.Lock()
+        # The readers not closed yet are closed with the prefetcher
+        self._futures = weakref.WeakSet()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_files, thread_name_prefix="prefetch"
+        )
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, file_path: str) -> concurrent.futures.Future:
+        """Starts reading the file.
+
+        Returns:
+            A future of the (unopened) FileReader to search the file with.
+        """
+        future = self._executor.submit(self._read, file_path)
+        self._futures.add(future)
+        return future
+
+    def close(self):
+        """Cancels the reads not started yet, and closes the files read but
+        not searched."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for future in list(self._futures):
+            if future.cancelled():
+                continue
+            reader = future.result()
+            if isinstance(reader, PrefetchedReader):
+                reader.close()
+
+    def _read(self, file_path: str) -> FileReader:
+        try:
+            file = self._opener(file_path, "rb")
+        except OSError:
+            # The error is reported when the search opens the file again
+            return FileReader(file_path)
+        io_counters.opens += 1
+        try:
+            size = os.fstat(file.fileno()).st_size
+        except OSError:
+            return PrefetchedReader(file_path, file)
+        if not self._reserve(size):
+            return PrefetchedReader(file_path, file)
+        try:
+            data = file.read()
+        except OSError:
+            self._free(size)
+            file.close()
+            return FileReader(file_path)
+        file.close()
+        io_counters.reads += 1
+        return PrefetchedReader(
+            file_path, data=data, release=lambda: self._free(size)
+        )
+
+    def _reserve(self, size: int) -> bool:
+        with self._lock:
+            if self.held_bytes + size > self.max_bytes:
+                return False
+            self.held_bytes += size
+            return True
+
+    def _free(self, size: int):
+        with self._lock:
+            self.held_bytes -= size
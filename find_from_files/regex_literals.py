@@ -0,0 +1,440 @@
+"""Analyzes regular expressions with the parser of the re module.
+
+Function required_literals() returns the literal strings that are present in
+every string a pattern matches. These can be used for ruling out files or
+parts of files that cannot contain a match without running the regex.
+Class Prefilter uses them for ruling out texts with str.find() or
+bytes.find(). Function matches_within_lines() tells whether a pattern can be
+run over a whole text at once instead of line by line without changing its
+matches, bytes_equivalence() whether it can be run on the UTF-8 encoded bytes
+of a text instead of the decoded text, and has_group_references() whether a
+pattern refers to its groups.
+
+Typical usage example:
+
+    # Returns ["ERROR ", " timeout=", "ms"]
+    literals = required_literals(r"ERROR \\d+ timeout=(\\d+)ms")
+"""
+
+import functools
+import mmap
+import re
+from re import _constants as sre_constants
+from re import _parser as sre_parser
+from typing import Sequence
+
+from find_from_files.text_encodings import encode
+
+REPEATS = (
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+    sre_constants.POSSESSIVE_REPEAT,
+)
+NEWLINE = ord("\n")
+# Categories of characters that do not include the newline
+NON_NEWLINE_CATEGORIES = (
+    sre_constants.CATEGORY_DIGIT,
+    sre_constants.CATEGORY_WORD,
+    sre_constants.CATEGORY_NOT_SPACE,
+    sre_constants.CATEGORY_NOT_LINEBREAK,
+)
+# Assertions that are evaluated differently at the start or end of a line
+# depending on whether the line is searched separately or as part of a text
+STRING_BOUNDARIES = (
+    sre_constants.AT_BEGINNING_STRING,
+    sre_constants.AT_END_STRING,
+)
+# Assertions that depend on whether the characters around them are
+# alphanumeric, which is decided differently for str and bytes patterns
+WORD_BOUNDARIES = (sre_constants.AT_BOUNDARY, sre_constants.AT_NON_BOUNDARY)
+# The categories \s and \S of str patterns include ASCII control characters
+# that those of bytes patterns do not
+SPACE_CATEGORIES = (
+    sre_constants.CATEGORY_SPACE,
+    sre_constants.CATEGORY_NOT_SPACE,
+)
+# The texts on which a pattern can be run as bytes (see bytes_equivalence())
+BYTES_UTF8 = "utf-8"
+BYTES_ASCII = "ascii"
+
+
+def required_literals(pattern: str | bytes, flags: int = 0) -> list[str]:
+    """Returns the literal substrings every match of pattern must contain.
+
+    Only literals that are matched case-sensitively are returned, so a pattern
+    with the IGNORECASE flag has no required literals. Optional parts of the
+    pattern (alternations, repeats that can match zero times, etc.) end the
+    current literal and are otherwise ignored.
+
+    Args:
+        pattern: A regular expression pattern.
+        flags: The flags the pattern is compiled with.
+
+    Returns:
+        A list of non-empty literal strings, or an empty list if the pattern
+        has no required literals or cannot be parsed.
+    """
+    if isinstance(pattern, bytes):
+        pattern = pattern.decode("latin-1")
+    try:
+        parsed = sre_parser.parse(pattern, flags)
+    except re.error:
+        return []
+    if parsed.state.flags & re.IGNORECASE:
+        return []
+    return _sequence_literals(parsed)
+
+
+class Prefilter:
+    """Rules out texts that cannot contain a match of any of the patterns.
+
+    A text can contain a match of a pattern only if it contains all the
+    required literals of the pattern. Literals containing newlines are not
+    used, because the newlines of a file can be translated when it is
+    decoded. When a file is checked as bytes, it is expected to be valid
+    UTF-8: a literal split by undecodable bytes, which are ignored when the
+    file is decoded, is not found.
+
+    Attributes:
+        literals: A tuple of the required literals of each pattern, or None if
+            one of the patterns has none, i.e., no text can be ruled out.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.literals = []
+        for pattern in patterns:
+            literals = [
+                literal
+                for literal in required_literals(pattern)
+                if "\n" not in literal and "\r" not in literal
+            ]
+            if not literals:
+                self.literals = None
+                break
+            # Longer literals are rarer, so they are checked first
+            literals.sort(key=len, reverse=True)
+            self.literals.append(tuple(literals))
+        self._encoded_literals = None
+        # The literals encoded into other encodings, by the encoding
+        self._literals_by_encoding = {}
+        if self.literals is not None:
+            self._encoded_literals = [
+                tuple(literal.encode("utf-8") for literal in literals)
+                for literals in self.literals
+            ]
+
+    def could_match(self, text: str) -> bool:
+        """Tells whether text contains the literals of any of the patterns."""
+        if self.literals is None:
+            return True
+        return any(
+            all(literal in text for literal in literals)
+            for literals in self.literals
+        )
+
+    def could_match_bytes(self, buffer: bytes | mmap.mmap) -> bool:
+        """Tells whether the UTF-8 encoded text in buffer contains the
+        literals of any of the patterns."""
+        if self._encoded_literals is None:
+            return True
+        return any(
+            all(buffer.find(literal) != -1 for literal in literals)
+            for literals in self._encoded_literals
+        )
+
+    def could_match_encoded(
+        self, buffer: bytes | mmap.mmap, encoding: str
+    ) -> bool:
+        """Tells whether the text in encoding in buffer contains the literals
+        of any of the patterns.
+
+        A pattern with a literal that cannot be encoded into encoding cannot
+        match. In UTF-16 and UTF-32, a literal can also be found at an offset
+        that is not at the start of a code unit, so this only rules out
+        texts.
+        """
+        if self._encoded_literals is None or encoding == "utf-8":
+            return self.could_match_bytes(buffer)
+        encoded_literals = self._literals_by_encoding.get(encoding)
+        if encoded_literals is None:
+            encoded_literals = []
+            for literals in self.literals:
+                encoded = [encode(literal, encoding) for literal in literals]
+                if None not in encoded:
+                    encoded_literals.append(tuple(encoded))
+            self._literals_by_encoding[encoding] = encoded_literals
+        return any(
+            all(buffer.find(literal) != -1 for literal in literals)
+            for literals in encoded_literals
+        )
+
+
+@functools.lru_cache(maxsize=8)
+def get_prefilter(pattern: str | tuple[str, ...]) -> Prefilter:
+    """Returns the Prefilter of a pattern or a tuple of patterns.
+
+    The patterns are analyzed only once per process.
+    """
+    return Prefilter([pattern] if isinstance(pattern, str) else pattern)
+
+
+def _sequence_literals(items) -> list[str]:
+    """Returns the required literals of a parsed sequence of regex items."""
+    literals = []
+    current = ""
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            current += chr(av)
+            continue
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, _, sub_items = av
+            if add_flags & re.IGNORECASE:
+                sub_literals = []
+            elif _is_literal(sub_items):
+                # A group of only literals continues the current literal
+                current += "".join(chr(code) for _, code in sub_items)
+                continue
+            else:
+                sub_literals = _sequence_literals(sub_items)
+        elif op in REPEATS and av[0] >= 1:
+            sub_literals = _sequence_literals(av[2])
+        elif op is sre_constants.ATOMIC_GROUP:
+            sub_literals = _sequence_literals(av)
+        else:
+            sub_literals = []
+        if current:
+            literals.append(current)
+            current = ""
+        literals.extend(sub_literals)
+    if current:
+        literals.append(current)
+    return literals
+
+
+def _is_literal(items) -> bool:
+    return all(op is sre_constants.LITERAL for op, _ in items)
+
+
+@functools.lru_cache(maxsize=64)
+def matches_within_lines(pattern: str, flags: int = 0) -> bool:
+    """Tells whether pattern finds the same matches in a whole text as in
+    each of its lines separately.
+
+    If this returns True, pattern compiled with the MULTILINE flag finds the
+    same matches in a text as pattern does in each line (including the
+    newline) of the text, as long as the matches do not span several lines.
+    This is the case when the pattern cannot match an empty string and does
+    not contain lookarounds or the \\A and \\Z assertions. If the pattern can
+    match a newline, it must not contain any other assertions or atomic
+    parts either, because those could then behave differently right after
+    the newline.
+
+    Args:
+        pattern: A regular expression pattern.
+        flags: The flags the pattern is compiled with.
+
+    Returns:
+        True if the pattern can be run over a whole text instead of line by
+        line, False if not or if the pattern cannot be parsed.
+    """
+    try:
+        parsed = sre_parser.parse(pattern, flags)
+    except re.error:
+        return False
+    if parsed.getwidth()[0] == 0:
+        return False
+    features = set()
+    _collect_features(parsed, bool(parsed.state.flags & re.DOTALL), features)
+    if "lookaround" in features or "string boundary" in features:
+        return False
+    return "newline" not in features or not (
+        "assertion" in features or "atomic" in features
+    )
+
+
+def _collect_features(items, dotall: bool, features: set[str]):
+    """Adds the features of a parsed sequence of regex items to features."""
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if av == NEWLINE:
+                features.add("newline")
+        elif op is sre_constants.NOT_LITERAL:
+            if av != NEWLINE:
+                features.add("newline")
+        elif op is sre_constants.ANY:
+            if dotall:
+                features.add("newline")
+        elif op is sre_constants.IN:
+            if _set_can_match_newline(av):
+                features.add("newline")
+        elif op is sre_constants.AT:
+            if av in STRING_BOUNDARIES:
+                features.add("string boundary")
+            features.add("assertion")
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            features.add("lookaround")
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub_items = av
+            if del_flags & re.MULTILINE:
+                # The pattern is run over a text with the MULTILINE flag
+                features.add("string boundary")
+            sub_dotall = bool(
+                (dotall or add_flags & re.DOTALL) and not del_flags & re.DOTALL
+            )
+            _collect_features(sub_items, sub_dotall, features)
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                _collect_features(branch, dotall, features)
+        elif op in REPEATS:
+            if op is sre_constants.POSSESSIVE_REPEAT:
+                features.add("atomic")
+            _collect_features(av[2], dotall, features)
+        elif op is sre_constants.ATOMIC_GROUP:
+            features.add("atomic")
+            _collect_features(av, dotall, features)
+        elif op is sre_constants.GROUPREF_EXISTS:
+            _, then_items, else_items = av
+            _collect_features(then_items, dotall, features)
+            if else_items is not None:
+                _collect_features(else_items, dotall, features)
+
+
+def _set_can_match_newline(set_items) -> bool:
+    """Tells (conservatively) whether a character set can match a newline."""
+    for op, av in set_items:
+        if op is sre_constants.NEGATE:
+            return True
+        if op is sre_constants.LITERAL and av == NEWLINE:
+            return True
+        if op is sre_constants.RANGE and av[0] <= NEWLINE <= av[1]:
+            return True
+        if op is sre_constants.CATEGORY and av not in NON_NEWLINE_CATEGORIES:
+            return True
+    return False
+
+
+@functools.lru_cache(maxsize=64)
+def bytes_equivalence(pattern: str, flags: int = 0) -> str | None:
+    """Tells on which texts pattern can be run on the UTF-8 encoded bytes
+    instead of the text.
+
+    The pattern is then compiled from its ASCII encoding as a bytes pattern,
+    and it finds the encoded matches of pattern in the encoded text. This
+    holds for all the texts (BYTES_UTF8) if the pattern consists only of
+    ASCII characters and sets of them, and cannot match an empty string, so
+    that it neither matches a part of a multibyte character nor depends on how
+    many bytes the characters take. If the pattern contains parts that can
+    match non-ASCII characters or depend on them, like ".", "\\w", "\\b",
+    negated sets or case-insensitive parts, this holds only for ASCII texts
+    (BYTES_ASCII). As with Prefilter, texts given as bytes are expected to be
+    valid UTF-8.
+
+    Args:
+        pattern: A regular expression pattern.
+        flags: The flags the pattern is compiled with.
+
+    Returns:
+        BYTES_UTF8, BYTES_ASCII, or None if the pattern must be run on the
+        text, e.g., because it contains non-ASCII characters or "\\s".
+    """
+    try:
+        parsed = sre_parser.parse(pattern, flags)
+        re.compile(pattern.encode("ascii"), flags)
+    except (re.error, UnicodeEncodeError):
+        return None
+    features = set()
+    _collect_bytes_features(parsed, features)
+    if "non-ascii" in features or "space" in features:
+        return None
+    if (
+        "unicode" in features
+        or parsed.state.flags & re.IGNORECASE
+        or parsed.getwidth()[0] == 0
+    ):
+        return BYTES_ASCII
+    return BYTES_UTF8
+
+
+def _collect_bytes_features(items, features: set[str]):
+    """Adds the features of a parsed sequence of regex items that matter for
+    running it as a bytes pattern to features."""
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if av >= 0x80:
+                features.add("non-ascii")
+        elif op in (sre_constants.NOT_LITERAL, sre_constants.ANY):
+            features.add("unicode")
+        elif op is sre_constants.IN:
+            _collect_set_bytes_features(av, features)
+        elif op is sre_constants.AT:
+            if av in WORD_BOUNDARIES:
+                features.add("unicode")
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, _, sub_items = av
+            if add_flags & re.IGNORECASE:
+                features.add("unicode")
+            _collect_bytes_features(sub_items, features)
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                _collect_bytes_features(branch, features)
+        elif op in REPEATS:
+            _collect_bytes_features(av[2], features)
+        elif op is sre_constants.ATOMIC_GROUP:
+            _collect_bytes_features(av, features)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            _collect_bytes_features(av[1], features)
+        elif op is sre_constants.GROUPREF_EXISTS:
+            _, then_items, else_items = av
+            _collect_bytes_features(then_items, features)
+            if else_items is not None:
+                _collect_bytes_features(else_items, features)
+
+
+def _collect_set_bytes_features(set_items, features: set[str]):
+    for op, av in set_items:
+        if op is sre_constants.LITERAL and av >= 0x80:
+            features.add("non-ascii")
+        elif op is sre_constants.RANGE and av[1] >= 0x80:
+            features.add("non-ascii")
+        elif op is sre_constants.NEGATE:
+            features.add("unicode")
+        elif op is sre_constants.CATEGORY:
+            if av in SPACE_CATEGORIES:
+                features.add("space")
+            else:
+                features.add("unicode")
+
+
+def has_group_references(pattern: str) -> bool:
+    """Tells whether pattern contains backreferences or conditional groups.
+
+    Such a pattern cannot be embedded in a larger pattern, because the numbers
+    of its groups would change. A pattern that cannot be parsed is considered
+    to have references.
+    """
+    try:
+        parsed = sre_parser.parse(pattern)
+    except re.error:
+        return True
+    return _has_group_references(parsed)
+
+
+def _has_group_references(items) -> bool:
+    for op, av in items:
+        if op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            return True
+        if op is sre_constants.SUBPATTERN:
+            sub_sequences = [av[3]]
+        elif op is sre_constants.BRANCH:
+            sub_sequences = av[1]
+        elif op in REPEATS:
+            sub_sequences = [av[2]]
+        elif op is sre_constants.ATOMIC_GROUP:
+            sub_sequences = [av]
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            sub_sequences = [av[1]]
+        else:
+            sub_sequences = []
+        if any(_has_group_references(sub) for sub in sub_sequences):
+            return True
+    return False
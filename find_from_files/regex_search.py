@@ -0,0 +1,464 @@
+"""Finds the lines of a text file that match a regular expression.
+
+Function find_matching_lines() goes through the lines of a text stream that
+contain matches of a pattern, and gives the matches of each line as
+re.findall() returns them. If the pattern allows it (see
+regex_literals.matches_within_lines()), the text is read in large chunks that
+are searched with a single finditer() call each, so that nothing is done for
+the lines without matches. The line numbers are found by counting the
+newlines between consecutive matches, and only the matching lines are split
+out of the chunk. Other patterns, and files in which most of the lines
+match, are searched with findall() line by line. Chunks that do not contain
+the literals every match must contain (see regex_literals.Prefilter) are
+skipped without running the regex at all. Several patterns are
+searched for in the same pass by combining them into an alternation of named
+groups (see combine_patterns()). Function find_matching_lines_in_bytes() does
+the same for a binary stream in any text encoding, running the patterns on
+the raw bytes where they can be and decoding only the matching lines.
+
+Typical usage example:
+
+    with open(file_path, encoding="utf-8") as file:
+        for line_number, line, matches in find_matching_lines(pattern, file):
+            print(f"{line_number}: {matches}")
+"""
+
+import re
+from typing import (
+    BinaryIO,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Sequence,
+    TextIO,
+)
+
+from find_from_files.buffers import read_line_windows
+from find_from_files.regex_literals import (
+    BYTES_ASCII,
+    BYTES_UTF8,
+    bytes_equivalence,
+    get_prefilter,
+    has_group_references,
+    matches_within_lines,
+)
+from find_from_files.text_encodings import (
+    is_ascii_compatible,
+    read_code_unit_windows,
+)
+
+TEXT_CHUNK_SIZE = 1024 * 1024
+# The rest of a file is searched line by line after at least this many lines
+# have matched and at least every DENSE_LINE_RATIO:th line has matched
+DENSE_MIN_MATCHING_LINES = 256
+DENSE_LINE_RATIO = 4
+PATTERN_GROUP_PREFIX = "_find_from_files_pattern_"
+
+
+# A line containing matches: the number of the line (starting from 1), the
+# line (with or without the newline) and its matches as re.findall() returns
+# them. Plain tuples are used, because they are much faster to create than
+# named tuples, and a dense file can have a matching line for every line.
+MatchingLine = tuple[int, str, list]
+
+
+def find_matching_lines(
+    pattern: str | Sequence[str], file: TextIO
+) -> Iterator[MatchingLine]:
+    """Yields the lines of file that contain matches of pattern, in order.
+
+    Args:
+        pattern: A regular expression pattern, or a list of patterns. The
+            patterns of a list are searched for in the same pass, and each
+            match is given as a tuple of the id (index) of the pattern that
+            matched and the match as re.findall() returns it for the pattern.
+        file: A text stream. Its newlines are expected to be translated to
+            "\\n", as they are by default in text mode.
+
+    Yields:
+        A MatchingLine tuple for each line with matches.
+    """
+    findall, findall_value, text_pattern = _compile_search(pattern)
+    prefilter = get_prefilter(
+        pattern if isinstance(pattern, str) else tuple(pattern)
+    )
+    if text_pattern is None and prefilter.literals is None:
+        yield from _search_lines(findall, file, 1)
+        return
+
+    lines_before = 0
+    dense = False
+    while not dense:
+        text = file.read(TEXT_CHUNK_SIZE)
+        if not text:
+            return
+        if not text.endswith("\n"):
+            text += file.readline()
+        # Chunks without the required literals cannot contain matches
+        if prefilter.could_match(text):
+            if text_pattern is None:
+                yield from _search_lines(
+                    findall, _split_lines(text), lines_before + 1
+                )
+            else:
+                dense = yield from _search_text(
+                    text_pattern, findall, findall_value, text, lines_before
+                )
+        lines_before += text.count("\n")
+
+    # Most of the lines match, which is faster to search line by line
+    yield from _search_lines(findall, file, lines_before + 1)
+
+
+def find_matching_lines_in_bytes(
+    pattern: str | Sequence[str], stream: BinaryIO, encoding: str = "utf-8"
+) -> Iterator[MatchingLine]:
+    """Yields the lines of a binary stream of text in encoding that contain
+    matches of pattern, in order, decoding only the matching lines.
+
+    The stream is read in windows of whole lines (see
+    text_encodings.read_code_unit_windows() for UTF-16 and UTF-32). If the
+    encoding is ASCII compatible and the patterns allow it (see
+    regex_literals.bytes_equivalence()), they are compiled as bytes patterns
+    and run on the windows as they are, and only the lines with matches and
+    their matches are decoded. The other windows, e.g., those with non-ASCII
+    text for patterns with "\\w", those in UTF-16, and those with carriage
+    returns, whose newlines need to be translated, are decoded and searched
+    like with find_matching_lines(), but only if they contain the literals of
+    the patterns encoded into encoding (see
+    regex_literals.Prefilter.could_match_encoded()). The lines and matches
+    are the same as those find_matching_lines() gives for the stream decoded
+    with encoding, ignoring undecodable bytes, with universal newlines.
+
+    Args:
+        pattern: A regular expression pattern, or a list of patterns, as with
+            find_matching_lines().
+        stream: A binary stream.
+        encoding: The encoding of the text (see is_binary.detect_encoding()).
+
+    Yields:
+        A MatchingLine tuple for each line with matches.
+    """
+    scope = None
+    if is_ascii_compatible(encoding):
+        scope = bytes_search_scope(pattern)
+        windows = read_line_windows(stream)
+    else:
+        windows = read_code_unit_windows(stream, encoding)
+    text_search = _compile_search(pattern)
+    bytes_search = None
+    if scope is not None:
+        bytes_search = _compile_search(pattern, encode=True)
+    any_text = scope == BYTES_UTF8
+    prefilter = get_prefilter(
+        pattern if isinstance(pattern, str) else tuple(pattern)
+    )
+    carriage_return = "\r".encode(encoding)
+    dense = False
+    # The line breaks before the windows are counted like universal newlines
+    for window, _, lines_before in windows:
+        has_carriage_returns = window.find(carriage_return) != -1
+        if (
+            bytes_search is not None
+            and not has_carriage_returns
+            and (any_text or window.isascii())
+        ):
+            if not prefilter.could_match_bytes(window):
+                continue
+            text = window
+            findall, findall_value, text_pattern = bytes_search
+        elif not has_carriage_returns:
+            if not prefilter.could_match_encoded(window, encoding):
+                continue
+            text = window.decode(encoding, errors="ignore")
+            findall, findall_value, text_pattern = text_search
+        else:
+            text = window.decode(encoding, errors="ignore")
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+            if not prefilter.could_match(text):
+                continue
+            findall, findall_value, text_pattern = text_search
+        if dense or text_pattern is None:
+            found = _search_lines(findall, _split_lines(text), lines_before + 1)
+        else:
+            found = _search_text(
+                text_pattern, findall, findall_value, text, lines_before
+            )
+        if text is window:
+            found = _decode_matching_lines(found, encoding)
+        # Not inside the "or", where pylint misses that this is a generator
+        found_dense = yield from found
+        dense = found_dense or dense
+
+
+def bytes_search_scope(pattern: str | Sequence[str]) -> str | None:
+    """Tells on which texts pattern or a list of patterns can be run on
+    bytes (see regex_literals.bytes_equivalence()).
+
+    Returns:
+        BYTES_UTF8, BYTES_ASCII or None.
+    """
+    if isinstance(pattern, str):
+        return bytes_equivalence(pattern)
+    combined = combine_patterns(pattern)
+    scopes = {
+        bytes_equivalence(pattern)
+        for pattern in (pattern if combined is None else [combined])
+    }
+    for scope in (None, BYTES_ASCII):
+        if scope in scopes:
+            return scope
+    return BYTES_UTF8
+
+
+def _compile_search(
+    pattern: str | Sequence[str], encode: bool = False
+) -> tuple[Callable, Callable | None, re.Pattern | None]:
+    """Compiles pattern or a list of patterns for searching lines.
+
+    If encode is True, the patterns are compiled from their ASCII encodings as
+    bytes patterns.
+
+    Returns:
+        A tuple of a findall() function for a line, a function returning a
+        match of the text pattern as findall() returns it, or None if the
+        patterns could not be combined, and the text pattern compiled with
+        the MULTILINE flag, or None if the pattern must be run line by line.
+    """
+
+    def compile_pattern(pattern, flags=0):
+        return re.compile(pattern.encode("ascii") if encode else pattern, flags)
+
+    findall_value = None
+    if isinstance(pattern, str):
+        combined = pattern
+        line_pattern = compile_pattern(pattern)
+        findall = line_pattern.findall
+        findall_value = _get_findall_value(line_pattern)
+    else:
+        combined = combine_patterns(pattern)
+        if combined is None:
+            findall = _get_separate_findall(
+                [compile_pattern(pattern) for pattern in pattern]
+            )
+        else:
+            line_pattern = compile_pattern(combined)
+            findall_value = _get_pattern_value(line_pattern, pattern)
+
+            def findall(line):
+                return [
+                    findall_value(match)
+                    for match in line_pattern.finditer(line)
+                ]
+
+    text_pattern = None
+    if combined is not None and matches_within_lines(combined):
+        text_pattern = compile_pattern(combined, re.MULTILINE)
+    return findall, findall_value, text_pattern
+
+
+def _decode_matching_lines(
+    found: Generator[MatchingLine, None, bool], encoding: str
+) -> Generator[MatchingLine, None, bool]:
+    """Decodes the lines and matches of found, which are bytes in encoding,
+    and returns what found returns."""
+    while True:
+        try:
+            line_number, line, matches = next(found)
+        except StopIteration as stop:
+            return stop.value
+        yield line_number, decode_value(line, encoding), [
+            decode_value(match, encoding) for match in matches
+        ]
+
+
+def decode_value(value, encoding: str):
+    """Decodes a line or a match (as findall() returns it) from encoding,
+    ignoring undecodable bytes.
+
+    Every line and match found in bytes by find_matching_lines_in_bytes() is
+    decoded with this function.
+    """
+    if isinstance(value, bytes):
+        return value.decode(encoding, errors="ignore")
+    if isinstance(value, tuple):
+        return tuple(decode_value(item, encoding) for item in value)
+    return value
+
+
+def _search_lines(
+    findall: Callable[[str], list], lines: Iterable[str], first_line_number
+) -> Iterator[MatchingLine]:
+    """Searches the lines one by one with findall()."""
+    for line_number, line in enumerate(lines, first_line_number):
+        matches = findall(line)
+        if matches:
+            yield line_number, line, matches
+
+
+def combine_patterns(patterns: Sequence[str]) -> str | None:
+    """Combines patterns into a single alternation of named groups.
+
+    The group of the pattern with the id (index) i is named
+    PATTERN_GROUP_PREFIX + str(i). At each position, the first of the patterns
+    that matches is used, as with any alternation.
+
+    Returns:
+        The combined pattern, or None if the patterns cannot be combined
+        because one of them refers to its groups by number, sets global flags
+        or uses the same group names as another one.
+    """
+    for pattern in patterns:
+        if has_group_references(pattern):
+            return None
+        if re.compile(pattern).flags & ~re.UNICODE:
+            return None
+    combined = "|".join(
+        f"(?P<{PATTERN_GROUP_PREFIX}{i}>{pattern})"
+        for i, pattern in enumerate(patterns)
+    )
+    try:
+        re.compile(combined)
+    except re.error:
+        return None
+    return combined
+
+
+def _search_text(
+    text_pattern: re.Pattern,
+    findall: Callable[[str], list],
+    findall_value: Callable[[re.Match], object],
+    text: str,
+    lines_before: int,
+) -> Generator[MatchingLine, None, bool]:
+    """Yields the matching lines of text, which consists of whole lines.
+
+    The matches of a line are given by findall_value() for the matches of
+    text_pattern, or by findall() when the lines are searched one by one.
+    Matches spanning several lines are not found when searching line by line,
+    so the lines such a match is on are searched with findall() one by one,
+    and the search of the text continues from the line after them. If enough
+    of the lines match, the rest of the text is searched line by line, because
+    creating a match object for every match then costs more than splitting
+    the lines.
+
+    The text and the patterns can also be bytes.
+
+    Returns:
+        True if the text was found to be dense with matches, otherwise False.
+    """
+    newline = b"\n" if isinstance(text, bytes) else "\n"
+    # Start and number of the line of the previous match, and its matches
+    line_start, line_number, line_matches = 0, lines_before + 1, []
+    matching_line_count = 0
+    position = 0
+    while position < len(text):
+        for match in text_pattern.finditer(text, position):
+            start, end = match.span()
+            if text.find(newline, line_start, start) != -1:
+                # The match is on a later line than the previous one
+                if line_matches:
+                    line_end = text.find(newline, line_start)
+                    yield line_number, text[line_start:line_end], line_matches
+                    line_matches = []
+                match_line_start = text.rfind(newline, line_start, start) + 1
+                line_number += text.count(newline, line_start, match_line_start)
+                line_start = match_line_start
+                matching_line_count += 1
+                if (
+                    matching_line_count >= DENSE_MIN_MATCHING_LINES
+                    and matching_line_count * DENSE_LINE_RATIO
+                    >= line_number - lines_before
+                ):
+                    for line in _split_lines(text[line_start:]):
+                        matches = findall(line)
+                        if matches:
+                            yield line_number, line, matches
+                        line_number += 1
+                    return True
+            if text.find(newline, start, end - 1) == -1:
+                line_matches.append(findall_value(match))
+                continue
+
+            # The match spans several lines
+            line_matches = []
+            lines_end = text.find(newline, end - 1) + 1 or len(text)
+            for line in _split_lines(text[line_start:lines_end]):
+                matches = findall(line)
+                if matches:
+                    yield line_number, line, matches
+                line_number += 1
+            line_start = position = lines_end
+            break
+        else:
+            break
+    if line_matches:
+        line_end = text.find(newline, line_start)
+        if line_end == -1:
+            line_end = len(text)
+        yield line_number, text[line_start:line_end], line_matches
+    return False
+
+
+def _split_lines(text: str) -> list[str]:
+    """Splits text (str or bytes) into lines at "\n" only, keeping the
+    newlines."""
+    newline = b"\n" if isinstance(text, bytes) else "\n"
+    lines = [line + newline for line in text.split(newline)]
+    lines[-1] = lines[-1][:-1]
+    return lines if lines[-1] else lines[:-1]
+
+
+def _get_findall_value(
+    pattern: re.Pattern,
+) -> Callable[[re.Match], str | tuple[str, ...]]:
+    """Returns a function returning a match as re.findall() would return it."""
+    if pattern.groups == 0:
+        return re.Match.group
+    if pattern.groups == 1:
+        return lambda match: match.group(1) or ""
+    return lambda match: match.groups("")
+
+
+def _get_pattern_value(
+    combined_pattern: re.Pattern, patterns: Sequence[str]
+) -> Callable[[re.Match], tuple[int, str | tuple[str, ...]]]:
+    """Returns a function returning a match of combined_pattern as a tuple of
+    the id of the pattern that matched and the value re.findall() would
+    return for the pattern."""
+    # The group of a pattern is the last group of a match to close, so the
+    # index of the last group tells which pattern matched
+    pattern_groups = {}
+    for pattern_id, pattern in enumerate(patterns):
+        name = f"{PATTERN_GROUP_PREFIX}{pattern_id}"
+        group = combined_pattern.groupindex[name]
+        pattern_groups[group] = (pattern_id, re.compile(pattern).groups)
+
+    def get_value(match):
+        group = match.lastindex
+        pattern_id, group_count = pattern_groups[group]
+        if group_count == 0:
+            return pattern_id, match.group(group)
+        if group_count == 1:
+            return pattern_id, match.group(group + 1) or ""
+        groups = range(group + 1, group + 1 + group_count)
+        return pattern_id, tuple(match.group(i) or "" for i in groups)
+
+    return get_value
+
+
+def _get_separate_findall(
+    patterns: Sequence[str | re.Pattern],
+) -> Callable[[str], list[tuple[int, str | tuple[str, ...]]]]:
+    """Returns a function searching a line for each of patterns separately."""
+    compiled = list(enumerate(re.compile(pattern) for pattern in patterns))
+
+    def findall(line):
+        return [
+            (pattern_id, match)
+            for pattern_id, pattern in compiled
+            for match in pattern.findall(line)
+        ]
+
+    return findall
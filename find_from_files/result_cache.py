@@ -0,0 +1,182 @@
+"""A persistent cache of the search results of files, stored in SQLite.
+
+Class ResultCache stores the output of searching a file for a query, together
+with the identity of the file when it was searched (inode, size, modification
+time and mode). A file whose identity has not changed since then is answered
+from the cache without opening it. The cache holds one result per file and
+query, and the least recently used results are evicted when the total size of
+the stored outputs grows past the size cap. The results found and stored
+during a search are written to the database in a single transaction when the
+cache is closed.
+
+Typical usage example:
+
+    with ResultCache(CACHE_DIRECTORY) as cache:
+        stat_result = os.stat(file_path)
+        cached = cache.get(file_path, stat_result, query)
+        if cached is None:
+            cached = search(file_path)
+            cache.put(file_path, stat_result, query, *cached)
+"""
+
+import os
+import sqlite3
+import time
+
+CACHE_FILE_NAME = "results.sqlite3"
+DEFAULT_MAX_CACHE_SIZE = 64 * 1024 * 1024
+# Estimated size of a row without the output, used for the size cap
+ROW_OVERHEAD = 128
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    path TEXT NOT NULL,
+    query TEXT NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    mode INTEGER NOT NULL,
+    binary INTEGER NOT NULL,
+    output TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (path, query)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+def get_identity(stat_result: os.stat_result) -> tuple[int, int, int, int]:
+    """Returns the (inode, size, mtime_ns, mode) identity of a file."""
+    return (
+        stat_result.st_ino,
+        stat_result.st_size,
+        stat_result.st_mtime_ns,
+        stat_result.st_mode,
+    )
+
+
+class ResultCache:
+    """A cache of the search results of files in an SQLite database.
+
+    Attributes:
+        cache_path: Path of the database file.
+        max_size: Size cap of the cache in bytes.
+        hits: Number of results found in the cache.
+        misses: Number of results not found in the cache.
+    """
+
+    def __init__(
+        self, cache_directory: str, max_size: int = DEFAULT_MAX_CACHE_SIZE
+    ):
+        """Opens the cache in cache_directory, creating it if needed.
+
+        Raises:
+            OSError: If the cache directory cannot be created.
+            sqlite3.Error: If the database cannot be opened.
+        """
+        os.makedirs(cache_directory, exist_ok=True)
+        self.cache_path = os.path.join(cache_directory, CACHE_FILE_NAME)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._used: list[tuple[int, str, str]] = []
+        self._stored: list[tuple] = []
+        self._connection = sqlite3.connect(self.cache_path, timeout=10)
+        try:
+            self._connection.executescript(SCHEMA)
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(
+        self, path: str, stat_result: os.stat_result, query: str
+    ) -> tuple[bool, str] | None:
+        """Returns the cached result of searching the file for query.
+
+        Returns:
+            A tuple of a boolean telling whether the file is binary and the
+            output of the search, or None if the file has not been searched
+            for the query or has changed since.
+        """
+        row = self._connection.execute(
+            "SELECT inode, size, mtime_ns, mode, binary, output FROM results "
+            "WHERE path = ? AND query = ?",
+            (path, query),
+        ).fetchone()
+        if row is None or tuple(row[:4]) != get_identity(stat_result):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.append((time.time_ns(), path, query))
+        return bool(row[4]), row[5]
+
+    def put(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        query: str,
+        binary: bool,
+        output: str,
+    ):
+        """Stores the result of searching the file for query."""
+        self._stored.append(
+            (
+                path,
+                query,
+                *get_identity(stat_result),
+                int(binary),
+                output,
+                time.time_ns(),
+            )
+        )
+
+    def close(self):
+        """Writes the results used and stored to the database, evicts the
+        least recently used results past the size cap, and closes it."""
+        try:
+            with self._connection:
+                self._connection.executemany(
+                    "UPDATE results SET last_used = ? "
+                    "WHERE path = ? AND query = ?",
+                    self._used,
+                )
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO results VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._stored,
+                )
+                self._evict()
+        finally:
+            self._used = []
+            self._stored = []
+            self._connection.close()
+
+    def _evict(self):
+        """Deletes the least recently used results until the cache fits in
+        max_size."""
+        (size,) = self._connection.execute(
+            "SELECT COALESCE(SUM(LENGTH(path) + LENGTH(query) + LENGTH(output)"
+            " + ?), 0) FROM results",
+            (ROW_OVERHEAD,),
+        ).fetchone()
+        if size <= self.max_size:
+            return
+        rows = self._connection.execute(
+            "SELECT path, query, LENGTH(path) + LENGTH(query) + LENGTH(output)"
+            " + ? FROM results ORDER BY last_used",
+            (ROW_OVERHEAD,),
+        )
+        evicted = []
+        for path, query, row_size in rows:
+            if size <= self.max_size:
+                break
+            evicted.append((path, query))
+            size -= row_size
+        self._connection.executemany(
+            "DELETE FROM results WHERE path = ? AND query = ?", evicted
+        )
@@ -0,0 +1,205 @@
+"""Statistics of a search: the time spent in each phase and the throughput
+(--stats).
+
+The search is divided into phases: walking the directories (PHASE_WALK),
+opening the files and reading their heads (PHASE_READ), detecting binary files
+(PHASE_SNIFF), searching the files with the search function, including reading
+the rest of them (PHASE_MATCH), and rendering and printing the output
+(PHASE_RENDER). The wall-clock and CPU time of each phase are summed up with
+plain counters, which cost a couple of clock reads per measurement. The files
+are timed with a FileTimer where they are searched, possibly in a worker
+process, and the timings are added to the SearchStats of the search together
+with the sizes of the files, the files skipped, and the slowest files.
+
+Typical usage example:
+
+    stats = SearchStats()
+    for root, files, skipped in stats.timed_iter(walk_directories(base)):
+        for entry in files:
+            timer = FileTimer()
+            search(entry.path)
+            timer.lap(PHASE_MATCH)
+            stats.add_file(entry.path, entry.stat().st_size, timer.times)
+    for line in stats.report_lines():
+        print(line)
+"""
+
+import heapq
+import time
+from typing import Callable, Iterator
+
+PHASE_WALK = "walk"
+PHASE_READ = "read"
+PHASE_SNIFF = "sniff"
+PHASE_MATCH = "match"
+PHASE_RENDER = "render"
+PHASES = (PHASE_WALK, PHASE_READ, PHASE_SNIFF, PHASE_MATCH, PHASE_RENDER)
+DEFAULT_SLOWEST_FILE_COUNT = 10
+
+
+class FileTimer:
+    """Measures the phases of searching a file one after another.
+
+    Attributes:
+        times: Dictionary of the wall-clock and CPU time in seconds of each
+            phase measured.
+    """
+
+    __slots__ = ("times", "_wall", "_cpu")
+
+    def __init__(self):
+        self.times: dict[str, tuple[float, float]] = {}
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+
+    def lap(self, phase: str):
+        """Adds the time since the previous lap (or the start) to phase."""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        previous_wall, previous_cpu = self.times.get(phase, (0.0, 0.0))
+        self.times[phase] = (
+            previous_wall + wall - self._wall,
+            previous_cpu + cpu - self._cpu,
+        )
+        self._wall, self._cpu = wall, cpu
+
+
+class SearchStats:
+    """Statistics of a search.
+
+    The times of the phases of searching the files are summed over all the
+    files, so with worker processes, they can be longer than the search.
+
+    Attributes:
+        wall_times: Wall-clock time in seconds spent in each phase.
+        cpu_times: CPU time in seconds spent in each phase.
+        elapsed: Wall-clock time in seconds of the whole search.
+        files: Number of files whose contents were searched. The files
+            skipped as binary are not counted.
+        bytes: Total size of the files whose contents were searched.
+        skipped_by_suffix: Number of files skipped because of their suffix.
+        skipped_by_prefix: Number of folders skipped because of their prefix.
+        skipped_binary: Number of files skipped as binary.
+        slowest_file_count: Number of the slowest files kept.
+    """
+
+    def __init__(self, slowest_file_count: int = DEFAULT_SLOWEST_FILE_COUNT):
+        self.wall_times = dict.fromkeys(PHASES, 0.0)
+        self.cpu_times = dict.fromkeys(PHASES, 0.0)
+        self.elapsed = 0.0
+        self.files = 0
+        self.bytes = 0
+        self.skipped_by_suffix = 0
+        self.skipped_by_prefix = 0
+        self.skipped_binary = 0
+        self.slowest_file_count = slowest_file_count
+        # A min-heap of the (wall time, path) of the slowest files
+        self._slowest: list[tuple[float, str]] = []
+        self._start = time.perf_counter()
+
+    def add_times(self, times: dict[str, tuple[float, float]]):
+        """Adds the phase times measured by a FileTimer."""
+        for phase, (wall, cpu) in times.items():
+            self.wall_times[phase] += wall
+            self.cpu_times[phase] += cpu
+
+    def add_file(
+        self, path: str, size: int, times: dict[str, tuple[float, float]]
+    ):
+        """Adds a searched file and the times of its phases."""
+        self.files += 1
+        self.bytes += size
+        self.add_times(times)
+        wall = sum(wall for wall, _ in times.values())
+        if len(self._slowest) < self.slowest_file_count:
+            heapq.heappush(self._slowest, (wall, path))
+        elif self._slowest and wall > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (wall, path))
+
+    def timed(self, phase: str, func: Callable) -> Callable:
+        """Returns func wrapped so that its calls are added to phase."""
+
+        def timed_func(*args, **kwargs):
+            timer = FileTimer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.lap(phase)
+                self.add_times(timer.times)
+
+        return timed_func
+
+    def timed_iter(self, iterator: Iterator, phase: str = PHASE_WALK):
+        """Yields the items of iterator, adding the time taken to get each
+        of them to phase."""
+        iterator = iter(iterator)
+        while True:
+            timer = FileTimer()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                timer.lap(phase)
+                self.add_times(timer.times)
+            yield item
+
+    def stop(self):
+        """Records the wall-clock time of the whole search."""
+        self.elapsed = time.perf_counter() - self._start
+
+    def slowest_files(self) -> list[tuple[float, str]]:
+        """Returns the (wall time, path) of the slowest files, slowest
+        first."""
+        return sorted(self._slowest, reverse=True)
+
+    def to_json(self) -> dict:
+        """Returns the statistics as they are shown in the JSON output."""
+        elapsed = self.elapsed or float("inf")
+        return {
+            "elapsed": self.elapsed,
+            "files": self.files,
+            "bytes": self.bytes,
+            "files_per_second": self.files / elapsed,
+            "bytes_per_second": self.bytes / elapsed,
+            "skipped_by_suffix": self.skipped_by_suffix,
+            "skipped_by_prefix": self.skipped_by_prefix,
+            "skipped_binary": self.skipped_binary,
+            "phases": {
+                phase: {
+                    "wall": self.wall_times[phase],
+                    "cpu": self.cpu_times[phase],
+                }
+                for phase in PHASES
+            },
+            "slowest_files": [
+                {"path": path, "wall": wall}
+                for wall, path in self.slowest_files()
+            ],
+        }
+
+    def report_lines(self) -> list[str]:
+        """Returns the statistics as lines of text."""
+        stats = self.to_json()
+        files_per_second = stats["files_per_second"]
+        mib_per_second = stats["bytes_per_second"] / 1024 / 1024
+        lines = [
+            f"Searched {self.files} files ({self.bytes / 1024 / 1024:.1f} "
+            f"MiB) in {self.elapsed:.3f} s: "
+            f"{files_per_second:.0f} files/s, {mib_per_second:.1f} MiB/s",
+            f"Skipped: {self.skipped_by_suffix} file(s) by suffix, "
+            f"{self.skipped_by_prefix} folder(s) by prefix, "
+            f"{self.skipped_binary} binary file(s)",
+            " ".join(
+                ["Phase".ljust(8), "Wall (s)".rjust(10), "CPU (s)".rjust(10)]
+            ),
+        ]
+        for phase in PHASES:
+            lines.append(
+                f"{phase:<8} {self.wall_times[phase]:10.4f} "
+                f"{self.cpu_times[phase]:10.4f}"
+            )
+        if self._slowest:
+            lines.append("Slowest files:")
+            for wall, path in self.slowest_files():
+                lines.append(f"{wall:10.4f} s  {path}")
+        return lines
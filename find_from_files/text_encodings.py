@@ -0,0 +1,228 @@
+"""Searches text in the encoding it is stored in, without transcoding it.
+
+The encoding of a file is detected from its head (see
+is_binary.detect_encoding()). Files in UTF-8 and in single-byte encodings
+like Latin-1 are ASCII compatible (see is_ascii_compatible()): a newline is
+the byte b"\\n" and ASCII characters are single bytes, so they are searched
+like UTF-8 files, only with the search strings encoded into their encoding.
+In UTF-16 and UTF-32, every character takes one or more code units of two or
+four bytes. A string encoded into the encoding of such a file is found in it
+only at offsets that are multiples of the code unit size (see
+find_aligned()), and the lines are counted by counting the line break code
+units (see count_newlines()). The files are read in windows of whole lines
+(see read_code_unit_windows()), so that only the windows with matches need
+to be decoded.
+
+Typical usage example:
+
+    for window, offset, newlines_before in read_code_unit_windows(
+        stream, encoding
+    ):
+        position = find_aligned(window, "ERROR".encode(encoding), encoding)
+        if position != -1:
+            print(get_line(window, position, encoding).decode(encoding))
+"""
+
+import array
+import codecs
+import functools
+import sys
+from typing import BinaryIO, Iterator
+
+from find_from_files import buffers
+
+BYTE_ORDER_MARKS = {
+    "utf-16-le": codecs.BOM_UTF16_LE,
+    "utf-16-be": codecs.BOM_UTF16_BE,
+    "utf-32-le": codecs.BOM_UTF32_LE,
+    "utf-32-be": codecs.BOM_UTF32_BE,
+}
+# The array type codes of the code units of 2 and 4 bytes
+CODE_UNIT_TYPES = {2: "H", 4: "I" if array.array("I").itemsize == 4 else "L"}
+
+
+@functools.lru_cache(maxsize=32)
+def is_ascii_compatible(encoding: str) -> bool:
+    """Tells whether encoding encodes ASCII characters, including the
+    newline, as single ASCII bytes and all other characters without ASCII
+    bytes.
+
+    This holds for UTF-8 and the single-byte encodings, but not, e.g., for
+    UTF-16 or Shift JIS, whose multibyte characters can contain ASCII bytes.
+    """
+    name = codecs.lookup(encoding).name
+    if name in ("utf-8", "utf-8-sig"):
+        return True
+    try:
+        decoded = bytes(range(256)).decode(name, errors="replace")
+    except UnicodeError:
+        return False
+    return len(decoded) == 256 and decoded[:128] == "".join(
+        map(chr, range(128))
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def code_unit_size(encoding: str) -> int:
+    """Returns the size of the code units of encoding in bytes: 1 for ASCII
+    compatible encodings, and the size of the encoded newline otherwise."""
+    if is_ascii_compatible(encoding):
+        return 1
+    return len("\n".encode(encoding))
+
+
+def encode(string: str, encoding: str) -> bytes | None:
+    """Returns string encoded into encoding, or None if it cannot be, i.e.,
+    the string cannot be found in a text in the encoding."""
+    try:
+        return string.encode(encoding)
+    except UnicodeEncodeError:
+        return None
+
+
+def find_aligned(
+    data: bytes, encoded: bytes, encoding: str, start: int = 0
+) -> int:
+    """Finds the first occurrence of the encoded string in data at or after
+    start that starts at the start of a code unit, or returns -1."""
+    unit = code_unit_size(encoding)
+    position = data.find(encoded, start)
+    while position != -1 and position % unit:
+        position = data.find(encoded, position + 1)
+    return position
+
+
+def rfind_aligned(
+    data: bytes, encoded: bytes, encoding: str, end: int | None = None
+) -> int:
+    """Finds the last occurrence of the encoded string in data[:end] that
+    starts at the start of a code unit, or returns -1."""
+    unit = code_unit_size(encoding)
+    if end is None:
+        end = len(data)
+    position = data.rfind(encoded, 0, end)
+    while position != -1 and position % unit:
+        position = data.rfind(encoded, 0, position + len(encoded) - 1)
+    return position
+
+
+def count_newlines(data: bytes, encoding: str) -> int:
+    """Counts the line breaks in data, which starts at the start of a code
+    unit, like buffers.count_newlines() does: "\\n", "\\r\\n" and a lone
+    "\\r" each end a line.
+
+    With code units of several bytes, the code units are counted as
+    integers, so a newline byte that is part of another character is never
+    counted.
+    """
+    unit = code_unit_size(encoding)
+    if unit == 1:
+        return buffers.count_newlines(data, len(data))
+    codes = array.array(CODE_UNIT_TYPES[unit])
+    codes.frombytes(data[: len(data) - len(data) % unit])
+    newline = int.from_bytes("\n".encode(encoding), sys.byteorder)
+    carriage_return = int.from_bytes("\r".encode(encoding), sys.byteorder)
+    count = codes.count(newline)
+    carriage_returns = codes.count(carriage_return)
+    if carriage_returns:
+        breaks = _get_line_breaks(data, encoding)
+        count += carriage_returns - breaks.count(b"\x01\x02")
+    return count
+
+
+@functools.lru_cache(maxsize=32)
+def _get_line_break_tables(encoding: str) -> tuple[bytes, ...]:
+    """Returns a translation table for each byte of a code unit, mapping the
+    byte of "\\r" to bit 1 and the byte of "\\n" to bit 2."""
+    tables = []
+    for carriage_return, newline in zip(
+        "\r".encode(encoding), "\n".encode(encoding)
+    ):
+        table = bytearray(256)
+        table[carriage_return] |= 1
+        table[newline] |= 2
+        tables.append(bytes(table))
+    return tuple(tables)
+
+
+def _get_line_breaks(data: bytes, encoding: str) -> bytes:
+    """Returns a byte for each code unit of data: 1 for "\\r", 2 for "\\n"
+    and 0 for the others.
+
+    The bytes at each position of the code units are translated separately,
+    and combined with a bitwise and of them as integers, so that no code
+    unit is compared in Python.
+    """
+    unit = code_unit_size(encoding)
+    length = len(data) - len(data) % unit
+    combined = None
+    for position, table in enumerate(_get_line_break_tables(encoding)):
+        lane = int.from_bytes(
+            data[position:length:unit].translate(table), "little"
+        )
+        combined = lane if combined is None else combined & lane
+    return combined.to_bytes(length // unit, "little")
+
+
+def get_line(data: bytes, position: int, encoding: str) -> bytes:
+    """Returns the line (without the line break) that position is on, as
+    bytes in encoding. The lines end like in count_newlines()."""
+    newline = "\n".encode(encoding)
+    line_start = rfind_aligned(data, newline, encoding, position)
+    line_start = 0 if line_start == -1 else line_start + len(newline)
+    line_end = find_aligned(data, newline, encoding, position)
+    if line_end == -1:
+        line_end = len(data)
+    # The carriage returns are looked for only within the "\n" line
+    line = data[line_start:line_end]
+    position -= line_start
+    carriage_return = "\r".encode(encoding)
+    line_start = rfind_aligned(line, carriage_return, encoding, position)
+    if line_start != -1:
+        line_start += len(carriage_return)
+        line, position = line[line_start:], position - line_start
+    line_end = find_aligned(line, carriage_return, encoding, position)
+    if line_end != -1:
+        line = line[:line_end]
+    return line
+
+
+def read_code_unit_windows(
+    stream: BinaryIO, encoding: str
+) -> Iterator[tuple[bytes, int, int]]:
+    """Reads a binary stream of text in encoding in windows of whole lines.
+
+    This is like buffers.read_line_windows() without overlap, but the lines
+    end at newline code units, so that it also works for UTF-16 and UTF-32.
+    A byte order mark at the start of the stream is left out.
+
+    Yields:
+        Tuples of the window, the offset of its start in the stream and the
+        number of line breaks before it (see count_newlines()).
+    """
+    newline = "\n".encode(encoding)
+    bom = BYTE_ORDER_MARKS.get(codecs.lookup(encoding).name, b"")
+    tail = b""
+    offset = newlines_before = 0
+    first = True
+    while True:
+        chunk = stream.read(buffers.WINDOW_READ_SIZE)
+        if not chunk:
+            if tail:
+                yield tail, offset, newlines_before
+            return
+        data = tail + chunk
+        if first:
+            first = False
+            if bom and data.startswith(bom):
+                data = data[len(bom) :]
+                offset = len(bom)
+        line_end = rfind_aligned(data, newline, encoding)
+        if line_end == -1:
+            tail = data
+            continue
+        end = line_end + len(newline)
+        window, tail = data[:end], data[end:]
+        yield window, offset, newlines_before
+        offset += len(window)
+        newlines_before += count_newlines(window, encoding)
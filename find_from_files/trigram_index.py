@@ -0,0 +1,927 @@
+"""A persistent trigram index for finding the files that can contain a match.
+
+Function build_index() walks through a directory tree and writes an index
+containing, for each three-byte sequence (trigram) found in the text files,
+the list of files it occurs in. Function update_index() brings an existing
+index up to date by re-indexing only the files whose inode, size or
+modification time has changed. Class TrigramIndex reads the index, and class
+IndexFilter uses it for deciding which files must be searched: a file that
+does not contain all the trigrams of the literal parts of the search string
+cannot contain a match. Files that have changed since the index was updated,
+or are not in the index, are always searched. Compressed files are indexed by
+their decompressed contents, and files in other encodings than UTF-8 by
+their text encoded into UTF-8, like the search strings.
+
+The index consists of a JSON manifest and one or more segment files. Each
+update adds a segment containing the re-indexed files, and the entries of the
+changed and deleted files in the older segments are marked as deleted
+(tombstoned) in the manifest. If a file has only been appended to, only the
+appended part is indexed, and the file's trigrams are the union of the
+trigrams in all its entries. When the share of tombstoned entries grows past
+COMPACTION_THRESHOLD, the segments are merged by compact_index() in a
+background process.
+
+A segment file is mapped into memory when it is used. It consists of a header,
+the file table, a sorted table of fixed-size trigram entries for binary
+search, and the posting lists of file ids, which are delta-encoded as unsigned
+LEB128 varints.
+
+Typical usage example:
+
+    build_index(base_directory, index_path)
+    update_index(index_path)
+    with TrigramIndex(index_path) as index:
+        index_filter = IndexFilter(
+            index, query_trigrams(search_string, regexp=False)
+        )
+        if index_filter.check(file_path) == NO_MATCH:
+            print("no need to search the file")
+"""
+
+import codecs
+import concurrent.futures
+import hashlib
+import json
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import zlib
+from typing import BinaryIO, Iterable, Iterator, NamedTuple
+
+from find_from_files.compressed import DECOMPRESSION_ERRORS
+from find_from_files.constants import CACHE_DIRECTORY
+from find_from_files.file_reader import FileReader
+from find_from_files.regex_literals import required_literals
+
+INDEX_FORMAT = "find-from-files trigram index"
+INDEX_VERSION = 3
+SEGMENT_MAGIC = b"FFFTRIG\n"
+# magic, version, file count, trigram count, and the offsets of the file
+# table, the trigram table and the posting lists
+SEGMENT_HEADER = struct.Struct("<8sIQQQQQ")
+# trigram, offset of the posting list, number of files in the posting list
+TRIGRAM_ENTRY = struct.Struct("<3sQI")
+TRIGRAM_CHUNK_SIZE = 1024 * 1024
+# Number of bytes at the end of an indexed file whose checksum is used for
+# checking that a grown file has only been appended to
+TAIL_CHECK_SIZE = 64
+# Share of tombstoned entries that triggers a background compaction
+COMPACTION_THRESHOLD = 0.25
+FLAG_BINARY = 1
+
+# Results of IndexFilter.check()
+UNKNOWN = "unknown"
+CANDIDATE = "candidate"
+NO_MATCH = "no match"
+BINARY = "binary"
+
+
+class IndexedFile(NamedTuple):
+    """An entry of the file table of an index segment.
+
+    Attributes:
+        path: Path of the file relative to the indexed directory.
+        inode: Inode number of the file when it was indexed.
+        size: Size of the file when it was indexed.
+        mtime_ns: Modification time of the file when it was indexed.
+        binary: True if the file was detected to be binary.
+        offset: Offset of the first indexed byte. This is 0 unless only the
+            appended part of the file was indexed.
+        tail_crc: CRC-32 of the last TAIL_CHECK_SIZE bytes of the file.
+    """
+
+    path: str
+    inode: int
+    size: int
+    mtime_ns: int
+    binary: bool
+    offset: int = 0
+    tail_crc: int = 0
+
+    def matches_stat(self, stat_result: os.stat_result) -> bool:
+        """Returns True if the file has not changed since it was indexed."""
+        return (
+            self.inode == stat_result.st_ino
+            and self.size == stat_result.st_size
+            and self.mtime_ns == stat_result.st_mtime_ns
+        )
+
+
+class UpdateResult(NamedTuple):
+    """Numbers of files handled by update_index().
+
+    Attributes:
+        added: Files that were not in the index.
+        changed: Files that were re-indexed as a whole.
+        appended: Files of which only the appended part was indexed.
+        deleted: Files that were removed from the index.
+        unchanged: Files that did not need to be re-indexed.
+        bytes_indexed: Number of bytes read for indexing.
+    """
+
+    added: int = 0
+    changed: int = 0
+    appended: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    bytes_indexed: int = 0
+
+
+def default_index_path(base_directory: str) -> str:
+    """Returns the default index path for base_directory."""
+    digest = hashlib.sha256(
+        os.fsencode(os.path.abspath(base_directory))
+    ).hexdigest()
+    return os.path.join(CACHE_DIRECTORY, "index", f"{digest[:32]}.idx")
+
+
+def encode_varint(value: int, output: bytearray):
+    """Appends value to output as an unsigned LEB128 varint."""
+    while value >= 0x80:
+        output.append((value & 0x7F) | 0x80)
+        value >>= 7
+    output.append(value)
+
+
+def decode_varint(buffer, offset: int) -> tuple[int, int]:
+    """Decodes the varint at offset.
+
+    Returns:
+        A tuple of the decoded value and the offset after the varint.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def get_trigrams(data: bytes, start: int = 0) -> set[bytes]:
+    """Returns the set of trigrams in data[start:]."""
+    trigrams = set()
+    for chunk_start in range(start, max(len(data) - 2, 0), TRIGRAM_CHUNK_SIZE):
+        chunk = data[chunk_start : chunk_start + TRIGRAM_CHUNK_SIZE + 2]
+        trigrams.update(chunk[i : i + 3] for i in range(len(chunk) - 2))
+    return trigrams
+
+
+def get_stream_trigrams(
+    stream: BinaryIO, encoding: str = "utf-8"
+) -> set[bytes]:
+    """Returns the set of trigrams in a binary stream, read in chunks.
+
+    Text in another encoding than UTF-8 is encoded into UTF-8 first.
+    """
+    decoder = None
+    if encoding != "utf-8":
+        decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+    trigrams = set()
+    tail = b""
+    while chunk := stream.read(TRIGRAM_CHUNK_SIZE):
+        if decoder is not None:
+            chunk = decoder.decode(chunk).encode("utf-8")
+        data = tail + chunk
+        trigrams |= get_trigrams(data)
+        tail = data[-2:]
+    return trigrams
+
+
+def get_tail_crc(data: bytes, size: int) -> int:
+    """Returns the CRC-32 of the last TAIL_CHECK_SIZE bytes of data[:size]."""
+    return zlib.crc32(data[max(size - TAIL_CHECK_SIZE, 0) : size])
+
+
+def query_trigrams(search_string: str, regexp: bool) -> set[bytes]:
+    """Returns the trigrams every file containing a match must contain.
+
+    For a regular expression, the trigrams are taken from the literals every
+    match must contain (see required_literals()). Like in
+    regex_literals.Prefilter, the literals with line breaks are left out, as
+    the lines are matched with universal newlines, but the files are indexed
+    as they are. An empty set means that the index cannot be used for ruling
+    out files.
+    """
+    if regexp:
+        literals = [
+            literal
+            for literal in required_literals(search_string)
+            if "\n" not in literal and "\r" not in literal
+        ]
+    else:
+        literals = [search_string]
+    trigrams = set()
+    for literal in literals:
+        trigrams |= get_trigrams(literal.encode("utf-8"))
+    return trigrams
+
+
+def index_file(
+    file_path: str, previous: IndexedFile | None = None
+) -> tuple[IndexedFile, set[bytes]] | None:
+    """Reads the file in file_path for the index.
+
+    If previous is given and the file has only been appended to since it was
+    indexed (same inode, larger size and unchanged bytes at the end of the
+    previously indexed part), only the appended part is indexed.
+
+    Args:
+        file_path: Path of the file.
+        previous: The latest index entry of the file, if any.
+
+    Returns:
+        A tuple of the file table entry (with the path as it was given) and
+        the trigrams of the file, or None if the file could not be read.
+    """
+    try:
+        with FileReader(file_path) as reader:
+            stat_result = os.fstat(reader.file.fileno())
+            encoding = reader.encoding()
+            binary = encoding is None
+            offset = 0
+            trigrams = set()
+            tail_crc = 0
+            if reader.compression is not None or encoding not in (
+                None,
+                "utf-8",
+            ):
+                # Appends cannot be detected in the decompressed contents, and
+                # text in other encodings is transcoded, so such a file is
+                # always indexed as a whole
+                if not binary:
+                    trigrams = get_stream_trigrams(reader.stream(), encoding)
+            else:
+                with reader.buffer() as buffer:
+                    if (
+                        previous is not None
+                        and not previous.binary
+                        and not binary
+                        and previous.inode == stat_result.st_ino
+                        and previous.size < len(buffer)
+                        and get_tail_crc(buffer, previous.size)
+                        == previous.tail_crc
+                    ):
+                        offset = previous.size
+                    if not binary:
+                        # Trigrams spanning the old end are included
+                        trigrams = get_trigrams(buffer, max(offset - 2, 0))
+                    tail_crc = get_tail_crc(buffer, len(buffer))
+    except DECOMPRESSION_ERRORS:
+        return None
+    entry = IndexedFile(
+        file_path,
+        stat_result.st_ino,
+        stat_result.st_size,
+        stat_result.st_mtime_ns,
+        binary,
+        offset,
+        tail_crc,
+    )
+    return entry, trigrams
+
+
+def walk_files(base_directory: str) -> Iterable[str]:
+    """Yields the paths of the files under base_directory in sorted order."""
+    for root, dirs, files in os.walk(base_directory):
+        dirs.sort()
+        files.sort()
+        for file in files:
+            yield os.path.join(root, file)
+
+
+def index_files(
+    file_paths: list[str], previous_entries: list[IndexedFile | None], jobs=1
+) -> Iterator[tuple[IndexedFile, set[bytes]] | None]:
+    """Runs index_file() for the files, in worker processes if jobs > 1."""
+    if jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            yield from pool.map(
+                index_file, file_paths, previous_entries, chunksize=16
+            )
+    else:
+        yield from map(index_file, file_paths, previous_entries)
+
+
+class PostingList:
+    """A posting list being built, delta-encoded as varints.
+
+    Attributes:
+        encoded: The encoded file ids.
+        count: Number of file ids in the list.
+        last_id: The last file id added.
+    """
+
+    def __init__(self):
+        self.encoded = bytearray()
+        self.count = 0
+        self.last_id = 0
+
+    def add(self, file_id: int):
+        """Adds a file id, which must be greater than the previous one."""
+        encode_varint(file_id - self.last_id, self.encoded)
+        self.count += 1
+        self.last_id = file_id
+
+
+class SegmentBuilder:
+    """Collects the files and trigrams of a new index segment.
+
+    Attributes:
+        entries: The file table of the segment.
+        postings: The posting lists of the segment.
+    """
+
+    def __init__(self):
+        self.entries: list[IndexedFile] = []
+        self.postings: dict[bytes, PostingList] = {}
+
+    def add(self, entry: IndexedFile, trigrams: Iterable[bytes]) -> int:
+        """Adds a file and its trigrams, and returns the id of the file."""
+        file_id = len(self.entries)
+        self.entries.append(entry)
+        for trigram in trigrams:
+            self.add_posting(trigram, file_id)
+        return file_id
+
+    def add_posting(self, trigram: bytes, file_id: int):
+        posting_list = self.postings.get(trigram)
+        if posting_list is None:
+            posting_list = self.postings[trigram] = PostingList()
+        posting_list.add(file_id)
+
+    def write(self, segment_path: str):
+        """Writes the segment file."""
+        file_table = bytearray()
+        for entry in self.entries:
+            path = os.fsencode(entry.path)
+            encode_varint(len(path), file_table)
+            file_table += path
+            encode_varint(entry.inode, file_table)
+            encode_varint(entry.size, file_table)
+            encode_varint(entry.mtime_ns, file_table)
+            encode_varint(entry.offset, file_table)
+            encode_varint(entry.tail_crc, file_table)
+            file_table.append(FLAG_BINARY if entry.binary else 0)
+
+        trigram_table = bytearray()
+        posting_offset = 0
+        for trigram in sorted(self.postings):
+            posting_list = self.postings[trigram]
+            trigram_table += TRIGRAM_ENTRY.pack(
+                trigram, posting_offset, posting_list.count
+            )
+            posting_offset += len(posting_list.encoded)
+
+        files_offset = SEGMENT_HEADER.size
+        table_offset = files_offset + len(file_table)
+        postings_offset = table_offset + len(trigram_table)
+        with open(segment_path, "wb") as f:
+            f.write(
+                SEGMENT_HEADER.pack(
+                    SEGMENT_MAGIC,
+                    INDEX_VERSION,
+                    len(self.entries),
+                    len(self.postings),
+                    files_offset,
+                    table_offset,
+                    postings_offset,
+                )
+            )
+            f.write(file_table)
+            f.write(trigram_table)
+            for trigram in sorted(self.postings):
+                f.write(self.postings[trigram].encoded)
+
+
+class IndexSegment:
+    """An index segment file mapped into memory.
+
+    Attributes:
+        files: The file table of the segment.
+    """
+
+    def __init__(self, segment_path: str):
+        with open(segment_path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (
+                magic,
+                version,
+                file_count,
+                self._trigram_count,
+                files_offset,
+                self._table_offset,
+                self._postings_offset,
+            ) = SEGMENT_HEADER.unpack_from(self._buffer)
+        except struct.error as e:
+            self.close()
+            raise ValueError(f"{segment_path} is not an index segment") from e
+        if magic != SEGMENT_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(
+                f"{segment_path} is not a version {INDEX_VERSION} segment"
+            )
+        self.files = self._read_file_table(files_offset, file_count)
+
+    def close(self):
+        self._buffer.close()
+
+    def _read_file_table(self, offset, file_count) -> list[IndexedFile]:
+        buffer = self._buffer
+        files = []
+        for _ in range(file_count):
+            length, offset = decode_varint(buffer, offset)
+            path = os.fsdecode(buffer[offset : offset + length])
+            offset += length
+            inode, offset = decode_varint(buffer, offset)
+            size, offset = decode_varint(buffer, offset)
+            mtime_ns, offset = decode_varint(buffer, offset)
+            start, offset = decode_varint(buffer, offset)
+            tail_crc, offset = decode_varint(buffer, offset)
+            binary = bool(buffer[offset] & FLAG_BINARY)
+            offset += 1
+            files.append(
+                IndexedFile(
+                    path, inode, size, mtime_ns, binary, start, tail_crc
+                )
+            )
+        return files
+
+    def _decode_postings(self, offset, count) -> list[int]:
+        offset += self._postings_offset
+        file_ids = []
+        file_id = 0
+        for _ in range(count):
+            delta, offset = decode_varint(self._buffer, offset)
+            file_id += delta
+            file_ids.append(file_id)
+        return file_ids
+
+    def postings(self, trigram: bytes) -> list[int]:
+        """Returns the ids of the files containing trigram."""
+        low, high = 0, self._trigram_count
+        while low < high:
+            middle = (low + high) // 2
+            entry_offset = self._table_offset + middle * TRIGRAM_ENTRY.size
+            if self._buffer[entry_offset : entry_offset + 3] < trigram:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._trigram_count:
+            return []
+        found, offset, count = TRIGRAM_ENTRY.unpack_from(
+            self._buffer, self._table_offset + low * TRIGRAM_ENTRY.size
+        )
+        if found != trigram:
+            return []
+        return self._decode_postings(offset, count)
+
+    def all_postings(self) -> Iterator[tuple[bytes, list[int]]]:
+        """Yields the trigrams and their posting lists in sorted order."""
+        for i in range(self._trigram_count):
+            trigram, offset, count = TRIGRAM_ENTRY.unpack_from(
+                self._buffer, self._table_offset + i * TRIGRAM_ENTRY.size
+            )
+            yield trigram, self._decode_postings(offset, count)
+
+
+def read_manifest(index_path: str) -> dict:
+    """Reads and validates the manifest of the index in index_path."""
+    with open(index_path, "rb") as f:
+        try:
+            manifest = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{index_path} is not an index file") from e
+    if (
+        not isinstance(manifest, dict)
+        or manifest.get("format") != INDEX_FORMAT
+        or manifest.get("version") != INDEX_VERSION
+    ):
+        raise ValueError(
+            f"{index_path} is not a version {INDEX_VERSION} index file"
+        )
+    return manifest
+
+
+def write_manifest(
+    index_path: str,
+    base_directory: str,
+    generation: int,
+    segments: list[tuple[str, Iterable[int]]],
+):
+    """Writes the manifest of the index.
+
+    The manifest is first written into a temporary file, which then replaces
+    the old manifest, so that a reader never sees a partially written index.
+
+    Args:
+        index_path: Path of the manifest.
+        base_directory: The indexed directory.
+        generation: Number increased on every change of the index.
+        segments: Tuples of a segment file name (relative to the directory of
+            the manifest) and the ids of the tombstoned files in it.
+    """
+    manifest = {
+        "format": INDEX_FORMAT,
+        "version": INDEX_VERSION,
+        "base_directory": os.path.abspath(base_directory),
+        "generation": generation,
+        "segments": [
+            {"file": name, "tombstones": sorted(tombstones)}
+            for name, tombstones in segments
+        ],
+    }
+    temporary_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(temporary_path, index_path)
+
+
+def get_segment_name(index_path: str, generation: int) -> str:
+    return f"{os.path.basename(index_path)}.{generation}.seg"
+
+
+def get_segment_path(index_path: str, name: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(index_path)), name)
+
+
+def remove_segments(index_path: str, names: Iterable[str]):
+    for name in names:
+        try:
+            os.remove(get_segment_path(index_path, name))
+        except OSError:
+            pass
+
+
+class TrigramIndex:
+    """A trigram index consisting of a manifest and segment files.
+
+    Attributes:
+        base_directory: Absolute path of the indexed directory.
+        generation: Generation number of the index.
+        segments: The segments of the index, from the oldest to the newest.
+        segment_names: The file names of the segments.
+        tombstones: Sets of the ids of the tombstoned files of each segment.
+    """
+
+    def __init__(self, index_path: str):
+        manifest = read_manifest(index_path)
+        self.base_directory = manifest["base_directory"]
+        self.generation = manifest["generation"]
+        self.segments: list[IndexSegment] = []
+        self.segment_names: list[str] = []
+        self.tombstones: list[set[int]] = []
+        try:
+            for segment in manifest["segments"]:
+                self.segments.append(
+                    IndexSegment(get_segment_path(index_path, segment["file"]))
+                )
+                self.segment_names.append(segment["file"])
+                self.tombstones.append(set(segment["tombstones"]))
+        except (OSError, ValueError):
+            self.close()
+            raise
+        self._locations = None
+
+    def __enter__(self) -> "TrigramIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+
+    def locations(self) -> dict[str, list[tuple[int, int]]]:
+        """Returns the live entries of each indexed file.
+
+        Returns:
+            A dictionary from relative file paths to lists of (segment number,
+            file id) tuples, from the oldest entry to the newest.
+        """
+        if self._locations is None:
+            self._locations = {}
+            for number, segment in enumerate(self.segments):
+                tombstones = self.tombstones[number]
+                for file_id, entry in enumerate(segment.files):
+                    if file_id not in tombstones:
+                        self._locations.setdefault(entry.path, []).append(
+                            (number, file_id)
+                        )
+        return self._locations
+
+    def get_entry(self, path: str) -> IndexedFile | None:
+        """Returns the newest entry of the file with the relative path."""
+        locations = self.locations().get(path)
+        if not locations:
+            return None
+        number, file_id = locations[-1]
+        return self.segments[number].files[file_id]
+
+    def tombstone_ratio(self) -> float:
+        """Returns the share of tombstoned entries in the segments."""
+        total = sum(len(segment.files) for segment in self.segments)
+        if total == 0:
+            return 0.0
+        return sum(map(len, self.tombstones)) / total
+
+    def postings(self, trigram: bytes) -> set[str]:
+        """Returns the relative paths of the files containing trigram."""
+        paths = set()
+        for number, segment in enumerate(self.segments):
+            tombstones = self.tombstones[number]
+            files = segment.files
+            paths.update(
+                files[file_id].path
+                for file_id in segment.postings(trigram)
+                if file_id not in tombstones
+            )
+        return paths
+
+    def candidates(self, trigrams: set[bytes]) -> set[str] | None:
+        """Returns the relative paths of the files containing all trigrams.
+
+        Returns None if trigrams is empty, i.e., every file is a candidate.
+        """
+        result = None
+        # Intersecting starting from the rarest trigram keeps the sets small
+        for paths in sorted(map(self.postings, trigrams), key=len):
+            if result is None:
+                result = paths
+            else:
+                result.intersection_update(paths)
+            if not result:
+                break
+        return result
+
+
+def build_index(
+    base_directory: str, index_path: str, jobs: int = 1
+) -> tuple[int, int]:
+    """Builds a trigram index of the files under base_directory.
+
+    An existing index in index_path is replaced.
+
+    Args:
+        base_directory: The directory to index.
+        index_path: Path of the index manifest to write.
+        jobs: Number of worker processes used for reading the files.
+
+    Returns:
+        A tuple of the number of files and the number of trigrams indexed.
+    """
+    generation = 1
+    old_segments = []
+    try:
+        manifest = read_manifest(index_path)
+        generation = manifest["generation"] + 1
+        old_segments = [segment["file"] for segment in manifest["segments"]]
+    except (OSError, ValueError):
+        pass
+
+    builder = SegmentBuilder()
+    file_paths = list(walk_files(base_directory))
+    for result in index_files(file_paths, [None] * len(file_paths), jobs):
+        if result is not None:
+            entry, trigrams = result
+            builder.add(
+                entry._replace(
+                    path=os.path.relpath(entry.path, base_directory)
+                ),
+                trigrams,
+            )
+
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    segment_name = get_segment_name(index_path, generation)
+    builder.write(get_segment_path(index_path, segment_name))
+    write_manifest(
+        index_path, base_directory, generation, [(segment_name, ())]
+    )
+    remove_segments(index_path, old_segments)
+    return len(builder.entries), len(builder.postings)
+
+
+def update_index(
+    index_path: str, jobs: int = 1, background_compaction: bool = True
+) -> UpdateResult:
+    """Re-indexes the files that have changed since the index was updated.
+
+    The files whose inode, size or modification time differ from the index
+    are indexed into a new segment, and their old entries, as well as the
+    entries of deleted files, are tombstoned. Of a file that has only been
+    appended to, only the appended part is indexed, and its old entries are
+    kept. If the share of tombstoned entries grows past COMPACTION_THRESHOLD,
+    the index is compacted in a background process.
+
+    Args:
+        index_path: Path of the index manifest.
+        jobs: Number of worker processes used for reading the files.
+        background_compaction: If False, the index is never compacted.
+
+    Returns:
+        An UpdateResult.
+    """
+    counts = UpdateResult()._asdict()
+    with TrigramIndex(index_path) as index:
+        base_directory = index.base_directory
+        locations = index.locations()
+        tombstones = [set(ids) for ids in index.tombstones]
+        seen = set()
+        file_paths = []
+        previous_entries = []
+        for file_path in walk_files(base_directory):
+            path = os.path.relpath(file_path, base_directory)
+            entry = index.get_entry(path)
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                continue
+            seen.add(path)
+            if entry is not None and entry.matches_stat(stat_result):
+                counts["unchanged"] += 1
+                continue
+            file_paths.append(file_path)
+            previous_entries.append(entry)
+
+        builder = SegmentBuilder()
+        for file_path, previous, result in zip(
+            file_paths,
+            previous_entries,
+            index_files(file_paths, previous_entries, jobs),
+        ):
+            path = os.path.relpath(file_path, base_directory)
+            if result is None:
+                seen.discard(path)
+                continue
+            entry, trigrams = result
+            counts["bytes_indexed"] += entry.size - entry.offset
+            if previous is None:
+                counts["added"] += 1
+            elif entry.offset > 0:
+                counts["appended"] += 1
+            else:
+                counts["changed"] += 1
+                for number, file_id in locations[path]:
+                    tombstones[number].add(file_id)
+            builder.add(entry._replace(path=path), trigrams)
+
+        for path, path_locations in locations.items():
+            if path not in seen:
+                counts["deleted"] += 1
+                for number, file_id in path_locations:
+                    tombstones[number].add(file_id)
+
+        segments = list(zip(index.segment_names, tombstones))
+        generation = index.generation + 1
+        if builder.entries:
+            segment_name = get_segment_name(index_path, generation)
+            builder.write(get_segment_path(index_path, segment_name))
+            segments.append((segment_name, ()))
+        total = len(builder.entries)
+        total += sum(len(segment.files) for segment in index.segments)
+        tombstoned = sum(map(len, tombstones))
+
+    if builder.entries or counts["deleted"]:
+        write_manifest(index_path, base_directory, generation, segments)
+        if background_compaction and tombstoned > total * COMPACTION_THRESHOLD:
+            start_background_compaction(index_path)
+    return UpdateResult(**counts)
+
+
+def compact_index(index_path: str) -> bool:
+    """Merges the segments of the index into one, dropping tombstones.
+
+    The files are not read again. The entries of a file are merged into one
+    entry, whose trigrams are the union of the trigrams of the entries. If
+    the index is changed by another process during the compaction, the
+    compacted index is discarded.
+
+    Returns:
+        True if the index was compacted.
+    """
+    with TrigramIndex(index_path) as index:
+        builder = SegmentBuilder()
+        new_ids = {}
+        for _, path_locations in sorted(index.locations().items()):
+            number, file_id = path_locations[-1]
+            entry = index.segments[number].files[file_id]
+            new_id = builder.add(entry._replace(offset=0), ())
+            for location in path_locations:
+                new_ids[location] = new_id
+        merged: dict[bytes, set[int]] = {}
+        for number, segment in enumerate(index.segments):
+            for trigram, file_ids in segment.all_postings():
+                ids = {
+                    new_ids[(number, file_id)]
+                    for file_id in file_ids
+                    if (number, file_id) in new_ids
+                }
+                if ids:
+                    merged.setdefault(trigram, set()).update(ids)
+        for trigram in sorted(merged):
+            for file_id in sorted(merged[trigram]):
+                builder.add_posting(trigram, file_id)
+
+        generation = index.generation + 1
+        segment_name = get_segment_name(index_path, generation)
+        builder.write(get_segment_path(index_path, segment_name))
+        if read_manifest(index_path)["generation"] != index.generation:
+            remove_segments(index_path, [segment_name])
+            return False
+        write_manifest(
+            index_path,
+            index.base_directory,
+            generation,
+            [(segment_name, ())],
+        )
+        old_segments = index.segment_names
+    remove_segments(index_path, old_segments)
+    return True
+
+
+def start_background_compaction(index_path: str):
+    """Starts a detached process running compact_index() on the index."""
+    # Make this package importable also when it is not installed
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    python_path = os.environ.get("PYTHONPATH")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = (
+        f"{package_parent}{os.pathsep}{python_path}"
+        if python_path
+        else package_parent
+    )
+    subprocess.Popen(  # pylint: disable=consider-using-with
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from find_from_files.trigram_index import compact_index\n"
+            "compact_index(sys.argv[1])",
+            index_path,
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        start_new_session=True,
+    )
+
+
+class IndexFilter:
+    """Decides with a TrigramIndex which files must be searched.
+
+    The query is given as the set of trigrams a file must contain, or as a
+    list of such sets when searching for several patterns, in which case a
+    file must contain all the trigrams of at least one of the sets.
+
+    Attributes:
+        index: The TrigramIndex to use.
+        candidate_paths: Relative paths of the indexed files that contain all
+            the trigrams of the query, or None if all files are candidates.
+    """
+
+    def __init__(
+        self, index: TrigramIndex, trigrams: set[bytes] | list[set[bytes]]
+    ):
+        self.index = index
+        if isinstance(trigrams, set):
+            self.candidate_paths = index.candidates(trigrams)
+            return
+        self.candidate_paths = set()
+        for pattern_trigrams in trigrams:
+            paths = index.candidates(pattern_trigrams)
+            if paths is None:
+                self.candidate_paths = None
+                return
+            self.candidate_paths |= paths
+
+    def check(self, file_path: str) -> str:
+        """Checks whether the file in file_path must be searched.
+
+        Returns:
+            NO_MATCH if the file cannot contain a match, BINARY if it is a
+            binary file, CANDIDATE if it must be searched, and UNKNOWN if it
+            is not in the index or has changed since it was indexed.
+        """
+        path = os.path.relpath(
+            os.path.abspath(file_path), self.index.base_directory
+        )
+        entry = self.index.get_entry(path)
+        if entry is None:
+            return UNKNOWN
+        try:
+            if not entry.matches_stat(os.stat(file_path)):
+                return UNKNOWN
+        except OSError:
+            return UNKNOWN
+        if entry.binary:
+            return BINARY
+        if self.candidate_paths is None or path in self.candidate_paths:
+            return CANDIDATE
+        return NO_MATCH
@@ -0,0 +1,21 @@
+"""Fixtures used in the find_it package tests."""
+
+import pytest
+
+from tests.constants import DIRECTORY_STRUCTURE
+from tests.functions import create_directory_structure
+
+
+@pytest.fixture(name="test_files")
+def fixture_test_files(tmp_path, monkeypatch):
+    """Creates the DIRECTORY_STRUCTURE into the current working directory.
+
+    Every file contains the line "Tämä on testi.". The current working
+    directory is changed to a temporary directory for the duration of the
+    test, so that the files can be found relative to the ROOT.
+    """
+    create_directory_structure(
+        str(tmp_path), DIRECTORY_STRUCTURE, "Tämä on testi.\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -1,6 +1,13 @@
 """Functions used in the find_it package tests."""
 
 import os
+import sys
+from unittest.mock import patch
+
+import pytest
+from find_from_files import find_from_files
+from find_from_files.ansi_safe_split import ANSI_ESCAPE
+
 from tests.constants import (
     CHECKING_FILE,
     CHECKING_DIR,
@@ -12,6 +19,30 @@ from tests.constants import (
 )
 
 
+def run_main(capsys: pytest.CaptureFixture, argv: list[str]):
+    """Runs find_from_files with the command line arguments in argv.
+
+    Returns:
+        The output and the error output captured by capsys.
+    """
+    with patch.object(sys, "argv", ["find_from_files", *argv]):
+        find_from_files.main()
+    return capsys.readouterr()
+
+
+def get_output(capsys: pytest.CaptureFixture, argv: list[str]) -> str:
+    """Runs find_from_files with the command line arguments in argv, and
+    returns its output without ANSI codes."""
+    return ANSI_ESCAPE.sub("", run_main(capsys, argv).out)
+
+
+def get_dir_path(root: str) -> str:
+    """Returns the path of a DirectoryStructure root as it is printed."""
+    if not root:
+        return ROOT
+    return os.path.join(ROOT, root)
+
+
 def check_dirs_and_files_are_checked(
     dir_structure: DirectoryStructure, output: str
 ):
@@ -25,7 +56,7 @@ def check_dirs_and_files_are_checked(
         output: The output string that should contain the checked statements.
     """
     for entry in dir_structure:
-        dir_path = os.path.join(ROOT, entry["root"])
+        dir_path = get_dir_path(entry["root"])
         assert f"{CHECKING_DIR}{dir_path}{CLEAR_STYLING}" in output
 
         for file in entry.get("files", []):
@@ -48,7 +79,7 @@ def check_dirs_and_files_are_skipped(
         output: The output string that should contain the checked statements.
     """
     for i, entry in enumerate(dir_structure):
-        dir_path = os.path.join(ROOT, entry["root"])
+        dir_path = get_dir_path(entry["root"])
         if i == 0:
             assert f"{SKIPPING_DIR}{dir_path}{CLEAR_STYLING}" in output
             assert f"{CHECKING_DIR}{dir_path}{CLEAR_STYLING}" not in output
@@ -74,7 +105,7 @@ def check_files_are_checked(
         output: The output string that should contain the checked statements.
     """
     for entry in dir_structure:
-        dir_path = os.path.join(ROOT, entry["root"])
+        dir_path = get_dir_path(entry["root"])
 
         for file in entry.get("files", []):
             file_path = os.path.join(dir_path, file)
@@ -96,7 +127,7 @@ def check_files_are_skipped(
         output: The output string that should contain the checked statements.
     """
     for entry in dir_structure:
-        dir_path = os.path.join(ROOT, entry["root"])
+        dir_path = get_dir_path(entry["root"])
 
         for file in entry.get("files", []):
             file_path = os.path.join(dir_path, file)
@@ -118,7 +149,7 @@ def check_files_are_not_printed(
         output: The output string to examine.
     """
     for entry in dir_structure:
-        dir_path = os.path.join(ROOT, entry["root"])
+        dir_path = get_dir_path(entry["root"])
 
         for file in entry.get("files", []):
             file_path = os.path.join(dir_path, file)
@@ -145,7 +176,7 @@ def check_dirs_are_not_printed(
         output: The output string to examine.
     """
     for entry in dir_structure:
-        parent_path = os.path.join(ROOT, entry["root"])
+        parent_path = get_dir_path(entry["root"])
 
         for dir_name in entry.get("dirs", []):
             dir_path = os.path.join(parent_path, dir_name)
@@ -168,10 +199,30 @@ def check_dirs_are_checked(
         output: The output string to examine.
     """
     for entry in dir_structure:
-        parent_path = os.path.join(ROOT, entry["root"])
+        parent_path = get_dir_path(entry["root"])
 
         for dir_name in entry.get("dirs", []):
             dir_path = os.path.join(parent_path, dir_name)
             if dir in dirs:
                 assert f"{SKIPPING_DIR}{dir_path}{CLEAR_STYLING}" not in output
                 assert f"{CHECKING_DIR}{dir_path}{CLEAR_STYLING}" in output
+
+
+def create_directory_structure(
+    base_path: str, dir_structure: DirectoryStructure, content: str
+):
+    """Creates the directories and files of dir_structure on disk.
+
+    Args:
+        base_path: Path of the directory to create the structure into.
+        dir_structure: A DirectoryStructure to create.
+        content: Content written into each file.
+    """
+    for entry in dir_structure:
+        dir_path = os.path.join(base_path, entry["root"])
+        os.makedirs(dir_path, exist_ok=True)
+        for file in entry.get("files", []):
+            with open(
+                os.path.join(dir_path, file), "w", encoding="utf-8"
+            ) as f:
+                f.write(content)
@@ -0,0 +1,115 @@
+"""Tests for splitting ANSI-colored strings with ansi_safe_split.
+
+The results are compared with a straightforward character by character
+implementation of the same splitting rules.
+"""
+
+import random
+
+import pytest
+from colorama import Fore, Back, Style
+
+from find_from_files.ansi_safe_split import (
+    ANSI_ESCAPE,
+    ColorCodeState,
+    FORE_COLOR_CODES,
+    BACK_COLOR_CODES,
+    ansi_safe_split,
+)
+from find_from_files.constants import ERASE_TO_THE_END_OF_LINE
+
+
+def reference_split(text, width, one_line=False):
+    slices, current_slice, current_length = [], "", 0
+    open_codes = ColorCodeState()
+    index = 0
+    for i, char in enumerate(text):
+        if i < index:
+            continue
+        if text[i : i + 2] == "\x1b[":
+            match = ANSI_ESCAPE.match(text, i)
+            if match:
+                code = match.group()
+                current_slice += code
+                index += len(code)
+                if code in FORE_COLOR_CODES:
+                    open_codes.fore = code
+                if code in BACK_COLOR_CODES:
+                    open_codes.back = code
+                if code == Fore.RESET:
+                    open_codes.fore = ""
+                if code == Back.RESET:
+                    open_codes.back = ""
+                if code == Style.RESET_ALL:
+                    open_codes.fore = ""
+                    open_codes.back = ""
+                continue
+        current_slice += char
+        current_length += 1
+        index += 1
+        if current_length >= width:
+            if open_codes.has_open_codes():
+                current_slice += Style.RESET_ALL + ERASE_TO_THE_END_OF_LINE
+            if one_line:
+                return [current_slice]
+            slices.append(current_slice)
+            current_slice, current_length = "", 0
+            if open_codes.has_open_codes():
+                current_slice += open_codes.back + open_codes.fore
+    if current_slice:
+        slices.append(current_slice)
+    return slices
+
+
+COLORED_TEXT = (
+    f"{Fore.RED}This is a {Fore.GREEN}colored{Back.YELLOW} "
+    f"text with ANSI codes{Style.RESET_ALL}{ERASE_TO_THE_END_OF_LINE}"
+)
+TOKENS = [
+    "a",
+    "bc",
+    "Tämä",
+    " ",
+    "\x1b",
+    "\x1bM",
+    "\x1b[",
+    "\x1b[1;2",
+    Fore.RED,
+    Fore.GREEN,
+    Fore.RESET,
+    Back.RED,
+    Back.RESET,
+    Style.RESET_ALL,
+    Style.BRIGHT,
+    ERASE_TO_THE_END_OF_LINE,
+]
+
+
+def test_splits_colored_text():
+    assert ansi_safe_split(COLORED_TEXT, 10) == [
+        f"{Fore.RED}This is a {Style.RESET_ALL}{ERASE_TO_THE_END_OF_LINE}",
+        f"{Fore.RED}{Fore.GREEN}colored{Back.YELLOW} te"
+        f"{Style.RESET_ALL}{ERASE_TO_THE_END_OF_LINE}",
+        f"{Back.YELLOW}{Fore.GREEN}xt with AN"
+        f"{Style.RESET_ALL}{ERASE_TO_THE_END_OF_LINE}",
+        f"{Back.YELLOW}{Fore.GREEN}SI codes{Style.RESET_ALL}"
+        f"{ERASE_TO_THE_END_OF_LINE}",
+    ]
+
+
+@pytest.mark.parametrize("width", [-1, 0, 1, 3, 10, 80])
+@pytest.mark.parametrize("one_line", [False, True])
+def test_is_same_as_character_by_character_split(width, one_line):
+    rng = random.Random(width)
+    for _ in range(200):
+        text = "".join(rng.choices(TOKENS, k=rng.randint(0, 40)))
+        assert ansi_safe_split(text, width, one_line) == reference_split(
+            text, width, one_line
+        ), repr(text)
+
+
+def test_long_line_is_same_as_character_by_character_split():
+    line = "x" * 5000
+    text = f"{Fore.GREEN}{line}{Back.RED}match{Style.RESET_ALL}" * 2
+
+    assert ansi_safe_split(text, 77) == reference_split(text, 77)
@@ -0,0 +1,72 @@
+"""Tests for the benchmark tree generator and baseline comparison."""
+
+import os
+
+from benchmarks.suite import compare, get_file_paths
+from benchmarks.tree_generator import MATCH_WORD, TreeSpec, generate_tree
+from find_from_files.is_binary import is_binary
+
+SPEC = TreeSpec(
+    depth=2,
+    fan_out=2,
+    files_per_directory=5,
+    file_size=2000,
+    binary_ratio=0.2,
+    match_density=0.1,
+    line_length=60,
+    seed=1,
+)
+
+
+def read_tree(base_directory):
+    contents = {}
+    for file_path in get_file_paths(base_directory):
+        with open(file_path, "rb") as f:
+            contents[os.path.relpath(file_path, base_directory)] = f.read()
+    return contents
+
+
+def test_tree_is_deterministic(tmp_path):
+    first = generate_tree(str(tmp_path / "first"), SPEC)
+    second = generate_tree(str(tmp_path / "second"), SPEC)
+
+    assert first == second
+    assert read_tree(str(tmp_path / "first")) == read_tree(
+        str(tmp_path / "second")
+    )
+
+    generate_tree(str(tmp_path / "other"), SPEC._replace(seed=2))
+    assert read_tree(str(tmp_path / "first")) != read_tree(
+        str(tmp_path / "other")
+    )
+
+
+def test_tree_has_the_shape_of_the_spec(tmp_path):
+    stats = generate_tree(str(tmp_path), SPEC)
+    contents = read_tree(str(tmp_path))
+    text = [data for data in contents.values() if not is_binary(data)]
+
+    assert stats.directory_count == 1 + 2 + 4
+    assert stats.file_count == len(contents) == 7 * 5
+    assert stats.binary_file_count == len(contents) - len(text)
+    assert stats.byte_count == sum(map(len, contents.values()))
+    assert stats.match_line_count == sum(
+        data.count(MATCH_WORD.encode()) for data in text
+    )
+    assert all(len(data) >= SPEC.file_size for data in text)
+
+
+def test_compare_with_baseline():
+    baseline = {"results": {"a": {"best": 1.0}, "b": {"best": 1.0}}}
+    results = {
+        "results": {
+            "a": {"best": 1.05},
+            "b": {"best": 1.2},
+            "c": {"best": 5.0},
+        }
+    }
+
+    assert compare(results, baseline, threshold=0.1) == [
+        ("a", 1.0, 1.05, False),
+        ("b", 1.0, 1.2, True),
+    ]
@@ -0,0 +1,161 @@
+"""Tests for searching large files in chunks in parallel (--split-size)."""
+
+import concurrent.futures
+import gzip
+import io
+from unittest.mock import patch
+
+import pytest
+from find_from_files import buffers, chunked_search
+from find_from_files.buffers import count_newlines
+from find_from_files.chunked_search import (
+    ChunkSplitter,
+    find_matching_lines_in_chunks,
+    split_into_chunks,
+)
+from find_from_files.file_reader import FileReader
+from find_from_files.regex_search import find_matching_lines_in_bytes
+
+from tests.functions import get_output
+
+PATTERNS = [
+    r"ERROR (E\d+)",
+    r"^\w+ ok$",
+    ("timeout=(\\d+)", "ERROR"),
+    "Jyväskylä",
+]
+
+
+def without_newlines(matching_lines):
+    # Once most lines match, the lines are given with their newlines, which
+    # happens at different lines when each chunk is searched separately
+    return [
+        (line_number, line.rstrip("\n"), matches)
+        for line_number, line, matches in matching_lines
+    ]
+
+
+def create_log(line_count):
+    lines = []
+    for i in range(line_count):
+        if i % 97 == 0:
+            lines.append(f"2025-01-01 ERROR E{i} timeout={i * 7}ms\n")
+        elif i % 31 == 0:
+            lines.append(f"line{i} ok\r\n")
+        elif i % 53 == 0:
+            lines.append(f"old mac line {i}\r")
+        else:
+            lines.append(f"2025-01-01 INFO city=Jyväskylä request={i}\n")
+    return "".join(lines).encode("utf-8") + b"last ERROR E0"
+
+
+@pytest.fixture(name="executor", scope="module")
+def fixture_executor():
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_chunks_are_whole_lines():
+    data = b"a\nbb\n\nccc\ndddd"
+
+    chunks = split_into_chunks(data, 3)
+
+    assert chunks == [(0, 5), (5, 10), (10, 14)]
+    assert b"".join(data[start:end] for start, end in chunks) == data
+
+
+@pytest.mark.parametrize("part_size", [1, 2, 3, 1024])
+def test_lines_are_counted_like_universal_newlines(monkeypatch, part_size):
+    monkeypatch.setattr(buffers, "NEWLINE_COUNT_CHUNK_SIZE", part_size)
+    data = b"a\r\nb\rc\n\r\r\nd\r"
+
+    assert count_newlines(data, len(data)) == len(
+        io.TextIOWrapper(io.BytesIO(data), newline=None).readlines()
+    )
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+@pytest.mark.parametrize("chunk_size", [100, 4096])
+def test_same_lines_as_single_process(
+    monkeypatch, tmp_path, executor, pattern, chunk_size
+):
+    monkeypatch.setattr(chunked_search, "MAX_CHUNK_SIZE", chunk_size)
+    data = create_log(2000)
+    (tmp_path / "app.log").write_bytes(data)
+    expected = list(find_matching_lines_in_bytes(pattern, io.BytesIO(data)))
+
+    with FileReader(str(tmp_path / "app.log")) as reader:
+        splitter = ChunkSplitter(executor, 2, split_size=0)
+        assert splitter.can_split(reader, reader.encoding())
+        found = list(
+            find_matching_lines_in_chunks(
+                pattern, reader, reader.encoding(), splitter
+            )
+        )
+
+    assert without_newlines(found) == without_newlines(expected)
+    assert found
+
+
+def test_stopping_early_cancels_the_chunks(monkeypatch, tmp_path, executor):
+    monkeypatch.setattr(chunked_search, "MAX_CHUNK_SIZE", 100)
+    (tmp_path / "app.log").write_bytes(create_log(2000))
+
+    with FileReader(str(tmp_path / "app.log")) as reader:
+        lines = find_matching_lines_in_chunks(
+            "ERROR", reader, "utf-8", ChunkSplitter(executor, 2, split_size=0)
+        )
+        first = next(lines)
+        lines.close()
+
+    assert first[0] == 1
+
+
+def test_small_and_compressed_files_are_not_split(tmp_path, executor):
+    (tmp_path / "small.log").write_bytes(b"ERROR\n")
+    splitter = ChunkSplitter(executor, 2, split_size=1024)
+
+    assert not splitter.should_split(str(tmp_path / "small.log"))
+    with FileReader(str(tmp_path / "small.log")) as reader:
+        assert not splitter.can_split(reader, "utf-8")
+    data = create_log(1000)
+    (tmp_path / "app.log.gz").write_bytes(gzip.compress(data))
+    (tmp_path / "utf16.log").write_bytes(data.decode().encode("utf-16"))
+    with FileReader(str(tmp_path / "app.log.gz")) as reader:
+        assert not splitter.can_split(reader, reader.encoding())
+    with FileReader(str(tmp_path / "utf16.log")) as reader:
+        assert reader.encoding() == "utf-16-le"
+        assert not splitter.can_split(reader, reader.encoding())
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["-r"],
+        ["-r", "-l"],
+        ["-r", "--output", "jsonl"],
+        ["-r", "-m", "5"],
+        ["-r", "--max-total", "30"],
+    ],
+)
+def test_output_is_same_as_without_splitting(capsys, tmp_path, options):
+    data = create_log(40_000)
+    assert len(data) > 1024 * 1024
+    (tmp_path / "big.log").write_bytes(data)
+    (tmp_path / "small.log").write_bytes(b"ERROR E1 timeout=1ms\n")
+    argv = [str(tmp_path), r"ERROR (E\d+) timeout", *options, "-j", "2"]
+    chunk_counts = []
+
+    def counting_split_into_chunks(buffer, chunk_size):
+        chunks = split_into_chunks(buffer, chunk_size)
+        chunk_counts.append(len(chunks))
+        return chunks
+
+    expected = get_output(capsys, [*argv, "--split-size", "0"])
+    with patch.object(
+        chunked_search, "split_into_chunks", counting_split_into_chunks
+    ):
+        output = get_output(capsys, [*argv, "--split-size", "1"])
+
+    assert output == expected
+    assert chunk_counts and chunk_counts[0] > 1
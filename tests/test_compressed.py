@@ -0,0 +1,129 @@
+"""Tests for searching gzip, bzip2 and xz compressed files."""
+
+import bz2
+import gzip
+import io
+import lzma
+
+import pytest
+from find_from_files import buffers, trigram_index
+from find_from_files.buffers import read_line_windows
+from find_from_files.compressed import detect_compression
+from find_from_files.file_reader import HEAD_SIZE, FileReader
+
+from tests.functions import get_output
+
+COMPRESSORS = {
+    "gzip": gzip.compress,
+    "bzip2": bz2.compress,
+    "xz": lzma.compress,
+}
+LOG = "".join(
+    f"2025-01-01 ERROR E{i} disk full\n" if i % 37 == 0 else f"line {i}\n"
+    for i in range(1, 2000)
+) + "2025-01-02 WARN last line without a newline"
+
+
+@pytest.fixture(name="directories", params=list(COMPRESSORS))
+def fixture_directories(request, tmp_path):
+    """Creates a directory with a plain log file and another one with the
+    same file compressed, under the same name."""
+    data = LOG.encode("utf-8")
+    assert len(data) > HEAD_SIZE
+    plain = tmp_path / "plain"
+    compressed = tmp_path / "compressed"
+    plain.mkdir()
+    compressed.mkdir()
+    (plain / "app.log.1").write_bytes(data)
+    (compressed / "app.log.1").write_bytes(COMPRESSORS[request.param](data))
+    return str(plain), str(compressed)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["disk full"],
+        ["E74 disk", "-e", "WARN", "-e", "line 1999"],
+        ["E[0-9]+ disk", "--regexp"],
+        ["^line 1[0-9]{2}$", "--regexp", "--whole-line"],
+        ["WARN.*", "-e", "E3[0-9]+", "--regexp"],
+    ],
+)
+def test_output_is_same_as_for_plain_file(
+    capsys, monkeypatch, directories, options
+):
+    monkeypatch.setattr(buffers, "WINDOW_READ_SIZE", 100)
+    plain, compressed = directories
+    expected = get_output(capsys, [plain, *options])
+    output = get_output(capsys, [compressed, *options])
+
+    assert "Found" in expected or "Matches" in expected or "line(s)" in expected
+    assert output.replace(compressed, plain) == expected
+
+
+def test_parallel_search_decompresses_in_workers(capsys, directories):
+    plain, compressed = directories
+    expected = get_output(capsys, [plain, "E[0-9]+ disk", "-r"])
+    output = get_output(capsys, [compressed, "E[0-9]+ disk", "-r", "-j", "2"])
+
+    assert output.replace(compressed, plain) == expected
+    assert "probably binary" not in output
+
+
+def test_small_compressed_file(tmp_path):
+    (tmp_path / "small.gz").write_bytes(gzip.compress(b"a\nneedle\n"))
+    with FileReader(str(tmp_path / "small.gz")) as reader:
+        assert reader.head() == b"a\nneedle\n"
+        assert reader.compression == "gzip"
+        assert reader.text().read() == "a\nneedle\n"
+
+
+def test_detect_compression():
+    assert detect_compression(gzip.compress(b"x")) == "gzip"
+    assert detect_compression(bz2.compress(b"x")) == "bzip2"
+    assert detect_compression(lzma.compress(b"x")) == "xz"
+    assert detect_compression(b"plain text") is None
+    assert detect_compression(b"") is None
+
+
+def test_corrupted_file_is_reported(capsys, tmp_path):
+    data = gzip.compress(LOG.encode("utf-8"))
+    broken_path = tmp_path / "broken.gz"
+    broken_path.write_bytes(data[: len(data) // 2])
+    output = get_output(capsys, [str(tmp_path), "no such string"])
+
+    assert f"ERROR reading {broken_path}" in output
+
+
+@pytest.mark.parametrize("overlap", [0, 1, 5, 30])
+def test_line_windows_contain_every_string(monkeypatch, overlap):
+    monkeypatch.setattr(buffers, "WINDOW_READ_SIZE", 16)
+    data = b"".join(b"line %d\n" % i for i in range(50)) + b"end"
+    windows = list(read_line_windows(io.BytesIO(data), overlap))
+
+    for window, offset, newlines_before in windows:
+        assert data[offset : offset + len(window)] == window
+        assert data.count(b"\n", 0, offset) == newlines_before
+        assert offset == 0 or data[offset - 1 : offset] == b"\n"
+    assert windows[-1][0].endswith(b"end")
+    for start in range(len(data) - overlap):
+        needle_end = start + overlap + 1
+        assert any(
+            offset <= start and needle_end <= offset + len(window)
+            for window, offset, _ in windows
+        )
+
+
+def test_index_contains_compressed_files(tmp_path):
+    (tmp_path / "app.log.1.xz").write_bytes(lzma.compress(b"rotated xyz\n"))
+    index_path = str(tmp_path / "index")
+    trigram_index.build_index(str(tmp_path), index_path)
+
+    with trigram_index.TrigramIndex(index_path) as index:
+        index_filter = trigram_index.IndexFilter(
+            index, trigram_index.query_trigrams("rotated", regexp=False)
+        )
+        assert (
+            index_filter.check(str(tmp_path / "app.log.1.xz"))
+            == trigram_index.CANDIDATE
+        )
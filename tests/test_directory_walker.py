@@ -0,0 +1,105 @@
+"""Tests for walking through directories with walk_directories."""
+
+import os
+import sys
+from unittest.mock import patch
+
+from find_from_files import find_from_files
+from find_from_files.directory_walker import walk_directories
+from find_from_files.file_reader import io_counters
+
+from tests.constants import SKIPPING_DIR, SKIPPING_FILE, CLEAR_STYLING
+
+
+def create_files(base_path, paths):
+    for path in paths:
+        file_path = os.path.join(base_path, path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("Tämä on testi.\n")
+
+
+def walk(base_directory, skip_prefixes=()):
+    return [
+        (
+            os.path.relpath(root, base_directory),
+            [entry.name for entry in files],
+            skipped,
+        )
+        for root, files, skipped in walk_directories(
+            base_directory, skip_prefixes
+        )
+    ]
+
+
+def test_walks_in_sorted_top_down_order(tmp_path):
+    create_files(tmp_path, ["b/y.log", "b/x.log", "a/c/z.log", "a/w.log", "v"])
+
+    assert walk(str(tmp_path)) == [
+        (".", ["v"], False),
+        ("a", ["w.log"], False),
+        (os.path.join("a", "c"), ["z.log"], False),
+        ("b", ["x.log", "y.log"], False),
+    ]
+
+
+def test_skipped_directories_are_not_listed(tmp_path):
+    create_files(
+        tmp_path,
+        ["node_modules/pkg/index.js", "src/common/a.log", "src/b.log"],
+    )
+
+    with patch.object(os, "scandir", wraps=os.scandir) as scandir:
+        result = walk(str(tmp_path), ("node_",))
+
+    assert result == [
+        (".", [], False),
+        ("node_modules", [], True),
+        ("src", ["b.log"], False),
+        (os.path.join("src", "common"), ["a.log"], False),
+    ]
+    listed = [
+        os.path.relpath(call.args[0], tmp_path)
+        for call in scandir.call_args_list
+    ]
+    assert "node_modules" not in listed
+
+
+def test_directory_with_the_name_of_a_skipped_subdirectory_is_checked(
+    tmp_path,
+):
+    create_files(tmp_path, ["skipThis/common/a.log", "other/common/b.log"])
+
+    assert walk(str(tmp_path), ("skip",)) == [
+        (".", [], False),
+        ("other", [], False),
+        (os.path.join("other", "common"), ["b.log"], False),
+        ("skipThis", [], True),
+    ]
+
+
+def test_only_searched_files_are_opened(capsys, tmp_path):
+    create_files(
+        tmp_path,
+        [
+            *[f"node_modules/pkg{i}/index.js" for i in range(20)],
+            *[f"src/file{i}.py" for i in range(10)],
+            "src/app.log",
+            "logs/server.log",
+        ],
+    )
+    io_counters.reset()
+
+    with patch.object(
+        sys,
+        "argv",
+        ["find_from_files", str(tmp_path), "test", "-s", ".log", "-S", "node_"],
+    ):
+        find_from_files.main()
+
+    captured = capsys.readouterr()
+    assert io_counters.opens == 2
+    node_modules = os.path.join(str(tmp_path), "node_modules")
+    assert f"{SKIPPING_DIR}{node_modules}{CLEAR_STYLING}" in captured.out
+    python_file = os.path.join(str(tmp_path), "src", "file0.py")
+    assert f"{SKIPPING_FILE}{python_file}{CLEAR_STYLING}" in captured.out
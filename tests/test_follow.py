@@ -0,0 +1,128 @@
+"""Tests for following appended lines with the --follow option."""
+
+import gzip
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+from find_from_files import find_from_files
+from find_from_files.ansi_safe_split import ANSI_ESCAPE
+from find_from_files.follow import AppendedLinesReader, LogFollower
+
+
+def append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def poll(follower):
+    """Returns the new contents given by the follower as (path, lines before,
+    contents) tuples."""
+    results = []
+    for reader in follower.poll():
+        assert isinstance(reader, AppendedLinesReader)
+        results.append((reader.file_path, reader.lines_before, reader.data))
+    return results
+
+
+@pytest.fixture(name="log_path")
+def fixture_log_path(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("first\nsecond\n", encoding="utf-8")
+    return str(path)
+
+
+def test_gives_only_appended_lines(log_path):
+    follower = LogFollower(os.path.dirname(log_path))
+    follower.snapshot()
+    assert not poll(follower)
+
+    append(log_path, "third\nfou")
+    assert poll(follower) == [(log_path, 2, b"third\n")]
+    assert not poll(follower)
+
+    append(log_path, "rth\n")
+    assert poll(follower) == [(log_path, 3, b"fourth\n")]
+
+
+def test_truncated_file_is_read_from_start(log_path):
+    follower = LogFollower(os.path.dirname(log_path))
+    follower.snapshot()
+    with open(log_path, "w", encoding="utf-8") as f:
+        f.write("new\n")
+
+    assert poll(follower) == [(log_path, 0, b"new\n")]
+
+
+def test_rotated_file_keeps_its_position(log_path):
+    follower = LogFollower(os.path.dirname(log_path))
+    follower.snapshot()
+    append(log_path, "third\n")
+    os.rename(log_path, log_path + ".1")
+    with open(log_path, "w", encoding="utf-8") as f:
+        f.write("new\n")
+
+    assert sorted(poll(follower)) == [
+        (log_path, 0, b"new\n"),
+        (log_path + ".1", 2, b"third\n"),
+    ]
+    assert not poll(follower)
+
+
+@pytest.mark.usefixtures("log_path")
+def test_new_files_are_read_from_start(tmp_path):
+    follower = LogFollower(str(tmp_path), file_suffixes=(".log",))
+    follower.snapshot()
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "new.log").write_text("a\nb\n", encoding="utf-8")
+    (tmp_path / "sub" / "new.txt").write_text("a\nb\n", encoding="utf-8")
+
+    assert poll(follower) == [(str(tmp_path / "sub" / "new.log"), 0, b"a\nb\n")]
+
+
+def test_compressed_file_is_searched_as_whole(tmp_path):
+    follower = LogFollower(str(tmp_path))
+    follower.snapshot()
+    (tmp_path / "app.log.1.gz").write_bytes(gzip.compress(b"a\nb\n"))
+
+    readers = list(follower.poll())
+    assert len(readers) == 1
+    with readers[0] as reader:
+        assert reader.head() == b"a\nb\n"
+    assert not list(follower.poll())
+
+
+def test_follow_prints_matches_of_appended_lines(capsys, log_path):
+    polls = []
+
+    def sleep(seconds):
+        if seconds == 0:
+            return
+        polls.append(time.monotonic())
+        if len(polls) == 1:
+            append(log_path, "no match\nERROR 42 found\n")
+        elif len(polls) == 3:
+            raise KeyboardInterrupt
+
+    argv = [
+        "find_from_files",
+        os.path.dirname(log_path),
+        "ERROR [0-9]+",
+        "--regexp",
+        "--follow",
+    ]
+    with patch.object(sys, "argv", argv), patch.object(
+        find_from_files.time, "sleep", sleep
+    ):
+        find_from_files.main()
+    output = ANSI_ESCAPE.sub("", capsys.readouterr().out)
+
+    initial, followed = output.rsplit("Checking file: ", 1)
+    assert "ERROR" not in initial
+    assert followed.startswith(log_path)
+    assert '"ERROR 42": {"number_of_occurrences": 1, "line_numbers": [4]}' in (
+        followed
+    )
+    assert len(polls) == 3
@@ -0,0 +1,90 @@
+"""Tests for detecting binary files with is_binary and the encodings of text
+files with detect_encoding."""
+
+import gzip
+import io
+import zipfile
+
+import pytest
+from find_from_files.is_binary import detect_encoding, is_binary
+
+TEXT = "Tämä on testi.\nRivi 2: ok\ttab\n" * 50
+
+
+def zip_bytes():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr("file.txt", TEXT)
+    return buffer.getvalue()
+
+
+def test_empty_sample_is_not_classified():
+    assert is_binary(b"") is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        TEXT.encode("utf-8"),
+        TEXT.encode("latin-1"),
+        TEXT.encode("utf-16"),
+        TEXT.encode("utf-32"),
+        b"\x1b[31mcolored\x1b[0m\r\n",
+    ],
+    ids=["utf-8", "latin-1", "utf-16", "utf-32", "ansi"],
+)
+def test_text_is_not_binary(data):
+    assert is_binary(data[:2048]) is False
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"\x7fELF\x02\x01\x01" + bytes(2041),
+        gzip.compress(TEXT.encode("utf-8")),
+        b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4,
+        zip_bytes(),
+        bytes(range(256)) * 8,
+    ],
+    ids=["elf", "gzip", "png", "zip", "all-bytes"],
+)
+def test_binary_is_binary(data):
+    assert is_binary(data[:2048]) is True
+
+
+@pytest.mark.parametrize(
+    "data, encoding",
+    [
+        (TEXT.encode("utf-8"), "utf-8"),
+        (b"plain ASCII\n", "utf-8"),
+        (TEXT.encode("latin-1"), "latin-1"),
+        (TEXT.encode("utf-16"), "utf-16-le"),
+        (TEXT.encode("utf-16-le"), "utf-16-le"),
+        (TEXT.encode("utf-16-be"), "utf-16-be"),
+        (TEXT.encode("utf-32"), "utf-32-le"),
+        (TEXT.encode("utf-32-be"), "utf-32-be"),
+        (b"", "utf-8"),
+        (b"\x7fELF\x02\x01\x01" + bytes(2041), None),
+    ],
+    ids=[
+        "utf-8",
+        "ascii",
+        "latin-1",
+        "utf-16-bom",
+        "utf-16-le",
+        "utf-16-be",
+        "utf-32-bom",
+        "utf-32-be",
+        "empty",
+        "elf",
+    ],
+)
+def test_detect_encoding(data, encoding):
+    assert detect_encoding(data[:2048]) == encoding
+
+
+def test_utf_8_cut_in_the_middle_of_a_character():
+    data = TEXT.encode("utf-8")
+    cut = data.index("ä".encode("utf-8")) + 1
+
+    assert detect_encoding(data[:cut]) == "utf-8"
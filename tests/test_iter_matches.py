@@ -0,0 +1,300 @@
+"""Tests for the library interface iter_matches()."""
+
+import codecs
+import gzip
+import io
+import re
+
+import pytest
+from find_from_files import MODE_LITERAL, MODE_REGEX, MatchRecord, iter_matches
+from find_from_files import matches as matches_module
+from find_from_files.file_reader import io_counters
+from find_from_files.matches import iter_file_matches
+from find_from_files.regex_search import find_matching_lines
+
+CONTENTS = (
+    "first line\n"
+    "ERROR E1 and ERROR E22\n"
+    "Tämä ERROR E333 on testi\n"
+    "no match\r\n"
+    "last ERROR E4"
+).encode("utf-8")
+MODES_AND_PATTERNS = [("ERROR", MODE_LITERAL), ("ER+OR", MODE_REGEX)]
+
+
+def as_tuples(matches):
+    return [
+        (match.line_number, match.byte_offset, match.text, match.pattern_id)
+        for match in matches
+    ]
+
+
+def check_offsets(data, matches):
+    for match in matches:
+        encoded = match.text.encode("utf-8")
+        assert data[match.byte_offset : match.byte_offset + len(encoded)] == (
+            encoded
+        )
+
+
+@pytest.fixture(name="log_directory")
+def fixture_log_directory(tmp_path):
+    (tmp_path / "b.log").write_bytes(CONTENTS)
+    (tmp_path / "a.log").write_bytes(b"ERROR E5\n")
+    (tmp_path / "notes.txt").write_bytes(b"ERROR E6\n")
+    (tmp_path / "data.log").write_bytes(b"\x7fELF\x00ERROR E7")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "c.log").write_bytes(b"ERROR E8\n")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "d.log").write_bytes(b"x\nERROR E9\n")
+    return tmp_path
+
+
+@pytest.mark.parametrize("mode", [MODE_LITERAL, MODE_REGEX])
+def test_files_are_filtered_and_ordered(log_directory, mode):
+    matches = list(
+        iter_matches(
+            str(log_directory),
+            "ERROR",
+            mode=mode,
+            suffixes=(".log",),
+            skip_prefixes=("node_",),
+        )
+    )
+
+    assert [(match.path, match.line_number) for match in matches] == [
+        (str(log_directory / "a.log"), 1),
+        (str(log_directory / "b.log"), 2),
+        (str(log_directory / "b.log"), 2),
+        (str(log_directory / "b.log"), 3),
+        (str(log_directory / "b.log"), 5),
+        (str(log_directory / "sub" / "d.log"), 2),
+    ]
+    assert all(isinstance(match, MatchRecord) for match in matches)
+
+
+def test_literal_matches(tmp_path):
+    (tmp_path / "b.log").write_bytes(CONTENTS)
+
+    matches = list(iter_file_matches(str(tmp_path / "b.log"), "E333"))
+
+    assert as_tuples(matches) == [(3, CONTENTS.index(b"E333"), "E333", 0)]
+
+
+def test_regex_matches(tmp_path):
+    (tmp_path / "b.log").write_bytes(CONTENTS)
+
+    matches = list(
+        iter_file_matches(str(tmp_path / "b.log"), r"E[0-9]+", MODE_REGEX)
+    )
+
+    assert [match.text for match in matches] == [
+        "E1",
+        "E22",
+        "E333",
+        "E4",
+    ]
+    assert [match.line_number for match in matches] == [2, 2, 3, 5]
+    check_offsets(CONTENTS, matches)
+
+
+@pytest.mark.parametrize("mode", [MODE_LITERAL, MODE_REGEX])
+def test_several_patterns(tmp_path, mode):
+    (tmp_path / "b.log").write_bytes(CONTENTS)
+
+    matches = list(
+        iter_file_matches(str(tmp_path / "b.log"), ("E22", "Tämä"), mode)
+    )
+
+    assert as_tuples(matches) == [
+        (2, CONTENTS.index(b"E22"), "E22", 0),
+        (3, CONTENTS.index("Tämä".encode()), "Tämä", 1),
+    ]
+
+
+def test_patterns_that_cannot_be_combined(tmp_path):
+    (tmp_path / "a.log").write_bytes(b"aa bb\nab\n")
+
+    matches = list(
+        iter_file_matches(str(tmp_path / "a.log"), (r"(b)\1", "a"), MODE_REGEX)
+    )
+
+    assert as_tuples(matches) == [
+        (1, 0, "a", 1),
+        (1, 1, "a", 1),
+        (1, 3, "bb", 0),
+        (2, 6, "a", 1),
+    ]
+
+
+def test_pattern_matching_across_lines_is_searched_per_line(tmp_path):
+    (tmp_path / "a.log").write_bytes(b"a\nb\n\nab\n")
+
+    matches = list(
+        iter_file_matches(str(tmp_path / "a.log"), r"a\s*b", MODE_REGEX)
+    )
+
+    assert as_tuples(matches) == [(4, 5, "ab", 0)]
+
+
+def test_regex_line_numbers_match_the_cli_search(tmp_path):
+    lines = [f"line {i} E{i}" if i % 7 == 0 else "line" for i in range(500)]
+    data = "\n".join(lines).encode("utf-8")
+    (tmp_path / "a.log").write_bytes(data)
+
+    matches = list(
+        iter_file_matches(str(tmp_path / "a.log"), r"E[0-9]+", MODE_REGEX)
+    )
+    expected = find_matching_lines(
+        r"E[0-9]+", io.StringIO(data.decode("utf-8"))
+    )
+
+    assert [(match.line_number, match.text) for match in matches] == [
+        (line_number, found)
+        for line_number, _, found_list in expected
+        for found in found_list
+    ]
+    check_offsets(data, matches)
+
+
+def test_offsets_with_undecodable_bytes(tmp_path):
+    # The head of the file is UTF-8, so the file is searched as UTF-8
+    data = b"ok\n" * 1000 + b"\xff\xfe bad \xc3 ERROR \xe2\x82 ERROR\n"
+    (tmp_path / "a.log").write_bytes(data)
+
+    for pattern, mode in MODES_AND_PATTERNS:
+        matches = list(
+            iter_file_matches(str(tmp_path / "a.log"), pattern, mode)
+        )
+
+        assert [match.byte_offset for match in matches] == [
+            position.start() for position in re.finditer(b"ERROR", data)
+        ]
+
+
+@pytest.mark.parametrize(
+    "bom, encoding",
+    [
+        (b"", "utf-16-le"),
+        (codecs.BOM_UTF16_LE, "utf-16-le"),
+        (codecs.BOM_UTF16_BE, "utf-16-be"),
+        (codecs.BOM_UTF32_LE, "utf-32-le"),
+        (b"", "latin-1"),
+    ],
+)
+@pytest.mark.parametrize("mode", [MODE_LITERAL, MODE_REGEX])
+def test_files_in_other_encodings(tmp_path, bom, encoding, mode):
+    # "Ċ" (U+010A) has a 0x0A byte in UTF-16 and UTF-32, which is not a
+    # newline, and it cannot be encoded into Latin-1
+    text = "first line\nĊ ääkköset ERROR E1\nno match\nlast ERROR E22\n"
+    data = bom + text.encode(encoding, errors="replace")
+    (tmp_path / "a.log").write_bytes(data)
+    pattern = "ERROR E[0-9]+" if mode == MODE_REGEX else ("ERROR E", "Ċ")
+
+    matches = list(iter_matches(str(tmp_path), pattern, mode=mode))
+
+    expected = [(2, "ERROR E1", 0), (4, "ERROR E22", 0)]
+    if mode == MODE_LITERAL:
+        expected = [(2, "ERROR E", 0), (4, "ERROR E", 0)]
+        if encoding != "latin-1":
+            expected.insert(0, (2, "Ċ", 1))
+    assert [
+        (match.line_number, match.text, match.pattern_id) for match in matches
+    ] == expected
+    for match in matches:
+        encoded = match.text.encode(encoding)
+        assert data[match.byte_offset :].startswith(encoded)
+
+
+@pytest.mark.parametrize("newline", ["\r\n", "\r"])
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-16-le"])
+def test_carriage_returns_end_lines(tmp_path, newline, encoding):
+    text = newline.join(["first", "foo ok", "x foo", "foo"]) + newline
+    data = text.encode(encoding)
+    (tmp_path / "a.log").write_bytes(data)
+
+    for pattern, mode, expected in [
+        ("foo", MODE_LITERAL, [2, 3, 4]),
+        ("^foo", MODE_REGEX, [2, 4]),
+        ("foo$", MODE_REGEX, [3, 4]),
+    ]:
+        matches = list(iter_matches(str(tmp_path), pattern, mode=mode))
+
+        assert [match.line_number for match in matches] == expected
+        for match in matches:
+            assert data[match.byte_offset :].startswith(
+                "foo".encode(encoding)
+            )
+
+
+@pytest.mark.parametrize("compiles", [True, False])
+def test_overlapping_strings_are_all_found(monkeypatch, tmp_path, compiles):
+    if not compiles:
+        # Like a set of strings nested too deeply to be compiled
+        monkeypatch.setattr(matches_module, "get_literal_set", lambda _: None)
+    (tmp_path / "a.log").write_bytes(b"ERROR E1\n")
+
+    matches = list(
+        iter_file_matches(str(tmp_path / "a.log"), ("ERROR", "RROR E1", "E"))
+    )
+
+    assert sorted(as_tuples(matches)) == [
+        (1, 0, "E", 2),
+        (1, 0, "ERROR", 0),
+        (1, 1, "RROR E1", 1),
+        (1, 6, "E", 2),
+    ]
+
+
+def test_compressed_file(tmp_path):
+    (tmp_path / "a.log.gz").write_bytes(gzip.compress(CONTENTS))
+
+    matches = list(
+        iter_file_matches(str(tmp_path / "a.log.gz"), r"E[0-9]+", MODE_REGEX)
+    )
+
+    assert len(matches) == 4
+    check_offsets(CONTENTS, matches)
+
+
+def test_max_count(log_directory):
+    matches = list(
+        iter_matches(
+            str(log_directory), "ERROR", suffixes=(".log",), max_count=1
+        )
+    )
+
+    assert [match.line_number for match in matches] == [1, 2, 1, 2]
+
+
+def test_stopping_early_stops_reading(log_directory):
+    io_counters.reset()
+    matches = iter_matches(str(log_directory), "ERROR", suffixes=(".log",))
+
+    first = next(matches)
+    matches.close()
+
+    assert first.path == str(log_directory / "a.log")
+    assert io_counters.opens == 1
+
+
+def test_unreadable_files_are_reported(tmp_path):
+    (tmp_path / "bad.gz").write_bytes(b"\x1f\x8b\x08\x00broken")
+    (tmp_path / "good.log").write_bytes(b"ERROR\n")
+    errors = []
+
+    matches = list(
+        iter_matches(
+            str(tmp_path),
+            "ERROR",
+            on_error=lambda path, error: errors.append(path),
+        )
+    )
+
+    assert [match.path for match in matches] == [str(tmp_path / "good.log")]
+    assert errors == [str(tmp_path / "bad.gz")]
+
+
+def test_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        next(iter_matches(str(tmp_path), "ERROR", mode="glob"))
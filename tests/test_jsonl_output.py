@@ -0,0 +1,138 @@
+"""Tests for the JSON Lines output (--output jsonl)."""
+
+import json
+
+import pytest
+from find_from_files import find_from_files
+from find_from_files.file_reader import FileReader
+
+from tests.functions import run_main
+
+LOG = (
+    "2025-01-01 INFO started\n"
+    "2025-01-01 ERROR E1001 disk full\n"
+    "2025-01-01 ERROR E2002 timeout, ERROR E2003 retry\n"
+)
+
+
+@pytest.fixture(name="log_directory")
+def fixture_log_directory(tmp_path):
+    (tmp_path / "app.log").write_text(LOG, encoding="utf-8")
+    (tmp_path / "data.bin").write_bytes(b"\x7fELF\x00\x01")
+    (tmp_path / "notes.txt").write_text("ERROR E1\n", encoding="utf-8")
+    (tmp_path / "node_modules").mkdir()
+    return tmp_path
+
+
+def get_records(capsys, argv):
+    """Runs find_from_files and returns the parsed records and stderr."""
+    captured = run_main(capsys, [*argv, "--output", "jsonl"])
+    return [json.loads(line) for line in captured.out.splitlines()], (
+        captured.err
+    )
+
+
+def test_regex_matches(capsys, log_directory):
+    records, _ = get_records(
+        capsys, [str(log_directory), "ERROR (E[0-9]+)", "-r", "-s", ".log"]
+    )
+    path = str(log_directory / "app.log")
+
+    assert records == [
+        {"type": "match", "path": path, "line_number": 2, "match": "E1001"},
+        {"type": "match", "path": path, "line_number": 3, "match": "E2002"},
+        {"type": "match", "path": path, "line_number": 3, "match": "E2003"},
+        {"type": "file", "path": path, "number_of_matches": 3},
+        {
+            "type": "skip",
+            "path": str(log_directory / "data.bin"),
+            "reason": "suffix",
+        },
+        {
+            "type": "skip",
+            "path": str(log_directory / "notes.txt"),
+            "reason": "suffix",
+        },
+    ]
+
+
+def test_whole_line_and_pattern_ids(capsys, log_directory):
+    records, _ = get_records(
+        capsys,
+        [str(log_directory), "disk", "-e", "E2[0-9]+", "-r", "-l", "-qq"],
+    )
+    path = str(log_directory / "app.log")
+    line = LOG.splitlines()[2]
+
+    assert records[1:4] == [
+        {
+            "type": "match",
+            "path": path,
+            "line_number": 3,
+            "line": line,
+            "pattern_id": 1,
+            "match": match,
+        }
+        for match in ("E2002", "E2003")
+    ] + [{"type": "file", "path": path, "number_of_matches": 3}]
+    assert all(record["type"] != "skip" for record in records)
+
+
+def test_literal_matches(capsys, log_directory):
+    records, _ = get_records(capsys, [str(log_directory), "ERROR", "-q"])
+
+    assert records == [
+        {
+            "type": "match",
+            "path": str(log_directory / "app.log"),
+            "line_number": 2,
+            "line": LOG.splitlines()[1],
+            "match": "ERROR",
+        },
+        {
+            "type": "match",
+            "path": str(log_directory / "notes.txt"),
+            "line_number": 1,
+            "line": "ERROR E1",
+            "match": "ERROR",
+        },
+    ]
+
+
+@pytest.mark.parametrize("options", [["-r"], ["-e", "timeout"]])
+def test_parallel_output_is_same_as_sequential(capsys, log_directory, options):
+    argv = [str(log_directory), "ERROR", "-S", "node_", *options]
+    sequential, _ = get_records(capsys, argv)
+    parallel, _ = get_records(capsys, [*argv, "-j", "2"])
+
+    assert parallel == sequential
+    assert {
+        "type": "skip",
+        "path": str(log_directory / "node_modules"),
+        "reason": "folder",
+    } in sequential
+
+
+def test_records_are_written_as_found(log_directory):
+    written = []
+    with FileReader(str(log_directory / "app.log")) as reader:
+        reader.head()
+        output = find_from_files.regex_search_jsonl(
+            "E[0-9]+", reader, False, write=written.append
+        )
+
+    assert output == ""
+    assert [json.loads(record)["match"] for record in written[:-1]] == [
+        "E1001",
+        "E2002",
+        "E2003",
+    ]
+
+
+def test_debug_plan_is_printed_to_stderr(capsys, log_directory):
+    records, err = get_records(
+        capsys, [str(log_directory), "ERROR", "-r", "-qq", "--debug-plan"]
+    )
+
+    assert "Engine:" in err
+    assert len(records) == 6
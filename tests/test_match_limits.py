@@ -0,0 +1,159 @@
+"""Tests for stopping the search early with --max-count, --max-total,
+--files-with-matches and --first-match."""
+
+import concurrent.futures
+import json
+import multiprocessing
+import time
+
+import pytest
+from find_from_files import find_from_files
+from find_from_files.file_reader import FileReader
+
+from tests.functions import get_output
+
+LOG = "x ERROR 1\ny\nERROR 2 ERROR 3\n"
+
+
+@pytest.fixture(name="log_directory")
+def fixture_log_directory(tmp_path):
+    for name in ("a.log", "b.log", "c.log"):
+        (tmp_path / name).write_text(LOG, encoding="utf-8")
+    (tmp_path / "b_none.log").write_text("nothing\n", encoding="utf-8")
+    return tmp_path
+
+
+def get_occurrences(output):
+    """Returns the numbers of occurrences in the --regexp summaries."""
+    return [
+        json.loads(line.split("Matches: ", 1)[1])["ERROR"][
+            "number_of_occurrences"
+        ]
+        for line in output.splitlines()
+        if "Matches: " in line
+    ]
+
+
+def test_max_count_per_file(capsys, log_directory):
+    output = get_output(capsys, [str(log_directory), "ERROR", "-r", "-m", "2"])
+
+    assert get_occurrences(output) == [2, 2, 2]
+    assert '"line_numbers": [1, 3]' in output
+
+
+def test_max_count_with_whole_line(capsys, log_directory):
+    output = get_output(
+        capsys, [str(log_directory), "ERROR", "-r", "-l", "-m", "1", "-qq"]
+    )
+
+    assert output.count("1 line(s) found:") == 3
+    assert "ERROR 2" not in output
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_max_total(capsys, log_directory, jobs):
+    output = get_output(
+        capsys,
+        [str(log_directory), "ERROR", "-r", "-qq", "--max-total", "4"]
+        + ["-j", jobs],
+    )
+
+    assert get_occurrences(output) == [3, 1]
+    assert "c.log" not in output
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_files_with_matches(capsys, log_directory, jobs):
+    output = get_output(
+        capsys,
+        [str(log_directory), "ERROR", "-r", "--files-with-matches"]
+        + ["-j", jobs],
+    )
+
+    assert output.splitlines() == [
+        str(log_directory / name) for name in ("a.log", "b.log", "c.log")
+    ]
+
+
+def test_files_with_matches_jsonl(capsys, log_directory):
+    output = get_output(
+        capsys,
+        [str(log_directory), "ERROR", "--files-with-matches", "--max-total"]
+        + ["2", "--output", "jsonl"],
+    )
+
+    assert [json.loads(line) for line in output.splitlines()] == [
+        {"type": "file", "path": str(log_directory / name)}
+        for name in ("a.log", "b.log")
+    ]
+
+
+@pytest.mark.parametrize("newline", ["\r\n", "\r"])
+@pytest.mark.parametrize("pattern", ["foo$", "^foo"])
+def test_files_with_matches_with_carriage_returns(
+    capsys, tmp_path, newline, pattern
+):
+    (tmp_path / "a.log").write_bytes(f"first{newline}foo{newline}".encode())
+    (tmp_path / "b.log").write_bytes(f"first{newline}x foo x".encode())
+
+    output = get_output(
+        capsys, [str(tmp_path), pattern, "-r", "--files-with-matches"]
+    )
+    summary = get_output(capsys, [str(tmp_path), pattern, "-r", "-qq"])
+
+    assert output.splitlines() == [str(tmp_path / "a.log")]
+    assert str(tmp_path / "a.log") in summary
+    assert str(tmp_path / "b.log") not in summary
+
+
+@pytest.mark.parametrize("options", [[], ["-r", "--output", "jsonl"]])
+def test_first_match(capsys, log_directory, options):
+    output = get_output(
+        capsys, [str(log_directory), "ERROR", "--first-match", *options]
+    )
+
+    assert "a.log" in output
+    assert "b.log" not in output
+    assert output.count("ERROR") == 1
+
+
+def test_max_total_with_cached_results(capsys, tmp_path, log_directory):
+    argv = [str(log_directory), "ERROR", "-r", "-qq"]
+    argv += ["--cache-dir", str(tmp_path / "cache")]
+    get_output(capsys, argv)
+    output = get_output(capsys, [*argv, "--max-total", "4"])
+
+    assert get_occurrences(output) == [3, 1]
+
+
+@pytest.mark.parametrize("limit", ["0", "-1"])
+def test_limit_must_be_positive(capsys, log_directory, limit):
+    with pytest.raises(SystemExit):
+        get_output(capsys, [str(log_directory), "ERROR", "--max-total", limit])
+    assert "must be positive" in capsys.readouterr().out
+
+
+def test_search_stops_at_max_count(log_directory):
+    with FileReader(str(log_directory / "a.log")) as reader:
+        reader.head()
+        output = find_from_files.regex_search_jsonl(
+            "ERROR", reader, False, max_count=2
+        )
+
+    assert reader.match_count == 2
+    assert json.loads(output.splitlines()[-1])["number_of_matches"] == 2
+
+
+def test_terminate_workers_stops_running_work():
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+    future = executor.submit(time.sleep, 60)
+    while not future.running():
+        time.sleep(0.01)
+    start = time.monotonic()
+    find_from_files.terminate_workers(executor)
+
+    assert time.monotonic() - start < 10
+    while multiprocessing.active_children() and time.monotonic() - start < 10:
+        time.sleep(0.01)
+    assert not multiprocessing.active_children()
+    assert not future.done() or future.exception() is not None
@@ -0,0 +1,102 @@
+"""Tests for the --regexp match summary with --max-line-numbers and
+--count-only."""
+
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+from find_from_files import find_from_files
+from find_from_files.find_from_files import MatchSummary
+
+from tests.functions import get_output
+
+LOG = "".join(
+    f"line {i} ERROR\n" if i % 2 else f"line {i}\n" for i in range(10)
+)
+
+
+@pytest.fixture(name="log_directory")
+def fixture_log_directory(tmp_path):
+    (tmp_path / "app.log").write_text(LOG, encoding="utf-8")
+    return str(tmp_path)
+
+
+def get_summary(output):
+    return json.loads(output.split("Matches: ", 1)[1])
+
+
+def test_all_line_numbers_by_default(capsys, log_directory):
+    output = get_output(capsys, [log_directory, "ERROR", "-r", "-qq"])
+
+    assert get_summary(output) == {
+        "ERROR": {"number_of_occurrences": 5, "line_numbers": [2, 4, 6, 8, 10]}
+    }
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_max_line_numbers(capsys, log_directory, jobs):
+    output = get_output(
+        capsys,
+        [log_directory, "ERROR", "-r", "-qq", "--max-line-numbers", "2"]
+        + ["-j", jobs],
+    )
+
+    assert get_summary(output) == {
+        "ERROR": {
+            "number_of_occurrences": 5,
+            "line_numbers": [2, 4],
+            "omitted_line_numbers": 3,
+        }
+    }
+
+
+def test_count_only(capsys, log_directory):
+    output = get_output(
+        capsys, [log_directory, "ERROR", "-e", "line 1", "-r", "--count-only"]
+    )
+
+    assert get_summary(output) == {
+        "line 1": {"number_of_occurrences": 1, "pattern_id": 1},
+        "ERROR": {"number_of_occurrences": 5, "pattern_id": 0},
+    }
+
+
+def test_count_only_with_whole_line(capsys, log_directory):
+    output = get_output(
+        capsys, [log_directory, "ERROR", "-r", "-l", "--count-only", "-qq"]
+    )
+
+    assert output.splitlines()[-1].strip() == "5 line(s) found:"
+
+
+def test_count_only_jsonl(capsys, log_directory):
+    with patch.object(
+        sys,
+        "argv",
+        ["find_from_files", log_directory, "ERROR", "-r", "--count-only"]
+        + ["--output", "jsonl"],
+    ):
+        find_from_files.main()
+    output = capsys.readouterr().out
+    records = [json.loads(line) for line in output.splitlines()]
+
+    assert [record["type"] for record in records] == ["file"]
+    assert records[0]["number_of_matches"] == 5
+
+
+def test_negative_max_line_numbers(capsys, log_directory):
+    with pytest.raises(SystemExit):
+        get_output(
+            capsys, [log_directory, "ERROR", "-r", "--max-line-numbers", "-1"]
+        )
+    assert "cannot be negative" in capsys.readouterr().out
+
+
+def test_summary_is_compact():
+    summary = MatchSummary()
+    assert not hasattr(summary, "__dict__")
+    assert summary.line_numbers.itemsize == 4
+    assert MatchSummary(keep_line_numbers=False).to_json() == {
+        "number_of_occurrences": 0
+    }
@@ -0,0 +1,182 @@
+"""Tests for searching for several patterns at once with -e and
+--patterns-file."""
+
+import io
+import json
+import random
+import re
+import sys
+from unittest.mock import patch
+
+import pytest
+from find_from_files import find_from_files, literal_set
+from find_from_files.literal_set import LiteralSet, find_first_occurrences
+from find_from_files.regex_search import combine_patterns, find_matching_lines
+
+from tests.functions import get_output
+
+LOG = (
+    "2025-01-01 INFO started\n"
+    "2025-01-01 ERROR E1001 disk full\n"
+    "2025-01-01 WARN slow request\n"
+    "2025-01-01 ERROR E2002 timeout\n"
+)
+
+
+@pytest.fixture(name="log_directory")
+def fixture_log_directory(tmp_path):
+    (tmp_path / "app.log").write_text(LOG, encoding="utf-8")
+    (tmp_path / "other.log").write_text("nothing here\n", encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_finds_every_occurrence_of_every_pattern():
+    rng = random.Random(0)
+    for _ in range(200):
+        patterns = [
+            "".join(rng.choices("ab", k=rng.randint(1, 4))).encode()
+            for _ in range(rng.randint(1, 6))
+        ]
+        text = "".join(rng.choices("abc", k=rng.randint(0, 50))).encode()
+
+        expected = sorted(
+            (match.start(), pattern_id)
+            for pattern_id, pattern in enumerate(patterns)
+            for match in re.finditer(b"(?=" + re.escape(pattern) + b")", text)
+        )
+        assert (
+            sorted(LiteralSet(patterns).find_all(text)) == expected
+        ), patterns
+
+
+@pytest.mark.parametrize("min_patterns", [1, 1000])
+def test_finds_first_occurrences(monkeypatch, min_patterns):
+    monkeypatch.setattr(
+        literal_set, "LITERAL_SET_MIN_PATTERNS", min_patterns
+    )
+    patterns = (b"E2002", b"ERROR", b"missing", b"", b"ERROR", b"RROR E1")
+
+    assert find_first_occurrences(LOG.encode(), patterns) == {
+        0: LOG.index("E2002"),
+        1: LOG.index("ERROR"),
+        3: 0,
+        4: LOG.index("ERROR"),
+        5: LOG.index("RROR E1"),
+    }
+
+
+def test_deeply_nested_patterns_are_searched_one_by_one():
+    patterns = tuple(b"a" * length for length in range(1, 3001))
+    assert literal_set.get_literal_set(patterns) is None
+
+    found = find_first_occurrences(b"x" + b"a" * 2000, patterns)
+
+    assert found == {length - 1: 1 for length in range(1, 2001)}
+
+
+def test_literal_patterns_are_reported_with_pattern_ids(capsys, log_directory):
+    output = get_output(
+        capsys, [log_directory, "-e", "timeout", "-e", "WARN", "-e", "nope"]
+    )
+
+    assert output.count("Found pattern") == 2
+    assert "Found pattern 1 on line 3: 2025-01-01 WARN slow" in output
+    assert "Found pattern 0 on line 4: 2025-01-01 ERROR E2002" in output
+
+
+def test_search_string_and_patterns_file_are_combined(
+    capsys, tmp_path, log_directory
+):
+    patterns_file = tmp_path / "patterns.txt"
+    patterns_file.write_text(r"WARN (\w+)" + "\n\n" + r"E\d+" + "\n")
+
+    output = get_output(
+        capsys,
+        [
+            log_directory,
+            "INFO",
+            "--regexp",
+            "--patterns-file",
+            str(patterns_file),
+            "-qq",
+        ],
+    )
+
+    matches = json.loads(output.split("Matches: ")[1])
+    assert matches == {
+        "INFO": {
+            "number_of_occurrences": 1,
+            "line_numbers": [1],
+            "pattern_id": 0,
+        },
+        "E1001": {
+            "number_of_occurrences": 1,
+            "line_numbers": [2],
+            "pattern_id": 2,
+        },
+        "slow": {
+            "number_of_occurrences": 1,
+            "line_numbers": [3],
+            "pattern_id": 1,
+        },
+        "E2002": {
+            "number_of_occurrences": 1,
+            "line_numbers": [4],
+            "pattern_id": 2,
+        },
+    }
+
+
+def test_whole_lines_are_reported_with_pattern_ids(capsys, log_directory):
+    output = get_output(
+        capsys,
+        [log_directory, "-e", "WARN", "-e", "E2", "-r", "-l", "-qq"],
+    )
+
+    assert "2 line(s) found:" in output
+    assert "3 (pattern 0): 2025-01-01 WARN slow request" in output
+    assert "4 (pattern 1): 2025-01-01 ERROR E2002 timeout" in output
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        [r"ERROR (E\d)(\d+)", r"disk|slow", r"(?P<word>t\w+)"],
+        [r"(E)\d+ \w+", r"(\w)\1", r"time"],
+        [r"(?i)error", r"warn"],
+    ],
+)
+def test_combined_search_is_same_as_separate_searches(patterns):
+    separately = {}
+    for pattern_id, pattern in enumerate(patterns):
+        for line_number, _, matches in find_matching_lines(
+            pattern, io.StringIO(LOG)
+        ):
+            separately.setdefault(line_number, set()).update(
+                (pattern_id, match) for match in matches
+            )
+
+    combined = {
+        line_number: set(matches)
+        for line_number, _, matches in find_matching_lines(
+            patterns, io.StringIO(LOG)
+        )
+    }
+
+    assert combined == separately
+
+
+def test_patterns_with_group_references_are_not_combined():
+    assert combine_patterns([r"a(b)", r"c(?P<x>d)"]) is not None
+    assert combine_patterns([r"a(b)", r"(\w)\1"]) is None
+    assert combine_patterns([r"(?i)a", r"b"]) is None
+    assert combine_patterns([r"(?P<x>a)", r"(?P<x>b)"]) is None
+
+
+def test_no_patterns_is_an_error(capsys, log_directory):
+    with pytest.raises(SystemExit), patch.object(
+        sys, "argv", ["find_from_files", log_directory]
+    ):
+        find_from_files.main()
+
+    assert "No search string!" in capsys.readouterr().out
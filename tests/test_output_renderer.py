@@ -0,0 +1,133 @@
+"""Tests for formatting and buffering the output with OutputRenderer."""
+
+import io
+import os
+import signal
+
+import pytest
+from unittest.mock import patch
+
+from find_from_files import find_from_files, output_renderer
+from find_from_files.output_renderer import OutputRenderer, get_indented_str
+from find_from_files.prefetch import Prefetcher
+
+
+class TerminalStream(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def test_output_to_non_terminal_is_not_wrapped():
+    renderer = OutputRenderer(io.StringIO())
+
+    assert renderer.columns is None
+    assert renderer.indent("x" * 200, 4, 8) == " " * 4 + "x" * 200
+
+
+@patch.object(output_renderer, "get_terminal_width", lambda: 20)
+def test_output_to_terminal_is_wrapped_to_terminal_width():
+    renderer = OutputRenderer(TerminalStream())
+
+    assert renderer.columns == 20
+    assert renderer.indent("x" * 30, 4, 8) == get_indented_str(
+        "x" * 30, 4, 8, 20
+    )
+    assert renderer.indent("x" * 30, 4, 8) == (
+        " " * 4 + "x" * 16 + " " * 8 + "x" * 12 + " " * 8 + "x" * 2
+    )
+
+
+@pytest.mark.skipif(
+    not hasattr(signal, "SIGWINCH"), reason="SIGWINCH is not available"
+)
+def test_terminal_width_is_refreshed_on_resize():
+    with patch.object(output_renderer, "get_terminal_width", lambda: 20):
+        renderer = OutputRenderer(TerminalStream())
+
+    with renderer, patch.object(
+        output_renderer, "get_terminal_width", lambda: 40
+    ):
+        os.kill(os.getpid(), signal.SIGWINCH)
+        assert renderer.columns == 40
+
+    # The width is no longer refreshed once the renderer is closed
+    with patch.object(output_renderer, "get_terminal_width", lambda: 60):
+        os.kill(os.getpid(), signal.SIGWINCH)
+    assert renderer.columns == 40
+
+
+def test_lines_are_buffered_until_flushed():
+    stream = io.StringIO()
+    renderer = OutputRenderer(stream, flush_interval=60)
+
+    renderer.write("first")
+    renderer.write("second")
+    assert stream.getvalue() == ""
+
+    renderer.flush()
+    assert stream.getvalue() == "first\nsecond\n"
+
+
+def test_buffer_is_flushed_when_it_is_full():
+    stream = io.StringIO()
+    renderer = OutputRenderer(stream, buffer_size=10, flush_interval=60)
+
+    renderer.write("12345")
+    assert stream.getvalue() == ""
+    renderer.write("67890")
+    assert stream.getvalue() == "12345\n67890\n"
+
+
+def test_buffer_is_flushed_on_close():
+    stream = io.StringIO()
+
+    with OutputRenderer(stream, flush_interval=60) as renderer:
+        renderer.write("line")
+        assert stream.getvalue() == ""
+
+    assert stream.getvalue() == "line\n"
+
+
+def test_pending_lines_are_flushed():
+    stream = io.StringIO()
+    renderer = OutputRenderer(stream, flush_interval=60)
+
+    renderer.flush_pending()
+    assert stream.getvalue() == ""
+    renderer.write("line")
+    renderer.flush_pending()
+    assert stream.getvalue() == "line\n"
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_output_is_flushed_before_file_is_searched(tmp_path, prefetch):
+    (tmp_path / "large.log").write_text("ERROR\n", encoding="utf-8")
+    stream = io.StringIO()
+    renderer = OutputRenderer(stream, flush_interval=60)
+    output_before_search = []
+
+    def search_func(search_string, reader, whole_line, columns):
+        output_before_search.append(stream.getvalue())
+        return find_from_files.find_folders_with_string(
+            search_string, reader, whole_line, columns
+        )
+
+    prefetcher = Prefetcher(2) if prefetch else None
+    renderer.write("earlier output")
+    find_from_files.traverse_directories(
+        str(tmp_path),
+        None,
+        None,
+        "ERROR",
+        False,
+        False,
+        False,
+        search_func,
+        renderer=renderer,
+        prefetcher=prefetcher,
+    )
+    if prefetcher is not None:
+        prefetcher.close()
+
+    assert output_before_search[0].startswith("earlier output\n")
+    assert "Checking folder" in output_before_search[0]
@@ -0,0 +1,111 @@
+"""Tests for searching files in parallel with the --jobs option.
+
+Worker processes cannot see the mocks used in the other tests, so these tests
+create the directory structure into a temporary directory.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+from colorama import Style
+
+from tests.constants import DIRECTORY_STRUCTURE
+from tests.functions import run_main
+
+
+@pytest.fixture(name="base_directory")
+def fixture_base_directory(tmp_path):
+    """Creates the DIRECTORY_STRUCTURE with some matching files."""
+    for entry in DIRECTORY_STRUCTURE:
+        dir_path = tmp_path / entry["root"]
+        dir_path.mkdir(parents=True, exist_ok=True)
+        for i, file in enumerate(entry["files"]):
+            content = "Tämä on testi.\n" if i % 2 == 0 else "Ei osumia.\n"
+            (dir_path / file).write_text(
+                f"Rivi.\n{content}" * 3, encoding="utf-8"
+            )
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        [],
+        ["--regexp"],
+        ["--regexp", "--whole-line"],
+        ["--suffix", ".log", "--skip", "skipThis"],
+        ["--quieter"],
+    ],
+)
+def test_parallel_output_is_same_as_sequential(capsys, base_directory, options):
+    sequential = run_main(capsys, [base_directory, "test", *options])
+    parallel = run_main(
+        capsys, [base_directory, "test", *options, "--jobs", "2"]
+    )
+
+    assert parallel.err == ""
+    assert parallel.out == sequential.out
+    assert "Checking file" in parallel.out
+
+
+def test_output_is_in_walk_order(capsys, base_directory):
+    captured = run_main(capsys, [base_directory, "test", "--jobs", "4"])
+
+    checked = [
+        line.split(base_directory)[1].split(Style.RESET_ALL)[0]
+        for line in captured.out.splitlines()
+        if "Checking" in line
+    ]
+    assert checked == [
+        "",
+        os.sep + "file1.log",
+        os.sep + "file2.txt",
+        os.sep + "dir1",
+        os.sep + os.path.join("dir1", "file3"),
+        os.sep + os.path.join("dir1", "file4.py"),
+        os.sep + "dir2",
+        os.sep + os.path.join("dir2", "file7.log"),
+        os.sep + os.path.join("dir2", "file8.py"),
+        os.sep + os.path.join("dir2", "dir4"),
+        os.sep + os.path.join("dir2", "dir5"),
+        os.sep + os.path.join("dir2", "dir5", "file10.log"),
+        os.sep + os.path.join("dir2", "dir5", "file11"),
+        os.sep + "skipThis",
+        os.sep + os.path.join("skipThis", "file5.py"),
+        os.sep + os.path.join("skipThis", "file6.log"),
+        os.sep + os.path.join("skipThis", "dir3"),
+        os.sep + os.path.join("skipThis", "dir3", "file9.log"),
+    ]
+
+
+def test_busy_workers_are_stopped_on_ctrl_c(tmp_path):
+    # Backtracking makes searching these lines take practically forever
+    for name in ("a.log", "b.log"):
+        (tmp_path / name).write_text("a" * 40 + "\n", encoding="utf-8")
+    with subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "find_from_files.find_from_files",
+            str(tmp_path),
+            "(a+)+[bc]",
+            "-r",
+            "-j",
+            "2",
+        ],
+        stdout=subprocess.DEVNULL,
+    ) as process:
+        time.sleep(2)
+        assert process.poll() is None
+        start = time.monotonic()
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout=20)
+        finally:
+            process.kill()
+
+    assert time.monotonic() - start < 20
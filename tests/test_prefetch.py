@@ -0,0 +1,111 @@
+"""Tests for reading the files ahead of the search (--prefetch)."""
+
+import gzip
+import io
+import time
+
+import pytest
+from find_from_files import find_from_files
+from find_from_files.output_renderer import OutputRenderer
+from find_from_files.prefetch import Prefetcher
+
+from tests.functions import get_output
+
+LATENCY = 0.05
+FILE_COUNT = 16
+
+
+@pytest.fixture(name="log_directory")
+def fixture_log_directory(tmp_path):
+    for i in range(FILE_COUNT):
+        (tmp_path / f"app{i:02}.log").write_text(
+            f"line {i}\nERROR {i}\n", encoding="utf-8"
+        )
+    (tmp_path / "old.log.gz").write_bytes(gzip.compress(b"a\nERROR old\n"))
+    (tmp_path / "data.bin").write_bytes(b"\x7fELF\x00\x01")
+    return tmp_path
+
+
+class SlowOpener:
+    """Opens files like open(), after waiting for LATENCY seconds, as on a
+    network file system."""
+
+    def __init__(self):
+        self.prefetcher = None
+        self.max_held_bytes = 0
+
+    def __call__(self, file_path, mode):
+        time.sleep(LATENCY)
+        if self.prefetcher is not None:
+            self.max_held_bytes = max(
+                self.max_held_bytes, self.prefetcher.held_bytes
+            )
+        # The prefetcher opens the files in binary mode
+        assert mode == "rb"
+        return open(file_path, "rb")
+
+
+def search(log_directory, prefetcher):
+    """Searches log_directory with traverse_directories() and returns the
+    output."""
+    stream = io.StringIO()
+    renderer = OutputRenderer(stream)
+    with prefetcher:
+        find_from_files.traverse_directories(
+            str(log_directory),
+            None,
+            None,
+            "ERROR",
+            False,
+            False,
+            False,
+            find_from_files.find_folders_with_string,
+            renderer=renderer,
+            prefetcher=prefetcher,
+        )
+    return stream.getvalue()
+
+
+@pytest.mark.parametrize("options", [[], ["-r"], ["-r", "--output", "jsonl"]])
+def test_output_is_same_as_without_prefetch(capsys, log_directory, options):
+    argv = [str(log_directory), "ERROR", *options]
+    expected = get_output(capsys, argv)
+    output = get_output(capsys, [*argv, "--prefetch", "4"])
+
+    assert output == expected
+    assert "old.log.gz" in output
+
+
+def test_reads_are_overlapped(log_directory):
+    start = time.perf_counter()
+    sequential = search(log_directory, Prefetcher(1, opener=SlowOpener()))
+    sequential_time = time.perf_counter() - start
+    start = time.perf_counter()
+    prefetched = search(log_directory, Prefetcher(8, opener=SlowOpener()))
+    prefetched_time = time.perf_counter() - start
+
+    assert prefetched == sequential
+    assert sequential_time > FILE_COUNT * LATENCY
+    assert prefetched_time < sequential_time / 2
+
+
+def test_held_bytes_are_capped(log_directory):
+    opener = SlowOpener()
+    # Room for the contents of only two files at a time
+    prefetcher = Prefetcher(8, max_bytes=36, opener=opener)
+    opener.prefetcher = prefetcher
+    output = search(log_directory, prefetcher)
+
+    assert output == search(log_directory, Prefetcher(1))
+    assert 0 < opener.max_held_bytes <= 36
+    assert prefetcher.held_bytes == 0
+
+
+def test_files_that_cannot_be_opened_ahead_are_searched(log_directory):
+    def failing_opener(file_path, mode):
+        raise PermissionError(file_path)
+
+    output = search(log_directory, Prefetcher(4, opener=failing_opener))
+
+    assert output == search(log_directory, Prefetcher(1))
+    assert output.count("Found on line 2") == FILE_COUNT + 1
@@ -0,0 +1,187 @@
+"""Tests for finding matching lines with find_matching_lines.
+
+The results of searching whole chunks of text are compared with the results of
+running re.findall() on each line separately, and the results of searching
+the raw bytes with find_matching_lines_in_bytes() with those of searching the
+decoded text.
+"""
+
+import io
+import random
+import re
+
+import pytest
+
+from find_from_files import buffers, regex_search
+from find_from_files.regex_literals import (
+    BYTES_ASCII,
+    BYTES_UTF8,
+    bytes_equivalence,
+    matches_within_lines,
+)
+from find_from_files.regex_search import (
+    find_matching_lines,
+    find_matching_lines_in_bytes,
+)
+
+PATTERNS = [
+    r"test",
+    r"ERROR \d+",
+    r"(\w+)=(\d+)",
+    r"id=(\d+)",
+    r"^\w+",
+    r"\d+$",
+    r"a\s+b",
+    r"b\n",
+    r"[^x]{3}",
+    r"(?s)a.b",
+    r"\bab\b",
+    r"a|b\nc",
+]
+ALPHABET = ["a", "b", "c", "x", " ", "\n", "\n", "1", "=", "id", "ERROR "]
+BYTES_PATTERNS = PATTERNS + [
+    r"E[0-9]+",
+    r"(?i)error",
+    r"x*",
+    r"ä+",
+    r"a$",
+    ["ERROR", r"id=(\d+)"],
+    [r"(a)\1", "b"],
+]
+BYTES_ALPHABET = ALPHABET + ["ä", "\r\n", "\r", "١"]
+
+
+def findall_by_line(pattern, text):
+    return [
+        (i + 1, line, matches)
+        for i, line in enumerate(io.StringIO(text))
+        if (matches := re.findall(pattern, line))
+    ]
+
+
+def normalized(lines):
+    # The whole text engine gives the lines without the newline
+    return [(n, line.rstrip("\n"), matches) for n, line, matches in lines]
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_finds_same_lines_as_findall_on_each_line(pattern):
+    rng = random.Random(pattern)
+    for _ in range(300):
+        text = "".join(rng.choices(ALPHABET, k=rng.randint(0, 60)))
+        assert normalized(
+            find_matching_lines(pattern, io.StringIO(text))
+        ) == normalized(findall_by_line(pattern, text)), repr(text)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_finds_same_lines_across_chunks(monkeypatch, pattern):
+    monkeypatch.setattr(regex_search, "TEXT_CHUNK_SIZE", 7)
+    rng = random.Random(pattern)
+    for _ in range(100):
+        text = "".join(rng.choices(ALPHABET, k=rng.randint(0, 80)))
+        assert normalized(
+            find_matching_lines(pattern, io.StringIO(text))
+        ) == normalized(findall_by_line(pattern, text)), repr(text)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_finds_same_lines_when_switching_to_line_by_line(monkeypatch, pattern):
+    monkeypatch.setattr(regex_search, "TEXT_CHUNK_SIZE", 16)
+    monkeypatch.setattr(regex_search, "DENSE_MIN_MATCHING_LINES", 2)
+    rng = random.Random(pattern)
+    for _ in range(100):
+        text = "".join(rng.choices(ALPHABET, k=rng.randint(0, 80)))
+        assert normalized(
+            find_matching_lines(pattern, io.StringIO(text))
+        ) == normalized(findall_by_line(pattern, text)), repr(text)
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        (r"ERROR \d+", True),
+        (r"^\w+=\d+$", True),
+        (r"a\s+b", True),
+        (r"x*", False),
+        (r"(?<=a)b", False),
+        (r"\Afoo", False),
+        (r"\s+$", False),
+        (r"(?>a\s)b", False),
+        (r"[", False),
+    ],
+)
+def test_tells_whether_pattern_matches_within_lines(pattern, expected):
+    assert matches_within_lines(pattern) == expected
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        (r"ERROR (E[0-9]+)$", BYTES_UTF8),
+        (r"(a)\1b", BYTES_UTF8),
+        (r"ERROR \d+", BYTES_ASCII),
+        (r"a.b", BYTES_ASCII),
+        (r"[^x]", BYTES_ASCII),
+        (r"\bab", BYTES_ASCII),
+        (r"(?i)error", BYTES_ASCII),
+        (r"x*", BYTES_ASCII),
+        (r"a\s+b", None),
+        (r"Tämä", None),
+        (r"\xe4", None),
+        (r"\u0041", None),
+        (r"[", None),
+    ],
+)
+def test_tells_whether_pattern_can_be_run_on_bytes(pattern, expected):
+    assert bytes_equivalence(pattern) == expected
+
+
+def find_in_decoded(pattern, data):
+    file = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="ignore")
+    return normalized(find_matching_lines(pattern, file))
+
+
+@pytest.mark.parametrize("pattern", BYTES_PATTERNS)
+def test_finds_same_lines_in_bytes_as_in_decoded_text(monkeypatch, pattern):
+    monkeypatch.setattr(buffers, "WINDOW_READ_SIZE", 9)
+    rng = random.Random(str(pattern))
+    for _ in range(200):
+        text = "".join(rng.choices(BYTES_ALPHABET, k=rng.randint(0, 80)))
+        data = text.encode("utf-8")
+        assert normalized(
+            find_matching_lines_in_bytes(pattern, io.BytesIO(data))
+        ) == find_in_decoded(pattern, data), repr(text)
+
+
+@pytest.mark.parametrize("pattern", BYTES_PATTERNS)
+def test_finds_same_lines_in_bytes_when_dense(monkeypatch, pattern):
+    monkeypatch.setattr(buffers, "WINDOW_READ_SIZE", 16)
+    monkeypatch.setattr(regex_search, "DENSE_MIN_MATCHING_LINES", 2)
+    rng = random.Random(str(pattern))
+    for _ in range(100):
+        text = "".join(rng.choices(BYTES_ALPHABET, k=rng.randint(0, 80)))
+        data = text.encode("utf-8")
+        assert normalized(
+            find_matching_lines_in_bytes(pattern, io.BytesIO(data))
+        ) == find_in_decoded(pattern, data), repr(text)
+
+
+def test_only_matching_lines_are_decoded(monkeypatch):
+    decoded = []
+    original_decode = regex_search.decode_value
+
+    def decode(value, encoding):
+        decoded.append(value)
+        return original_decode(value, encoding)
+
+    monkeypatch.setattr(regex_search, "decode_value", decode)
+    data = b"".join(b"line %d ok\n" % i for i in range(1000))
+    data += b"line 1000 ERROR E42\n"
+
+    found = list(
+        find_matching_lines_in_bytes(r"ERROR (E\d+)", io.BytesIO(data))
+    )
+
+    assert found == [(1001, "line 1000 ERROR E42", ["E42"])]
+    assert decoded == [b"line 1000 ERROR E42", b"E42"]
@@ -0,0 +1,125 @@
+"""Tests for skipping files and chunks without the required literals of the
+searched regular expressions."""
+
+import io
+from unittest.mock import patch
+
+import pytest
+from find_from_files import regex_search
+from find_from_files.file_reader import FileReader
+from find_from_files.regex_literals import Prefilter
+from find_from_files.regex_search import find_matching_lines
+
+from tests.functions import get_output
+
+
+@pytest.mark.parametrize(
+    "patterns, expected",
+    [
+        (["ERROR [0-9]+"], [("ERROR ",)]),
+        (["foo.*barbaz"], [("barbaz", "foo")]),
+        (["ab\ncd"], None),
+        (["[a-z]+"], None),
+        (["(?i)error"], None),
+        (["ERROR", "WARN"], [("ERROR",), ("WARN",)]),
+        (["ERROR", "\\d+"], None),
+    ],
+)
+def test_prefilter_literals(patterns, expected):
+    assert Prefilter(patterns).literals == expected
+
+
+def test_prefilter_could_match():
+    prefilter = Prefilter(["foo.*bar", "baz"])
+    assert prefilter.could_match("a bar and a foo")
+    assert prefilter.could_match("baz")
+    assert not prefilter.could_match("foo only")
+    assert prefilter.could_match_bytes(b"bar foo")
+    assert not prefilter.could_match_bytes(b"ba r fo o")
+    assert Prefilter(["\\w+"]).could_match_bytes(b"")
+
+
+def test_skips_files_without_literals(tmp_path, capsys):
+    (tmp_path / "match.log").write_text("x\nERROR 42\n", encoding="utf-8")
+    (tmp_path / "other.log").write_text("x\nWARN 42\n", encoding="utf-8")
+    searched = []
+    original_binary = FileReader.binary
+
+    def binary(reader):
+        searched.append(reader.file_path)
+        return original_binary(reader)
+
+    with patch.object(FileReader, "binary", binary):
+        output = get_output(
+            capsys, [str(tmp_path), "ERROR [0-9]+", "-r", "-qq"]
+        )
+
+    assert searched == [str(tmp_path / "match.log")]
+    assert "ERROR 42" in output
+    assert "other.log" not in output
+
+
+def test_skips_chunks_without_literals(monkeypatch):
+    lines = [f"line {i}\n" for i in range(100)]
+    lines[37] = "line 37 ERROR 5\n"
+    lines[91] = "line 91 ERROR 6 ERROR 7\n"
+    monkeypatch.setattr(regex_search, "TEXT_CHUNK_SIZE", 64)
+    searched = []
+    original_could_match = Prefilter.could_match
+
+    def could_match(prefilter, text):
+        if original_could_match(prefilter, text):
+            searched.append(text)
+            return True
+        return False
+
+    monkeypatch.setattr(Prefilter, "could_match", could_match)
+    results = list(
+        find_matching_lines("ERROR [0-9]", io.StringIO("".join(lines)))
+    )
+
+    assert results == [
+        (38, "line 37 ERROR 5", ["ERROR 5"]),
+        (92, "line 91 ERROR 6 ERROR 7", ["ERROR 6", "ERROR 7"]),
+    ]
+    assert len(searched) == 2
+
+
+@pytest.mark.parametrize(
+    "pattern", ["(?<=ERROR )[0-9]+", "ERROR$", "^line 9", "E(RR)(OR)"]
+)
+def test_prefilter_does_not_change_matches(monkeypatch, pattern):
+    text = "".join(
+        f"line {i} ERROR {i}\n" if i % 7 == 0 else f"line {i}\n"
+        for i in range(200)
+    )
+    text += "last ERROR"
+    monkeypatch.setattr(regex_search, "TEXT_CHUNK_SIZE", 50)
+    filtered = list(find_matching_lines(pattern, io.StringIO(text)))
+    monkeypatch.setattr(Prefilter, "could_match", lambda self, text: True)
+    assert filtered == list(find_matching_lines(pattern, io.StringIO(text)))
+    assert filtered
+
+
+def test_debug_plan(tmp_path, capsys):
+    output = get_output(
+        capsys, [str(tmp_path), "ERROR [0-9]+", "-r", "--debug-plan"]
+    )
+    assert "Engine: regex over whole chunks of text" in output
+    assert "Prefilter: bytes.find() for 'ERROR '" in output
+    assert "Decoding: only the matching lines\n" in output
+
+    output = get_output(capsys, [str(tmp_path), "\\w+", "-r", "--debug-plan"])
+    assert "Prefilter: none (no required literals)" in output
+    assert "Decoding: only the matching lines of ASCII chunks" in output
+
+    output = get_output(capsys, [str(tmp_path), "\\s+", "-r", "--debug-plan"])
+    assert "Decoding: whole chunks" in output
+
+    output = get_output(
+        capsys, [str(tmp_path), "ERROR", "-e", "WARN", "-r", "--debug-plan"]
+    )
+    assert "pattern 1: 'WARN'" in output
+
+    output = get_output(capsys, [str(tmp_path), "ERROR", "--debug-plan"])
+    assert "Engine: bytes.find() for 1 literal(s)" in output
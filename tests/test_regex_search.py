@@ -4,12 +4,13 @@ These are searches that are made with the --regexp flag and look for regular
 expression pattern matches from the files.
 """
 
-import os
 import sys
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 
+import pytest
 from colorama import Fore, Style
 from find_from_files import find_from_files
+from find_from_files.file_reader import FileReader
 
 from tests.constants import (
     DIRECTORIES,
@@ -30,7 +31,6 @@ from tests.functions import (
     check_files_are_not_printed,
     check_files_are_skipped,
 )
-from tests.mock_walk import MockWalk
 
 REGEXP_MATCH_FOUND = (
     'Matches: {"test": {"number_of_occurrences": 1, "line_numbers": [1]}}'
@@ -44,13 +44,10 @@ REGEXP_MATCH_FOUND_WHOLE_LINES_MATCH = (
 
 
 @patch.object(sys, "argv", ["find_from_files", "--regexp", ROOT, "test"])
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_checks_every_file(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -65,13 +62,10 @@ def test_checks_every_file(capsys):
 @patch.object(
     sys, "argv", ["find_from_files", "--regexp", "--whole-line", ROOT, "test"]
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_checks_every_file_whole_line(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -89,13 +83,10 @@ def test_checks_every_file_whole_line(capsys):
     "argv",
     ["find_from_files", "--regexp", ROOT, "test", "--skip", "skipThis"],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_skips_directories_correctly(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -116,13 +107,10 @@ def test_skips_directories_correctly(capsys):
     "argv",
     ["find_from_files", "--regexp", ROOT, "test", "--suffix", ".log"],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_skips_files_correctly(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -151,13 +139,10 @@ def test_skips_files_correctly(capsys):
         "dir5",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_skips_multiple_directories_correctly(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -179,13 +164,10 @@ def test_skips_multiple_directories_correctly(capsys):
     "argv",
     ["find_from_files", "--regexp", ROOT, "test", "--suffix", ".log", ".txt"],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_handles_multiple_file_suffixes_correctly(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -216,13 +198,10 @@ def test_handles_multiple_file_suffixes_correctly(capsys):
         "--quiet",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quiet_flag_works_correctly(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -259,13 +238,10 @@ def test_quiet_flag_works_correctly(capsys):
         "--quiet",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quiet_flag_prints_checked_files_with_no_matches(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -302,13 +278,10 @@ def test_quiet_flag_prints_checked_files_with_no_matches(capsys):
         "--quieter",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quieter_flag_prints_files_with_matches(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -345,13 +318,10 @@ def test_quieter_flag_prints_files_with_matches(capsys):
         "--quieter",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quieter_flag_does_not_print_files_with_no_matches(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -389,13 +359,10 @@ def test_quieter_flag_does_not_print_files_with_no_matches(capsys):
         "--quieter",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quieter_flag_no_suffixes_does_not_print_files_with_no_matches(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -0,0 +1,97 @@
+"""Tests for the persistent result cache (--cache, --cache-dir)."""
+
+import os
+
+import pytest
+from find_from_files.file_reader import io_counters
+from find_from_files.result_cache import ResultCache
+
+from tests.functions import get_output
+
+
+@pytest.fixture(name="log_directory")
+def fixture_log_directory(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "app.log").write_text("a\nERROR 1\nb\n", encoding="utf-8")
+    (logs / "other.log").write_text("nothing\n", encoding="utf-8")
+    (logs / "data.bin").write_bytes(b"\x7fELF\x00\x01")
+    return str(logs)
+
+
+def test_get_returns_stored_result(tmp_path):
+    path = tmp_path / "file.log"
+    path.write_text("x\n", encoding="utf-8")
+    stat_result = os.stat(path)
+    with ResultCache(str(tmp_path / "cache")) as cache:
+        assert cache.get(str(path), stat_result, "query") is None
+        cache.put(str(path), stat_result, "query", False, "output")
+
+    with ResultCache(str(tmp_path / "cache")) as cache:
+        assert cache.get(str(path), stat_result, "query") == (False, "output")
+        assert cache.get(str(path), stat_result, "other query") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    path.write_text("changed\n", encoding="utf-8")
+    with ResultCache(str(tmp_path / "cache")) as cache:
+        assert cache.get(str(path), os.stat(path), "query") is None
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    path = tmp_path / "file.log"
+    path.write_text("x\n", encoding="utf-8")
+    stat_result = os.stat(path)
+    cache_directory = str(tmp_path / "cache")
+    for query in ("a", "b", "c"):
+        with ResultCache(cache_directory) as cache:
+            cache.put(str(path), stat_result, query, False, "x" * 1000)
+    with ResultCache(cache_directory) as cache:
+        assert cache.get(str(path), stat_result, "a") is not None
+
+    with ResultCache(cache_directory, max_size=2500) as cache:
+        pass
+    with ResultCache(cache_directory) as cache:
+        assert cache.get(str(path), stat_result, "a") is not None
+        assert cache.get(str(path), stat_result, "b") is None
+        assert cache.get(str(path), stat_result, "c") is not None
+
+
+@pytest.mark.parametrize("options", [[], ["--regexp", "--whole-line"]])
+def test_unchanged_files_are_not_opened(
+    capsys, tmp_path, log_directory, options
+):
+    argv = [log_directory, "ERROR", "--cache-dir", str(tmp_path / "cache")]
+    first = get_output(capsys, [*argv, *options])
+    io_counters.reset()
+    second = get_output(capsys, [*argv, *options, "--cache-stats"])
+
+    assert io_counters.opens == 0
+    assert second == first + "Cache hits: 3, misses: 0\n"
+    assert "ERROR" in first
+
+
+def test_changed_file_is_searched_again(capsys, tmp_path, log_directory):
+    argv = [log_directory, "ERROR", "--cache-dir", str(tmp_path / "cache")]
+    get_output(capsys, argv)
+    with open(
+        os.path.join(log_directory, "other.log"), "a", encoding="utf-8"
+    ) as f:
+        f.write("ERROR 2\n")
+    io_counters.reset()
+    output = get_output(capsys, [*argv, "--cache-stats"])
+
+    assert io_counters.opens == 1
+    assert "Found on line 2" in output
+    assert output.endswith("Cache hits: 2, misses: 1\n")
+
+
+def test_no_cache_overrides_cache_dir(capsys, tmp_path, log_directory):
+    cache_directory = tmp_path / "cache"
+    get_output(
+        capsys,
+        [log_directory, "ERROR", "--cache-dir", str(cache_directory)]
+        + ["--no-cache", "--cache-stats"],
+    )
+
+    assert not cache_directory.exists()
+    assert "Cache hits" not in capsys.readouterr().out
@@ -0,0 +1,78 @@
+"""Tests for the search statistics (--stats)."""
+
+import json
+
+import pytest
+from find_from_files.search_stats import PHASES, SearchStats
+
+from tests.functions import get_output
+
+
+@pytest.fixture(name="log_directory")
+def fixture_log_directory(tmp_path):
+    (tmp_path / "app.log").write_text("a\nERROR 1\n", encoding="utf-8")
+    (tmp_path / "other.log").write_text("nothing\n", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("ERROR 2\n", encoding="utf-8")
+    (tmp_path / "data.log").write_bytes(b"\x7fELF\x00\x01")
+    (tmp_path / "node_modules").mkdir()
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_report(capsys, log_directory, jobs):
+    output = get_output(
+        capsys,
+        [str(log_directory), "ERROR", "-s", ".log", "-S", "node_", "-qq"]
+        + ["--stats", "-j", jobs],
+    )
+
+    assert "Searched 2 files (0.0 MiB)" in output
+    assert (
+        "Skipped: 1 file(s) by suffix, 1 folder(s) by prefix, "
+        "1 binary file(s)" in output
+    )
+    for phase in PHASES:
+        assert f"\n{phase} " in output
+    assert "Slowest files:" in output
+
+
+def test_jsonl_trailer(capsys, log_directory):
+    output = get_output(
+        capsys,
+        [str(log_directory), "ERROR", "-r", "--output", "jsonl", "--stats"]
+        + ["--stats-slowest", "2"],
+    )
+    records = [json.loads(line) for line in output.splitlines()]
+    stats = records[-1]
+
+    assert stats["type"] == "stats"
+    assert stats["files"] == 3
+    assert stats["bytes"] == sum(
+        path.stat().st_size
+        for path in log_directory.iterdir()
+        if path.is_file() and path.name != "data.log"
+    )
+    assert stats["skipped_binary"] == 1
+    assert set(stats["phases"]) == set(PHASES)
+    assert stats["phases"]["match"]["wall"] > 0
+    assert len(stats["slowest_files"]) == 2
+    assert all(record["type"] != "stats" for record in records[:-1])
+
+
+def test_no_stats_by_default(capsys, log_directory):
+    output = get_output(capsys, [str(log_directory), "ERROR", "-qq"])
+
+    assert "Searched" not in output
+
+
+def test_slowest_files_are_kept():
+    stats = SearchStats(slowest_file_count=2)
+    for i, wall in enumerate((0.3, 0.1, 0.5, 0.2)):
+        stats.add_file(f"file{i}", 10, {"match": (wall, wall / 2)})
+    stats.stop()
+
+    assert stats.slowest_files() == [(0.5, "file2"), (0.3, "file0")]
+    assert stats.files == 4
+    assert stats.bytes == 40
+    assert stats.wall_times["match"] == pytest.approx(1.1)
+    assert stats.cpu_times["match"] == pytest.approx(0.55)
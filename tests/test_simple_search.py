@@ -5,10 +5,13 @@ expression. In other words, the searches with the --regexp flag are not tested
 here.
 """
 
-import os
+import gzip
 import sys
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
+
+import pytest
 from find_from_files import find_from_files
+from find_from_files.file_reader import FileReader, io_counters
 
 from tests.constants import (
     DIRECTORIES,
@@ -21,7 +24,6 @@ from tests.constants import (
     FILES_TXT,
     FILES_WITHOUT_SUFFIX,
 )
-from tests.mock_walk import MockWalk
 from tests.functions import (
     check_dirs_and_files_are_checked,
     check_dirs_and_files_are_skipped,
@@ -38,13 +40,10 @@ SIMPLE_MATCH_FOUND = (
 
 
 @patch.object(sys, "argv", ["find_from_files", ROOT, "test"])
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_checks_every_file(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -57,13 +56,10 @@ def test_checks_every_file(capsys):
 @patch.object(
     sys, "argv", ["find_from_files", ROOT, "test", "--skip", "skipThis"]
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_skips_directories_correctly(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -82,13 +78,10 @@ def test_skips_directories_correctly(capsys):
 @patch.object(
     sys, "argv", ["find_from_files", ROOT, "test", "--suffix", ".log"]
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_skips_files_without_correct_suffix(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -108,13 +101,10 @@ def test_skips_files_without_correct_suffix(capsys):
     "argv",
     ["find_from_files", ROOT, "test", "--skip", "dir1", "skipThis", "dir5"],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_skips_multiple_directories_correctly(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -134,13 +124,10 @@ def test_skips_multiple_directories_correctly(capsys):
 @patch.object(
     sys, "argv", ["find_from_files", ROOT, "test", "--suffix", ".log", ".txt"]
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_handles_many_file_suffixes_correctly(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -170,13 +157,10 @@ def test_handles_many_file_suffixes_correctly(capsys):
         "--quiet",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quiet_flag_works_correctly(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -212,13 +196,10 @@ def test_quiet_flag_works_correctly(capsys):
         "--quiet",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quiet_flag_prints_checked_files_with_no_matches(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -254,13 +235,10 @@ def test_quiet_flag_prints_checked_files_with_no_matches(capsys):
         "--quieter",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quieter_flag_prints_files_with_matches(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -296,13 +274,10 @@ def test_quieter_flag_prints_files_with_matches(capsys):
         "--quieter",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quieter_flag_does_not_print_files_with_no_matches(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -339,13 +314,10 @@ def test_quieter_flag_does_not_print_files_with_no_matches(capsys):
         "--quieter",
     ],
 )
-@patch.object(
-    os, "walk", lambda *args, **kwargs: MockWalk(DIRECTORY_STRUCTURE, args[0])
-)
-@patch.object(find_from_files, "is_binary", lambda x: False)
+@patch.object(FileReader, "encoding", lambda self: "utf-8")
+@pytest.mark.usefixtures("test_files")
 def test_quieter_flag_no_suffixes_does_not_print_files_with_no_matches(capsys):
-    with patch("builtins.open", mock_open(read_data="Tämä on testi.\n")):
-        find_from_files.main()
+    find_from_files.main()
 
     captured = capsys.readouterr()
     # print(captured.out)  # uncomment to debug
@@ -362,3 +334,68 @@ def test_quieter_flag_no_suffixes_does_not_print_files_with_no_matches(capsys):
     assert captured.out.count(SIMPLE_MATCH_FOUND) == 0
     assert captured.err == ""
     assert captured.out.count("\n") == 4
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n", "\r"])
+@pytest.mark.parametrize("padding", [0, 10000])
+def test_reports_first_matching_line(tmp_path, newline, padding):
+    file_path = tmp_path / "file.log"
+    file_path.write_bytes(
+        newline.join(
+            [
+                "Eka rivi.",
+                "Tokä rivi." + "x" * padding,
+                "Tämä on testi.",
+                "testi",
+            ]
+        ).encode("utf-8")
+    )
+
+    with FileReader(str(file_path)) as reader:
+        output = find_from_files.find_folders_with_string(
+            "test", reader, False
+        )
+
+    assert SIMPLE_MATCH_FOUND.replace("line 1", "line 3") in output
+    assert output.count("Found on line") == 1
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_lone_carriage_returns_end_lines(tmp_path, compress):
+    data = "Eka\rtimeout=1\rTämä on testi.\r\ntesti\n".encode("utf-8")
+    file_path = tmp_path / "file.log"
+    file_path.write_bytes(gzip.compress(data) if compress else data)
+
+    with FileReader(str(file_path)) as reader:
+        output = find_from_files.find_folders_with_string(
+            "test", reader, False
+        )
+
+    assert SIMPLE_MATCH_FOUND.replace("line 1", "line 3") in output
+    assert "\r" not in output
+
+
+@pytest.mark.parametrize("content", [b"", b"Ei osumia.\n"])
+def test_reports_nothing_when_string_is_not_found(tmp_path, content):
+    file_path = tmp_path / "file.log"
+    file_path.write_bytes(content)
+
+    with FileReader(str(file_path)) as reader:
+        output = find_from_files.find_folders_with_string(
+            "test", reader, False
+        )
+
+    assert output == ""
+
+
+@patch.object(sys, "argv", ["find_from_files", ROOT, "test"])
+@pytest.mark.usefixtures("test_files")
+def test_opens_every_file_once(capsys):
+    io_counters.reset()
+    find_from_files.main()
+
+    captured = capsys.readouterr()
+    assert captured.out.count(SIMPLE_MATCH_FOUND) == 11
+    assert io_counters.opens == 11
+    assert io_counters.reads == 11
+    assert io_counters.maps == 0
@@ -0,0 +1,230 @@
+"""Tests for searching files in UTF-16, UTF-32 and Latin-1 in their own
+encodings."""
+
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from find_from_files import buffers, file_reader
+from find_from_files.regex_literals import get_prefilter
+from find_from_files.regex_search import find_matching_lines_in_bytes
+from find_from_files.text_encodings import (
+    count_newlines,
+    find_aligned,
+    get_line,
+    is_ascii_compatible,
+    read_code_unit_windows,
+)
+
+from tests.functions import run_main
+
+# "Ċ" (U+010A) has a 0x0A byte in UTF-16 and UTF-32, which is not a newline
+TEXT = (
+    "first line\n"
+    "Ċ marks the spot\r\n"
+    "ERROR ääkköset E42\n"
+    "no match\n"
+    "last ERROR E7\n"
+)
+ENCODINGS = ["utf-16", "utf-16-le", "utf-16-be", "utf-32", "latin-1"]
+
+
+def get_records(capsys, argv):
+    output = run_main(capsys, [*argv, "--output", "jsonl"]).out
+    records = map(json.loads, output.splitlines())
+    return [record for record in records if record["type"] == "match"]
+
+
+def write_log(tmp_path, encoding, text=TEXT, name="app.log"):
+    (tmp_path / name).write_bytes(text.encode(encoding, errors="replace"))
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_literal_search(capsys, tmp_path, encoding):
+    write_log(tmp_path, encoding)
+
+    records = get_records(capsys, [str(tmp_path), "ääkköset"])
+
+    assert [(r["line_number"], r["line"]) for r in records] == [
+        (3, "ERROR ääkköset E42")
+    ]
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_regex_search(capsys, tmp_path, encoding):
+    write_log(tmp_path, encoding)
+
+    records = get_records(capsys, [str(tmp_path), r"E\d+", "-r", "-l"])
+
+    assert [(r["line_number"], r["match"], r["line"]) for r in records] == [
+        (3, "E42", "ERROR ääkköset E42"),
+        (5, "E7", "last ERROR E7"),
+    ]
+
+
+@pytest.mark.parametrize("regexp", [[], ["-r"]])
+def test_files_with_matches(capsys, tmp_path, regexp):
+    for encoding in ENCODINGS:
+        write_log(tmp_path, encoding, name=f"{encoding}.log")
+    write_log(tmp_path, "utf-16", "no match\n", name="other.log")
+
+    output = run_main(
+        capsys,
+        [str(tmp_path), "ääkköset", *regexp, "--files-with-matches", "-j", "1"],
+    ).out
+
+    assert sorted(output.splitlines()) == sorted(
+        str(tmp_path / f"{encoding}.log") for encoding in ENCODINGS
+    )
+
+
+def test_string_that_cannot_be_encoded_is_not_found(capsys, tmp_path):
+    write_log(tmp_path, "latin-1", "Ċ ERROR\n")
+
+    assert get_records(capsys, [str(tmp_path), "Ċ"]) == []
+    assert get_records(capsys, [str(tmp_path), "Ċ", "-r"]) == []
+    assert not get_prefilter("Ċ").could_match_encoded(b"? ERROR", "latin-1")
+
+
+@pytest.mark.parametrize("encoding", ["utf-16-le", "utf-32-be", "latin-1"])
+def test_line_numbers_across_windows(monkeypatch, capsys, tmp_path, encoding):
+    monkeypatch.setattr(buffers, "WINDOW_READ_SIZE", 64)
+    lines = [f"Ċ line {i}" if i % 13 else f"ERROR {i}" for i in range(300)]
+    write_log(tmp_path, encoding, "\n".join(lines))
+
+    literal = get_records(capsys, [str(tmp_path), "ERROR 286"])
+    regex = get_records(capsys, [str(tmp_path), r"ERROR \d+", "-r"])
+
+    assert [r["line_number"] for r in literal] == [287]
+    assert [r["line_number"] for r in regex] == list(range(1, 301, 13))
+
+
+def test_encoding_is_detected_once_per_file(monkeypatch, capsys, tmp_path):
+    for name in ("a.log", "b.log"):
+        write_log(tmp_path, "utf-16", TEXT, name)
+    detected = []
+    detect_encoding = file_reader.detect_encoding
+
+    def counting_detect_encoding(data):
+        detected.append(data)
+        return detect_encoding(data)
+
+    monkeypatch.setattr(
+        file_reader, "detect_encoding", counting_detect_encoding
+    )
+
+    # The second file is searched again for only the first match
+    records = get_records(
+        capsys, [str(tmp_path), "ERROR", "-r", "--max-total", "3", "-j", "1"]
+    )
+
+    assert len(records) == 3
+    assert len(detected) == 2
+
+
+@pytest.mark.parametrize("encoding", ["utf-16-le", "utf-16-be", "utf-32-le"])
+def test_newline_bytes_of_other_characters_are_not_counted(encoding):
+    data = "Ċ\nĊĊ\nx Ċ".encode(encoding)
+
+    assert count_newlines(data, encoding) == 2
+    position = find_aligned(data, "x".encode(encoding), encoding)
+    assert get_line(data, position, encoding).decode(encoding) == "x Ċ"
+
+
+@pytest.mark.parametrize("encoding", ["utf-16-le", "utf-16-be", "utf-32-le"])
+def test_carriage_returns_end_lines(encoding):
+    # "ഊ" (U+0D0A) has the bytes of "\r" and "\n", which are not line breaks
+    data = "first\rsecond\r\nഊ third foo\rlast\n".encode(encoding)
+    position = find_aligned(data, "foo".encode(encoding), encoding)
+
+    assert count_newlines(data, encoding) == 4
+    assert count_newlines(data[:position], encoding) == 2
+    assert get_line(data, position, encoding).decode(encoding) == (
+        "ഊ third foo"
+    )
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-32-be", "latin-1"])
+@pytest.mark.parametrize("regexp", [[], ["-r"]])
+def test_lone_carriage_returns_in_other_encodings(
+    capsys, tmp_path, encoding, regexp
+):
+    write_log(tmp_path, encoding, "first\rsecond\rthird foo\r")
+
+    records = get_records(capsys, [str(tmp_path), "foo", *regexp, "-l"])
+
+    assert [(r["line_number"], r["line"]) for r in records] == [
+        (3, "third foo")
+    ]
+
+
+def test_find_aligned_skips_misaligned_occurrences():
+    # "ĀA" is 00 01 41 00 in UTF-16-LE, which contains "䄁" (01 41) at 1
+    data = "ĀA 䄁".encode("utf-16-le")
+    encoded = "䄁".encode("utf-16-le")
+
+    assert data.find(encoded) == 1
+    assert find_aligned(data, encoded, "utf-16-le") == 6
+
+
+@pytest.mark.parametrize(
+    "data_encoding, encoding",
+    [("utf-16", "utf-16-le"), ("utf-32-be", "utf-32-be")],
+)
+def test_code_unit_windows(monkeypatch, data_encoding, encoding):
+    monkeypatch.setattr(buffers, "WINDOW_READ_SIZE", 16)
+    text = "".join(f"Ċ line {i}\n" for i in range(50)) + "last"
+    data = text.encode(data_encoding)
+
+    windows = list(read_code_unit_windows(io.BytesIO(data), encoding))
+
+    # The byte order mark is left out
+    assert "".join(w.decode(encoding) for w, _, _ in windows) == text
+    for window, offset, newlines_before in windows:
+        assert data[offset:].startswith(window)
+        assert newlines_before == data[:offset].decode(encoding).count("\n")
+
+
+@pytest.mark.parametrize(
+    "encoding, compatible",
+    [
+        ("utf-8", True),
+        ("latin-1", True),
+        ("cp1252", True),
+        ("utf-16-le", False),
+        ("shift_jis", False),
+    ],
+)
+def test_is_ascii_compatible(encoding, compatible):
+    assert is_ascii_compatible(encoding) is compatible
+
+
+def test_only_matching_windows_are_decoded(monkeypatch):
+    monkeypatch.setattr(buffers, "WINDOW_READ_SIZE", 64)
+    text = "".join(f"line {i} ok\n" for i in range(200)) + "line ERROR 42\n"
+    decoded = []
+
+    class Window(bytes):
+        def decode(self, *args, **kwargs):
+            decoded.append(self)
+            return super().decode(*args, **kwargs)
+
+    windows = read_code_unit_windows(
+        io.BytesIO(text.encode("utf-16-le")), "utf-16-le"
+    )
+    with patch(
+        "find_from_files.regex_search.read_code_unit_windows",
+        lambda stream, encoding: (
+            (Window(window), offset, newlines_before)
+            for window, offset, newlines_before in windows
+        ),
+    ):
+        found = list(
+            find_matching_lines_in_bytes(
+                r"ERROR (\d+)", io.BytesIO(), "utf-16-le"
+            )
+        )
+
+    assert found == [(201, "line ERROR 42", ["42"])]
+    assert len(decoded) == 1
@@ -0,0 +1,267 @@
+"""Tests for searching with a trigram index built with the index subcommand."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from find_from_files.file_reader import io_counters
+from find_from_files.regex_literals import required_literals
+from find_from_files.trigram_index import (
+    BINARY,
+    CANDIDATE,
+    NO_MATCH,
+    UNKNOWN,
+    IndexFilter,
+    TrigramIndex,
+    build_index,
+    compact_index,
+    decode_varint,
+    encode_varint,
+    query_trigrams,
+    update_index,
+)
+
+from tests.functions import run_main
+
+FILES = {
+    "a.log": "INFO start\nERROR 12 timeout=300ms\n",
+    "b.log": "INFO start\nWARNING disk full\n",
+    "sub/c.log": "ERROR 7 connection refused\n",
+    "sub/d.txt": "Tämä on testi.\n" * 200,
+    "sub/e.bin": "\x7fELF binary",
+}
+
+
+@pytest.fixture(name="index_path")
+def fixture_index_path(tmp_path):
+    """Creates FILES into tmp_path/tree and builds an index of them."""
+    for path, content in FILES.items():
+        file_path = tmp_path / "tree" / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding="utf-8")
+    index_path = str(tmp_path / "tree.idx")
+    build_index(str(tmp_path / "tree"), index_path)
+    return index_path
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2**40])
+def test_varint_round_trip(value):
+    encoded = bytearray()
+    encode_varint(value, encoded)
+    assert decode_varint(encoded, 0) == (value, len(encoded))
+
+
+@pytest.mark.parametrize(
+    "pattern, literals",
+    [
+        (r"ERROR \d+ timeout=(\d+)ms", ["ERROR ", " timeout=", "ms"]),
+        ("a(bc)d", ["abcd"]),
+        ("foo(bar)+baz", ["foo", "bar", "baz"]),
+        ("foo(bar)?baz", ["foo", "baz"]),
+        ("ab|cd", []),
+        ("(?i)abc", []),
+        ("x(?i:abc)y", ["x", "y"]),
+        ("(", []),
+    ],
+)
+def test_required_literals(pattern, literals):
+    assert required_literals(pattern) == literals
+
+
+def test_index_rules_out_files(index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    with TrigramIndex(index_path) as index:
+        index_filter = IndexFilter(index, query_trigrams("timeout=", False))
+
+        assert index_filter.check(os.path.join(tree, "a.log")) == CANDIDATE
+        assert index_filter.check(os.path.join(tree, "b.log")) == NO_MATCH
+        assert index_filter.check(os.path.join(tree, "sub/e.bin")) == BINARY
+        assert index_filter.check(os.path.join(tree, "new.log")) == UNKNOWN
+
+
+def test_regexp_without_literals_makes_every_file_a_candidate(index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    with TrigramIndex(index_path) as index:
+        index_filter = IndexFilter(index, query_trigrams(r"\d+|x", True))
+
+        assert index_filter.candidate_paths is None
+        assert index_filter.check(os.path.join(tree, "b.log")) == CANDIDATE
+
+
+def test_changed_file_is_searched(index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    with open(os.path.join(tree, "b.log"), "a", encoding="utf-8") as f:
+        f.write("ERROR 1 timeout=5ms\n")
+    with TrigramIndex(index_path) as index:
+        index_filter = IndexFilter(index, query_trigrams("timeout=", False))
+
+        assert index_filter.check(os.path.join(tree, "b.log")) == UNKNOWN
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["timeout="],
+        ["testi"],
+        ["not found anywhere"],
+        ["--regexp", r"ERROR \d+ (timeout|connection)"],
+        ["--regexp", "--whole-line", r"\d+"],
+    ],
+)
+def test_indexed_search_output_is_same_as_full_scan(
+    capsys, index_path, options
+):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    full_scan = run_main(capsys, [tree, *options])
+    io_counters.reset()
+    indexed = run_main(capsys, [tree, *options, "--index-file", index_path])
+
+    assert indexed.out == full_scan.out
+    assert io_counters.opens <= len(FILES) - 1
+
+
+@pytest.mark.parametrize("newline", ["\r\n", "\r"])
+def test_line_breaks_in_patterns_with_carriage_returns(
+    capsys, tmp_path, newline
+):
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    (tree / "a.log").write_bytes(f"first xa{newline}second\n".encode())
+    index_path = str(tmp_path / "tree.idx")
+    build_index(str(tree), index_path)
+    argv = [str(tree), "xa\n", "--regexp"]
+
+    full_scan = run_main(capsys, argv)
+    indexed = run_main(capsys, [*argv, "--index-file", index_path])
+
+    assert "Matches: " in full_scan.out
+    assert indexed.out == full_scan.out
+    assert query_trigrams("xa\nsecond", True) == set()
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "latin-1"])
+def test_files_in_other_encodings_are_indexed_as_utf_8(tmp_path, encoding):
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    (tree / "a.log").write_bytes("Virhe: ääkköset\n".encode(encoding))
+    index_path = str(tmp_path / "tree.idx")
+    build_index(str(tree), index_path)
+
+    with TrigramIndex(index_path) as index:
+        for string, expected in (("ääkkö", CANDIDATE), ("xyz", NO_MATCH)):
+            index_filter = IndexFilter(index, query_trigrams(string, False))
+
+            assert index_filter.check(str(tree / "a.log")) == expected
+
+
+def test_indexed_search_only_opens_candidates(capsys, index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    io_counters.reset()
+    run_main(capsys, [tree, "timeout=", "--index-file", index_path])
+
+    assert io_counters.opens == 1
+
+
+def test_index_subcommand_builds_index(capsys, tmp_path, index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    new_index_path = str(tmp_path / "new.idx")
+    captured = run_main(
+        capsys, ["index", "build", tree, "--index-file", new_index_path]
+    )
+
+    assert f"Indexed {len(FILES)} files" in captured.out
+    with TrigramIndex(index_path) as index, TrigramIndex(new_index_path) as new:
+        for trigrams in [set(), query_trigrams("ERROR", False)]:
+            assert new.candidates(trigrams) == index.candidates(trigrams)
+
+
+def write(tree, path, content, mode="w"):
+    with open(os.path.join(tree, path), mode, encoding="utf-8") as f:
+        f.write(content)
+
+
+def check(index_path, search_string, path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    with TrigramIndex(index_path) as index:
+        index_filter = IndexFilter(index, query_trigrams(search_string, False))
+        return index_filter.check(os.path.join(tree, path))
+
+
+def test_update_indexes_only_appended_part(index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    appended = "ERROR 99 disk quota exceeded\n"
+    write(tree, "b.log", appended, "a")
+
+    result = update_index(index_path, background_compaction=False)
+
+    assert result.appended == 1
+    assert result.unchanged == len(FILES) - 1
+    assert result.bytes_indexed == len(appended)
+    assert check(index_path, "quota", "b.log") == CANDIDATE
+    assert check(index_path, "WARNING", "b.log") == CANDIDATE
+    assert check(index_path, "timeout", "b.log") == NO_MATCH
+
+
+def test_update_reindexes_changed_added_and_deleted_files(index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    write(tree, "b.log", "INFO rewritten\n")
+    write(tree, "new.log", "ERROR 1 timeout=5ms\n")
+    os.remove(os.path.join(tree, "sub/c.log"))
+
+    result = update_index(index_path, background_compaction=False)
+
+    assert (result.added, result.changed, result.deleted) == (1, 1, 1)
+    assert check(index_path, "WARNING", "b.log") == NO_MATCH
+    assert check(index_path, "rewritten", "b.log") == CANDIDATE
+    assert check(index_path, "timeout=", "new.log") == CANDIDATE
+    with TrigramIndex(index_path) as index:
+        assert index.get_entry("sub/c.log") is None
+        assert len(index.segments) == 2
+
+
+def test_compaction_keeps_query_results(index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    write(tree, "a.log", "ERROR 2 timeout=1ms\n", "a")
+    write(tree, "b.log", "INFO rewritten\n")
+    os.remove(os.path.join(tree, "sub/c.log"))
+    update_index(index_path, background_compaction=False)
+    queries = [
+        set(),
+        query_trigrams("ERROR", False),
+        query_trigrams("1ms", False),
+    ]
+    with TrigramIndex(index_path) as index:
+        before = [index.candidates(trigrams) for trigrams in queries]
+
+    assert compact_index(index_path)
+
+    with TrigramIndex(index_path) as index:
+        assert [index.candidates(trigrams) for trigrams in queries] == before
+        assert len(index.segments) == 1
+        assert index.tombstone_ratio() == 0
+    assert check(index_path, "1ms", "a.log") == CANDIDATE
+
+
+def test_update_starts_compaction_when_there_are_many_tombstones(index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    write(tree, "a.log", "changed\n")
+    write(tree, "b.log", "changed\n")
+
+    with patch(
+        "find_from_files.trigram_index.start_background_compaction"
+    ) as start:
+        update_index(index_path)
+
+    start.assert_called_once_with(index_path)
+
+
+def test_index_update_subcommand(capsys, index_path):
+    tree = os.path.join(os.path.dirname(index_path), "tree")
+    write(tree, "b.log", "more\n", "a")
+
+    captured = run_main(
+        capsys, ["index", "update", tree, "--index-file", index_path]
+    )
+
+    assert "1 appended" in captured.out
+    assert "4 unchanged" in captured.out